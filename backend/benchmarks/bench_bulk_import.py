@@ -0,0 +1,108 @@
+"""
+Throughput of a bulk import (POST /leads/bulk pipeline) by concurrency.
+
+Runs bulk_import.run_job with the endpoint's own translate and tag
+functions. Gemini is faked with a fixed latency; local detection is
+off so every unique message costs one detect+translate round-trip.
+Agent reservation and the chunked inserts are faked with a fixed DB
+round-trip. Half of the rows repeat an earlier message, so the numbers
+also show the per-job deduplication.
+
+Reported per BULK_CONCURRENCY: rows/second, Gemini requests and the
+peak number of Gemini calls in flight.
+
+    python -m benchmarks.bench_bulk_import [rows] [gemini_ms] [db_ms] [concurrency...]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+
+from services import bulk_import, gemini_service, translation_cache
+
+
+class _Counters:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.db_round_trips = 0
+
+
+def _install_fakes(counters: _Counters, gemini_latency: float, db_latency: float) -> None:
+    async def generate_content(model, contents, config=None):
+        counters.requests += 1
+        counters.in_flight += 1
+        counters.peak = max(counters.peak, counters.in_flight)
+        try:
+            await asyncio.sleep(gemini_latency)
+        finally:
+            counters.in_flight -= 1
+        text = json.dumps({"language": "spanish", "confidence": "high", "translation": "EN text"})
+        return type("Response", (), {"text": text, "usage_metadata": None})()
+
+    models = type("Models", (), {"generate_content": staticmethod(generate_content)})()
+    client = type("Client", (), {"aio": type("Aio", (), {"models": models})()})()
+    gemini_service._get_client = lambda: client
+    gemini_service._local_detection = lambda text: None
+
+    async def assign_agents(pools):
+        counters.db_round_trips += 1
+        await asyncio.sleep(db_latency)
+        return ["Agent A"] * len(pools)
+
+    async def insert_leads(records, chunk_size=500):
+        inserted = []
+        for start in range(0, len(records), chunk_size):
+            counters.db_round_trips += 1
+            await asyncio.sleep(db_latency)
+            inserted += [{**r, "id": f"lead-{start + i}"} for i, r in enumerate(records[start:start + chunk_size])]
+        return inserted
+
+    bulk_import.assign_agents = assign_agents
+    bulk_import.insert_leads = insert_leads
+    bulk_import.event_bus.publish = lambda event_type, data: None
+
+
+async def _run(rows, concurrency, gemini_latency, db_latency) -> None:
+    from main import _detect_and_translate_lead, tag_lead
+
+    counters = _Counters()
+    _install_fakes(counters, gemini_latency, db_latency)
+    translation_cache._memory = None
+    gemini_service._in_flight = {}
+    os.environ["BULK_CONCURRENCY"] = str(concurrency)
+
+    job = bulk_import.create_job(len(rows))
+    started = time.perf_counter()
+    await bulk_import.run_job(job, rows, _detect_and_translate_lead, tag_lead)
+    elapsed = time.perf_counter() - started
+    assert job["inserted"] == len(rows), job.get("error")
+    print(f"concurrency {concurrency:4d}  {len(rows) / elapsed:9.1f} rows/s  "
+          f"{counters.requests:5d} Gemini requests  {counters.peak:4d} peak in flight  "
+          f"{counters.db_round_trips:3d} DB round-trips")
+
+
+async def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    gemini_latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 200) / 1000
+    db_latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000
+    levels = [int(a) for a in sys.argv[4:]] or [1, 8, 32]
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ["TRANSLATION_CACHE_PERSIST"] = "0"
+    rows = [
+        {"name": f"Cliente {i}", "email": f"c{i}@example.com",
+         "message": f"Hola, necesito una demo del plan número {i // 2}"}
+        for i in range(count)
+    ]
+
+    print(f"{count} rows ({count - count // 2} unique), Gemini {gemini_latency * 1000:.0f} ms, "
+          f"DB round-trip {db_latency * 1000:.0f} ms")
+    for concurrency in levels:
+        await _run(rows, concurrency, gemini_latency, db_latency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
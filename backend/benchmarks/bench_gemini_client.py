@@ -0,0 +1,87 @@
+"""
+Per-call overhead of a fresh genai.Client vs the shared client.
+
+Runs against a local HTTP stub of the generateContent endpoint, so it
+measures client setup and connection handling, not Gemini latency
+(TLS handshakes against the real API make the fresh-client case worse
+still).
+
+    python -m benchmarks.bench_gemini_client [calls]
+"""
+
+import sys
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from google import genai
+
+from services import gemini_service
+
+RESPONSE = json.dumps({
+    "candidates": [{"content": {"role": "model", "parts": [{"text": "hello"}]}}],
+}).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def _new_client(base_url: str) -> genai.Client:
+    return genai.Client(api_key="bench", http_options={"base_url": base_url})
+
+
+async def _per_call(base_url: str, calls: int) -> float:
+    """Old behaviour: a new client for every call."""
+    started = time.perf_counter()
+    for _ in range(calls):
+        client = _new_client(base_url)
+        await client.aio.models.generate_content(model=gemini_service.GEMINI_MODEL, contents="hi")
+    return (time.perf_counter() - started) / calls
+
+
+async def _shared(base_url: str, calls: int) -> float:
+    """Current behaviour: one client (and connection pool) for every call."""
+    client = _new_client(base_url)
+    await client.aio.models.generate_content(model=gemini_service.GEMINI_MODEL, contents="hi")
+    started = time.perf_counter()
+    for _ in range(calls):
+        await client.aio.models.generate_content(model=gemini_service.GEMINI_MODEL, contents="hi")
+    elapsed = (time.perf_counter() - started) / calls
+    await client.aio.aclose()
+    client.close()
+    return elapsed
+
+
+def main() -> None:
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    fresh = asyncio.run(_per_call(base_url, calls))
+    shared = asyncio.run(_shared(base_url, calls))
+    server.shutdown()
+
+    print(f"{calls} calls against a local stub")
+    print(f"  new client per call: {fresh * 1000:7.2f} ms/call")
+    print(f"  shared client:       {shared * 1000:7.2f} ms/call")
+    print(f"  saved per call:      {(fresh - shared) * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Accuracy and latency of the local language detector on a labelled set.
+
+benchmarks/language_fixtures.json holds held-out lead messages in the
+supported languages plus ones that must NOT take the fast path
+(language=null: romanized Hindi, unsupported Latin-script languages,
+too-short texts). For each threshold it reports:
+
+  fast-path rate   supported samples answered locally (correctly)
+  wrong            samples answered locally with the wrong language,
+                   i.e. a lead stored under the wrong language and
+                   never sent to Gemini
+
+    python -m benchmarks.bench_language_detector
+"""
+
+import os
+import json
+import time
+from collections import Counter
+
+from services.language_detector import detect_language_local
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "language_fixtures.json")
+THRESHOLDS = (0.6, 0.7, 0.8, 0.9, 0.95)
+ROUNDS = 200
+
+
+def main() -> None:
+    with open(FIXTURES, encoding="utf-8") as f:
+        samples = json.load(f)["samples"]
+    results = [(s, *detect_language_local(s["text"])) for s in samples]
+    supported = [r for r in results if r[0]["language"]]
+    unsupported = [r for r in results if not r[0]["language"]]
+
+    print(f"{len(supported)} supported, {len(unsupported)} must-not-fast-path samples\n")
+    print("threshold  fast-path rate  wrong (supported)  wrong (unsupported)")
+    for threshold in THRESHOLDS:
+        fast = [r for r in supported if r[2] >= threshold]
+        correct = sum(1 for s, lang, _ in fast if lang == s["language"])
+        wrong_unsupported = sum(1 for r in unsupported if r[2] >= threshold)
+        print(f"  {threshold:5.2f}    {correct / len(supported):12.0%}  "
+              f"{len(fast) - correct:17d}  {wrong_unsupported:19d}")
+
+    env_threshold = float(os.getenv("LOCAL_DETECTION_THRESHOLD", "0.9"))
+    misses = Counter(
+        s["language"] for s, lang, score in supported
+        if score < env_threshold or lang != s["language"]
+    )
+    print(f"\nSent to Gemini at {env_threshold}: {dict(misses) or 'none'}")
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for sample in samples:
+            detect_language_local(sample["text"])
+    per_call = (time.perf_counter() - started) / (ROUNDS * len(samples))
+    print(f"Latency: {per_call * 1e6:.0f} µs/message (mean over {ROUNDS * len(samples)} calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Page latency of GET /leads: OFFSET paging vs keyset cursors by depth.
+
+Runs get_all_leads against the Supabase project in .env (SUPABASE_URL /
+SUPABASE_KEY), so the numbers include the real planner cost: OFFSET
+has to walk and discard every skipped row, a cursor starts the
+idx_leads_created_at_id scan at its position. The table needs at least
+as many leads as the deepest offset; deeper offsets are skipped.
+
+For each depth the cursor is taken from the row just before it (not
+timed), then both kinds of page are fetched *repeat* times and the
+median is reported.
+
+    python -m benchmarks.bench_lead_pages [page_size] [repeat] [offsets...]
+"""
+
+import sys
+import time
+import asyncio
+import statistics
+
+from dotenv import load_dotenv
+
+from services.supabase_service import close_supabase, get_all_leads, get_lead_count
+
+
+async def _median_ms(fetch, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fetch()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def main() -> None:
+    load_dotenv()
+    page = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    offsets = [int(a) for a in sys.argv[3:]] or [0, 10_000, 100_000]
+
+    total = await get_lead_count(estimated=True)
+    print(f"~{total} leads, page size {page}, median of {repeat}")
+    print(f"{'offset':>8} {'OFFSET ms':>10} {'cursor ms':>10}")
+    try:
+        for offset in offsets:
+            if offset and offset >= total:
+                print(f"{offset:>8} {'skipped (table too small)':>21}")
+                continue
+            cursor = None
+            if offset:
+                [before] = await get_all_leads(limit=1, offset=offset - 1, fields=["id", "created_at"])
+                cursor = (before["created_at"], before["id"])
+
+            by_offset = await _median_ms(lambda: get_all_leads(limit=page, offset=offset), repeat)
+            by_cursor = await _median_ms(lambda: get_all_leads(limit=page, cursor=cursor), repeat)
+            print(f"{offset:>8} {by_offset:>10.1f} {by_cursor:>10.1f}")
+    finally:
+        await close_supabase()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
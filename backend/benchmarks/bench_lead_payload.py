@@ -0,0 +1,79 @@
+"""
+Payload size and serialization cost of a GET /leads page, per view.
+
+Builds synthetic leads with realistic message lengths and runs each
+page through the endpoint's own response model (LeadsListResponse), so
+the timings cover the pydantic validation + JSON encoding FastAPI does
+per request. Summary rows mirror the leads_summary view (160-char
+previews); "projected" is view=summary&fields=<list columns>.
+
+Reported per variant: raw and gzip-compressed bytes per page, bytes per
+lead, and encode time per page.
+
+    python -m benchmarks.bench_lead_payload [page_size] [message_chars] [repeat]
+"""
+
+import sys
+import gzip
+import time
+import uuid
+import random
+
+from main import LeadsListResponse, SUMMARY_FIELDS
+
+PREVIEW = 160
+LIST_COLUMNS = ["id", "name", "status", "language", "assigned_to", "created_at",
+                "original_preview", "tags", "updated_at", "translation_status"]
+
+
+def _lead(i: int, message_chars: int) -> dict:
+    words = [random.choice(["hola", "necesito", "información", "sobre", "precios", "demo"])
+             for _ in range(message_chars // 8)]
+    original = " ".join(words)[:message_chars]
+    return {
+        "id": str(uuid.uuid4()), "name": f"Cliente {i}", "email": f"cliente{i}@example.com",
+        "phone": "+34 600 000 000", "original_message": original,
+        "translated_message": original.replace("hola", "hello"), "language": "spanish",
+        "tag": "Pricing", "tags": ["Pricing", "Demo"], "status": "New",
+        "assigned_to": "Agent A", "created_at": "2024-05-01T12:00:00.000000+00:00",
+        "updated_at": "2024-05-01T12:05:00.000000+00:00", "translation_status": "done",
+    }
+
+
+def _summary(lead: dict) -> dict:
+    row = {k: v for k, v in lead.items() if k in SUMMARY_FIELDS}
+    row["original_preview"] = lead["original_message"][:PREVIEW]
+    row["translated_preview"] = lead["translated_message"][:PREVIEW]
+    row["truncated"] = max(len(lead["original_message"]), len(lead["translated_message"])) > PREVIEW
+    return row
+
+
+def _report(name: str, rows: list[dict], repeat: int) -> None:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = LeadsListResponse(
+            leads=rows, total=10_000, limit=len(rows), offset=0, next_cursor="x" * 60,
+        ).model_dump_json().encode()
+    encode_ms = (time.perf_counter() - started) * 1000 / repeat
+    compressed = len(gzip.compress(body))
+    print(f"{name:10} {len(body):9d} B  {compressed:8d} B gzip  "
+          f"{len(body) // len(rows):6d} B/lead  {encode_ms:7.2f} ms/page")
+
+
+def main() -> None:
+    page = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    message_chars = int(sys.argv[2]) if len(sys.argv) > 2 else 1200
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    random.seed(7)
+    full = [_lead(i, message_chars) for i in range(page)]
+    summary = [_summary(lead) for lead in full]
+    projected = [{k: row[k] for k in LIST_COLUMNS} for row in summary]
+
+    print(f"{page} leads/page, {message_chars}-char messages, {repeat} encodes")
+    _report("full", full, repeat)
+    _report("summary", summary, repeat)
+    _report("projected", projected, repeat)
+
+
+if __name__ == "__main__":
+    main()
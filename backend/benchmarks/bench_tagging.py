@@ -0,0 +1,85 @@
+"""
+Tagging latency on long messages: compiled tries vs a per-keyword scan.
+
+Uses the shipped config/tag_rules.json. Messages are ~1 KB and ~10 KB
+of mixed-language filler with the matching keywords near the end (the
+worst case for the early exit once every tag has matched), plus a
+no-match variant that must scan the whole text. The baseline compiles
+one whole-word regex per keyword and tries them all, as a naive
+implementation of the same rules would.
+
+    python -m benchmarks.bench_tagging [rounds]
+"""
+
+import re
+import sys
+import json
+import time
+
+from services.tagging import DEFAULT_RULES_PATH, TagEngine, _WORD_CHARS, _keyword_parts
+
+FILLER = (
+    "Hello team, we are evaluating tools for our sales group next quarter. "
+    "Hola equipo, estamos evaluando herramientas para el próximo trimestre. "
+    "Bonjour, nous évaluons plusieurs solutions pour notre service. "
+    "नमस्ते, हम अगले महीने के लिए विकल्प देख रहे हैं। 你好，我们正在评估几个方案。 "
+)
+KEYWORDS = " Could you send the pricing and book a demo? Necesitamos soporte. "
+
+
+def _message(size: int, tail: str) -> str:
+    body = FILLER * (size // len(FILLER.encode()) + 1)
+    return body[: max(0, size - len(tail.encode()))] + tail
+
+
+def _naive(rules: dict) -> list[tuple[str, re.Pattern[str]]]:
+    patterns = []
+    for name, spec in rules["tags"].items():
+        for words in spec["keywords"].values():
+            for keyword in words:
+                parts = _keyword_parts(keyword)
+                if not parts:
+                    continue
+                text, lead, trail = parts
+                regex = re.escape(text).replace(r"\ ", r"\s+")
+                if lead:
+                    regex = f"(?<![{_WORD_CHARS}])" + regex
+                if trail:
+                    regex += f"(?![{_WORD_CHARS}])"
+                patterns.append((name, re.compile(regex)))
+    return patterns
+
+
+def _naive_match(patterns, text: str) -> set[str]:
+    text = text.lower()
+    return {name for name, pattern in patterns if pattern.search(text)}
+
+
+def _per_call_us(fn, text: str, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(text)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with open(DEFAULT_RULES_PATH, encoding="utf-8") as f:
+        rules = json.load(f)
+    engine = TagEngine(rules)
+    naive = _naive(rules)
+    print(f"{len(engine.tags)} tags, {engine.keyword_count} keywords, {rounds} rounds")
+    print(f"{'message':16} {'engine µs':>10} {'per-keyword µs':>15}  tags")
+
+    for size in (1024, 10 * 1024):
+        for label, tail in (("keywords", KEYWORDS), ("no match", "")):
+            text = _message(size, tail)
+            tags = engine.match(text)
+            assert set(tags) == _naive_match(naive, text), (tags, _naive_match(naive, text))
+            fast = _per_call_us(engine.match, text, rounds)
+            slow = _per_call_us(lambda t: _naive_match(naive, t), text, rounds)
+            print(f"{size // 1024:3d} KB {label:9} {fast:10.1f} {slow:15.1f}  {','.join(tags) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
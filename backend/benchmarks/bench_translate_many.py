@@ -0,0 +1,95 @@
+"""
+Throughput of translate_many_to_english vs a per-item translate loop.
+
+Gemini and the Supabase cache table are faked with fixed latencies, so
+the numbers show request counts and round-trip structure, not model
+speed. Reported per approach: texts/second, Gemini requests (RPM
+quota units), estimated input tokens (TPM units) and cache round-trips.
+
+    python -m benchmarks.bench_translate_many [texts] [gemini_ms] [db_ms]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+
+from services import gemini_service, translation_cache
+
+
+class _Counters:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.tokens = 0
+        self.db_round_trips = 0
+
+
+def _install_fakes(counters: _Counters, gemini_latency: float, db_latency: float) -> None:
+    async def generate_content(model, contents, config=None):
+        counters.requests += 1
+        counters.tokens += gemini_service._estimate_tokens(contents)
+        await asyncio.sleep(gemini_latency)
+        if config and config.get("response_schema") is gemini_service.BATCH_SCHEMA:
+            items = json.loads(contents[contents.index("["):])
+            text = json.dumps([{"index": i["index"], "translation": "EN " + i["text"]} for i in items])
+        else:
+            text = "EN text"
+        return type("Response", (), {"text": text})()
+
+    models = type("Models", (), {"generate_content": staticmethod(generate_content)})()
+    client = type("Client", (), {"aio": type("Aio", (), {"models": models})()})()
+    gemini_service._get_client = lambda: client
+
+    async def round_trip(*args, **kwargs):
+        counters.db_round_trips += 1
+        await asyncio.sleep(db_latency)
+
+    async def lookup_one(key):
+        await round_trip()
+        return None
+
+    async def lookup_many(keys):
+        await round_trip()
+        return {}
+
+    translation_cache.get_cached_translation = lookup_one
+    translation_cache.get_cached_translations = lookup_many
+    translation_cache.upsert_cached_translation = round_trip
+    translation_cache.upsert_cached_translations = round_trip
+
+
+async def _run(name, texts, translate, gemini_latency, db_latency) -> None:
+    counters = _Counters()
+    _install_fakes(counters, gemini_latency, db_latency)
+    translation_cache._memory = None
+    started = time.perf_counter()
+    await translate(texts)
+    elapsed = time.perf_counter() - started
+    print(f"{name:24} {len(texts) / elapsed:9.1f} texts/s  "
+          f"{counters.requests:5d} requests  {len(texts) / counters.requests:6.1f} texts/request  "
+          f"{counters.tokens:7d} tokens  {counters.db_round_trips:5d} cache round-trips")
+
+
+async def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    gemini_latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    db_latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 5) / 1000
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ["TRANSLATION_CACHE_PERSIST"] = "1"
+    texts = [f"Hola, necesito información sobre el plan número {i}" for i in range(count)]
+
+    async def per_item(items):
+        for text in items:
+            await gemini_service.translate_to_english(text, "spanish")
+
+    async def batched(items):
+        await gemini_service.translate_many_to_english(items, "spanish")
+
+    print(f"{count} texts, Gemini {gemini_latency * 1000:.0f} ms, cache round-trip {db_latency * 1000:.0f} ms")
+    await _run("per-item loop", texts, per_item, gemini_latency, db_latency)
+    await _run("translate_many_to_english", texts, batched, gemini_latency, db_latency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
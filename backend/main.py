@@ -3,18 +3,39 @@ FastAPI Backend Server
 Multilingual Client Leads Management API
 """
 
+import os
+import json
+import uuid
+import base64
 import logging
-from typing import Optional
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, Optional
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-from services.gemini_service import detect_language, translate_to_english, translate_from_english
+from services.gemini_service import (
+    detect_and_translate, translate_to_english, translate_from_english,
+    init_client as init_gemini_client, close_client as close_gemini_client,
+    local_detection_threshold,
+)
+from services import email_outbox, event_bus, lead_counts, routing, tagging, translation_cache
+from services.circuit_breaker import get_breaker
+from services.env import env_int, env_number
+from services.rate_limiter import get_limiter
+from services.assignment import assign_agent, release_agents
+from services.language_detector import detect_language_local
+from services.bulk_import import UploadTooLargeError, get_job, max_bytes, parse_rows, start_job
+from services.lead_worker import start_workers, stop_workers, enqueue_lead, queue_depth, new_claim
 from services.supabase_service import (
-    insert_lead, get_all_leads, get_lead_count, update_lead_status,
-    get_lead_by_id, insert_reply, get_replies_for_lead,
+    insert_lead, get_all_leads, update_lead_status,
+    get_lead_by_id, insert_reply_with_email, get_replies_for_lead, get_replies_for_leads,
+    update_claimed_lead, bulk_update_leads, get_leads_changed_since, get_changes_horizon,
+    get_agents, close_supabase,
 )
 
 load_dotenv()
@@ -22,10 +43,29 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared clients and background workers on startup; close them on shutdown."""
+    init_gemini_client()
+    event_bus.add_listener(routing.on_event)
+    await routing.rebuild()
+    if _deferred_intake():
+        await start_workers(_complete_pending_lead)
+    if email_outbox.sender_enabled():
+        email_outbox.start_sender()
+    yield
+    await email_outbox.stop_sender()
+    await stop_workers()
+    await close_gemini_client()
+    await close_supabase()
+
+
 app = FastAPI(
     title="Multilingual Client Leads API",
     description="Backend API for managing multilingual client leads",
     version="0.3.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration — allow Next.js frontend
@@ -38,25 +78,27 @@ app.add_middleware(
 )
 
 
+def _deferred_intake() -> bool:
+    """True when LEAD_INTAKE_MODE=deferred (store first, translate in background)."""
+    return os.getenv("LEAD_INTAKE_MODE", "sync").lower() == "deferred"
+
+
 # ------------------------------------------------------------------ #
-#  Auto-assignment agents                                              #
+#  Tagging                                                             #
 # ------------------------------------------------------------------ #
 
-AGENTS = ["Agent A", "Agent B", "Agent C"]
-
+def tag_lead(message: str, translated_message: str = "") -> list[str]:
+    """
+    Tag a lead from its original message (any supported language).
 
-def tag_lead(translated_message: str) -> str:
-    """Derive a tag from the translated (English) message content."""
-    text = translated_message.lower()
-    if "price" in text or "cost" in text:
-        return "pricing"
-    if "demo" in text:
-        return "demo"
-    if "support" in text or "issue" in text:
-        return "support"
-    if "enterprise" in text:
-        return "enterprise"
-    return "general"
+    The English translation is only consulted when the original matches
+    nothing (e.g. a language without keyword rules). Returns every
+    matching tag, primary first, or just the default tag.
+    """
+    tags = tagging.tag_message(message)
+    if not tags and translated_message:
+        tags = tagging.tag_message(translated_message)
+    return tags or [tagging.default_tag()]
 
 
 # ------------------------------------------------------------------ #
@@ -85,6 +127,7 @@ class LeadResponse(BaseModel):
     confidence: str
     status: str
     tag: Optional[str] = None
+    tags: list[str] = []
     assigned_to: Optional[str] = None
 
 
@@ -94,21 +137,59 @@ class LeadsListResponse(BaseModel):
     total: int
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
 
 
 ALLOWED_STATUSES = ["New", "Contacted", "Qualified", "Lost", "Won"]
 
+# Columns selectable via GET /leads?fields=... (per view)
+LEAD_FIELDS = {
+    "id", "name", "email", "phone", "original_message", "translated_message",
+    "language", "tag", "status", "assigned_to", "created_at", "translation_status",
+    "updated_at", "tags",
+}
+SUMMARY_FIELDS = {
+    "id", "name", "email", "phone", "language", "tag", "status",
+    "assigned_to", "created_at", "original_preview", "translated_preview", "truncated",
+    "tags", "updated_at", "translation_status",
+}
+
 
 class StatusUpdate(BaseModel):
     """Payload for updating a lead's status."""
     status: str
 
 
+class LeadFilter(BaseModel):
+    """Equality filter selecting leads for a bulk update."""
+    status: Optional[str] = None
+    assigned_to: Optional[str] = None
+    language: Optional[str] = None
+    tag: Optional[str] = None
+
+
+class LeadChangesResponse(BaseModel):
+    """Response for delta sync: leads changed after a watermark."""
+    leads: list[dict]
+    watermark: Optional[str] = None
+    has_more: bool
+
+
+class BulkLeadUpdate(BaseModel):
+    """Payload for updating many leads: ids or a filter, plus the changes."""
+    ids: Optional[list[uuid.UUID]] = None
+    filter: Optional[LeadFilter] = None
+    status: Optional[str] = None
+    assigned_to: Optional[str] = None
+
+
 class ReplyRequest(BaseModel):
     """Payload for an agent reply."""
     message: str
     agent_email: str
     agent_name: str = ""
+    # Language the agent wrote in, if not English (e.g. a native speaker)
+    language: Optional[str] = None
 
 
 # ------------------------------------------------------------------ #
@@ -118,65 +199,142 @@ class ReplyRequest(BaseModel):
 @app.get("/")
 async def root():
     """Health check endpoint."""
-    return {"status": "API running"}
+    return {"status": "API running", "gemini_circuit": get_breaker().state}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime counters (translation cache, Gemini rate limiter and circuit)."""
+    return {
+        "translation_cache": translation_cache.get_stats(),
+        "gemini_rate_limiter": get_limiter().stats(),
+        "gemini_circuit": get_breaker().stats(),
+        "lead_queue_depth": queue_depth(),
+        "events": event_bus.stats(),
+        "email_outbox": email_outbox.stats(),
+        "tagging": tagging.stats(),
+        "routing": routing.stats(),
+    }
 
 
-@app.post("/leads", response_model=LeadResponse)
-async def create_lead(lead: LeadRequest):
+async def _detect_and_translate_lead(message: str, language_hint: str = "") -> dict[str, str]:
     """
-    Accept a new lead submission.
-
-    1. Validate input.
-    2. Detect the language of the message (Gemini AI).
-    3. Translate the message to English if needed.
-    4. Persist to Supabase.
-    5. Return the processed lead.
+    Detect the language of a lead message and translate it to English,
+    applying the frontend language hint when detection was inconclusive.
     """
-    logger.info("Received lead from %s (%s)", lead.name, lead.email)
-
-    # --- Validate basic fields ---
-    if not lead.name.strip():
-        raise HTTPException(status_code=422, detail="Name is required")
-    if not lead.message.strip():
-        raise HTTPException(status_code=422, detail="Message is required")
-
-    # --- Step 1: Detect language ---
-    detection = await detect_language(lead.message)
-    detected_lang = detection["detected_language"]
-    lang_code = detection["language_code"]
-    confidence = detection["confidence"]
+    # --- Steps 1-2: Detect language + translate (one Gemini call) ---
+    result = await detect_and_translate(message)
+    detected_lang = result["detected_language"]
+    lang_code = result["language_code"]
+    confidence = result["confidence"]
+    translated_message = result["translated_text"]
 
     # If frontend sent a language hint, use it ONLY when Gemini
     # defaulted to English with low confidence (i.e. couldn't detect).
     # If Gemini detected a non-English language, trust that result.
-    if lead.language and confidence == "low" and detected_lang == "english":
+    if language_hint and confidence == "low" and detected_lang == "english":
         from services.gemini_service import LANG_CODE_MAP
-        hint = LANG_CODE_MAP.get(lead.language, "")
+        hint = LANG_CODE_MAP.get(language_hint, "")
         if hint and hint != "english":
             detected_lang = hint
-            lang_code = lead.language
+            lang_code = language_hint
             confidence = "hint"
 
+            # The combined call treated the text as English, so
+            # translate again with the hinted source language.
+            translation = await translate_to_english(message, detected_lang)
+            translated_message = translation["translated_text"]
+
     logger.info("Detected language: %s (%s, confidence: %s)",
                 detected_lang, lang_code, confidence)
+    logger.info("Translation complete: %d → %d chars",
+                len(message), len(translated_message))
 
-    # --- Step 2: Translate to English ---
-    translation = await translate_to_english(lead.message, detected_lang)
-    translated_message = translation["translated_text"]
+    return {
+        "detected_language": detected_lang,
+        "language_code": lang_code,
+        "confidence": confidence,
+        "translated_message": translated_message,
+    }
 
-    logger.info("Translation complete: %d → %d chars",
-                len(lead.message), len(translated_message))
 
-    # --- Step 3: Auto-assignment (round-robin) ---
-    current_count = await get_lead_count()
-    agent_index = current_count % len(AGENTS)
-    assigned_to = AGENTS[agent_index]
-    logger.info("Auto-assigned to %s (index %d of %d leads)",
-                assigned_to, agent_index, current_count)
+async def _process_lead(message: str, language_hint: str = "") -> dict[str, Any]:
+    """
+    Detect, translate, assign and tag a lead message.
+
+    Shared by synchronous intake and the deferred background workers.
+    """
+    # --- Step 1: Keyword tagging on the original message ---
+    tags = tagging.tag_message(message)
 
-    # --- Step 4: Keyword-based tagging ---
-    tag = tag_lead(translated_message)
-    logger.info("Tagged lead as: %s", tag)
+    # --- Steps 2-3: Detect + translate ---
+    result = await _detect_and_translate_lead(message, language_hint)
+    # No keyword rule for this language: fall back to the English text
+    tags = tags or tag_lead(result["translated_message"])
+    logger.info("Tagged lead as: %s", ", ".join(tags))
+
+    # --- Step 4: Auto-assignment (least-loaded agent in the skill pool) ---
+    assigned_to = await assign_agent(result["detected_language"], tags[0])
+    logger.info("Auto-assigned to %s", assigned_to)
+
+    return {**result, "tag": tags[0], "tags": tags, "assigned_to": assigned_to}
+
+
+async def _complete_pending_lead(lead: dict) -> None:
+    """Background worker step: process a claimed lead and update its row."""
+    processed = await _process_lead(
+        lead.get("original_message", ""),
+        lead.get("language_hint", ""),
+    )
+    try:
+        updated = await update_claimed_lead(lead["id"], lead["claim_token"], {
+            "translated_message": processed["translated_message"],
+            "language": processed["detected_language"],
+            "tag": processed["tag"],
+            "tags": processed["tags"],
+            "assigned_to": processed["assigned_to"],
+            "translation_status": "done",
+            "processed_at": datetime.now(timezone.utc).isoformat(),
+        })
+    except RuntimeError:
+        await release_agents([processed["assigned_to"]])
+        raise
+    if updated is None:
+        # Lease expired and another worker owns the lead now
+        logger.warning("Lost claim on lead %s, discarding result", lead["id"])
+        await release_agents([processed["assigned_to"]])
+        return
+    event_bus.publish("lead.created", updated)
+    logger.info("Deferred processing complete for lead %s", lead["id"])
+
+
+@app.post("/leads", response_model=LeadResponse)
+async def create_lead(lead: LeadRequest):
+    """
+    Accept a new lead submission.
+
+    1. Validate input.
+    2. Detect the language and translate to English (one Gemini call).
+    3. Persist to Supabase.
+    4. Return the processed lead.
+
+    In deferred intake mode (LEAD_INTAKE_MODE=deferred) the lead is
+    persisted as 'pending' right away and 202 is returned with its id;
+    steps 2-3 run in the background lead workers.
+    """
+    logger.info("Received lead from %s (%s)", lead.name, lead.email)
+
+    # --- Validate basic fields ---
+    if not lead.name.strip():
+        raise HTTPException(status_code=422, detail="Name is required")
+    if not lead.message.strip():
+        raise HTTPException(status_code=422, detail="Message is required")
+
+    if _deferred_intake():
+        return await _create_lead_deferred(lead)
+
+    processed = await _process_lead(lead.message, lead.language)
+    translated_message = processed["translated_message"]
 
     # --- Step 5: Persist to Supabase ---
     lead_record = {
@@ -185,18 +343,22 @@ async def create_lead(lead: LeadRequest):
         "phone": lead.phone.strip(),
         "original_message": lead.message.strip(),
         "translated_message": translated_message,
-        "language": detected_lang,
-        "tag": tag,
+        "language": processed["detected_language"],
+        "tag": processed["tag"],
+        "tags": processed["tags"],
         "status": "New",
-        "assigned_to": assigned_to,
+        "assigned_to": processed["assigned_to"],
     }
 
     try:
         inserted = await insert_lead(lead_record)
         lead_id = inserted.get("id", "")
+        lead_counts.invalidate()
+        event_bus.publish("lead.created", inserted)
         logger.info("Lead persisted with id: %s", lead_id)
     except RuntimeError as exc:
         logger.error("Failed to persist lead: %s", exc)
+        await release_agents([processed["assigned_to"]])
         raise HTTPException(
             status_code=500,
             detail="Lead processed but failed to save. Please try again.",
@@ -210,46 +372,383 @@ async def create_lead(lead: LeadRequest):
         phone=lead.phone.strip(),
         original_message=lead.message.strip(),
         translated_message=translated_message,
-        detected_language=detected_lang,
-        language_code=lang_code,
-        confidence=confidence,
+        detected_language=processed["detected_language"],
+        language_code=processed["language_code"],
+        confidence=processed["confidence"],
         status="New",
-        tag=tag,
-        assigned_to=assigned_to,
+        tag=processed["tag"],
+        tags=processed["tags"],
+        assigned_to=processed["assigned_to"],
+    )
+
+
+async def _create_lead_deferred(lead: LeadRequest) -> JSONResponse:
+    """Persist the lead claimed by this process and hand it to the workers."""
+    # Tagging needs no translation, so pending rows are tagged right away
+    tags = tag_lead(lead.message)
+    lead_record = {
+        "name": lead.name.strip(),
+        "email": lead.email.strip(),
+        "phone": lead.phone.strip(),
+        "original_message": lead.message.strip(),
+        "language_hint": lead.language,
+        "tag": tags[0],
+        "tags": tags,
+        "status": "New",
+        **new_claim(),
+    }
+
+    try:
+        inserted = await insert_lead(lead_record)
+    except RuntimeError as exc:
+        logger.error("Failed to persist lead: %s", exc)
+        raise HTTPException(status_code=500, detail="Failed to save lead. Please try again.")
+
+    lead_id = inserted.get("id", "")
+    lead_counts.invalidate()
+    try:
+        enqueue_lead(inserted)
+    except RuntimeError as exc:
+        # The claim lapses after its lease and a poller picks the row up
+        logger.warning("Lead %s stored but not queued: %s", lead_id, exc)
+
+    logger.info("Lead %s accepted for deferred processing", lead_id)
+    return JSONResponse(
+        status_code=202,
+        content={"id": lead_id, "status": "New", "translation_status": "pending"},
     )
 
 
+MAX_UUID = str(uuid.UUID(int=(1 << 128) - 1))
+
+
+def _encode_cursor(lead: dict, key: str = "created_at") -> str:
+    """Opaque keyset cursor for the (*key*, id) position of *lead*."""
+    raw = json.dumps([lead.get(key, ""), lead.get("id", "")])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    """Inverse of _encode_cursor. Raises ValueError on malformed input."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    created_at, lead_id = json.loads(base64.urlsafe_b64decode(padded))
+    uuid.UUID(str(lead_id))
+    datetime.fromisoformat(str(created_at))
+    return str(created_at), str(lead_id)
+
+
 @app.get("/leads", response_model=LeadsListResponse)
 async def list_leads(
     limit: int = Query(default=50, ge=1, le=200, description="Max leads to return"),
     offset: int = Query(default=0, ge=0, description="Pagination offset"),
     status: Optional[str] = Query(default=None, description="Filter by status"),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor (next_cursor of the previous page)"),
+    count: str = Query(default="exact", pattern="^(exact|estimated)$", description="How `total` is computed"),
+    view: str = Query(default="full", pattern="^(full|summary)$", description="'summary' returns message previews"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated columns to return"),
+    include: Optional[str] = Query(default=None, pattern="^replies$", description="'replies' embeds each lead's replies"),
 ):
     """
     Retrieve all leads from the database.
 
     Supports pagination and optional status filtering.
     Results are ordered by created_at descending (newest first).
+
+    Pass the returned `next_cursor` as `cursor` for stable keyset
+    pagination on (created_at, id); `offset` remains available but
+    is ignored when a cursor is given.
+
+    `total` reflects the status filter; `count=estimated` returns the
+    planner's estimate instead of an exact count.
+
+    `view=summary` returns truncated message previews computed in the
+    database, and `fields=` limits the columns returned; full message
+    bodies are available from GET /leads/{id}.
+
+    `include=replies` embeds each lead's replies in the same query.
     """
+    columns = None
+    if fields:
+        allowed = SUMMARY_FIELDS if view == "summary" else LEAD_FIELDS
+        columns = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = sorted(set(columns) - allowed)
+        if unknown:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Unknown fields {unknown}. Allowed: {sorted(allowed)}",
+            )
+        # The keyset cursor needs both sort keys
+        columns += [c for c in ("id", "created_at") if c not in columns]
+
+    position = None
+    if cursor:
+        try:
+            position = _decode_cursor(cursor)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+
     try:
+        # Fetch one extra row to know whether another page exists
         leads = await get_all_leads(
-            limit=limit,
+            limit=limit + 1,
             offset=offset,
             status_filter=status,
+            cursor=position,
+            fields=columns,
+            summary=(view == "summary"),
+            include_replies=(include == "replies"),
         )
-        total = await get_lead_count()
+        total = await lead_counts.count_leads(status, estimated=(count == "estimated"))
+
+        next_cursor = None
+        if len(leads) > limit:
+            leads = leads[:limit]
+            next_cursor = _encode_cursor(leads[-1])
 
         return LeadsListResponse(
             leads=leads,
             total=total,
             limit=limit,
             offset=offset,
+            next_cursor=next_cursor,
         )
     except RuntimeError as exc:
         logger.error("Failed to list leads: %s", exc)
         raise HTTPException(status_code=500, detail="Failed to fetch leads")
 
 
+@app.get("/leads/counts")
+async def get_counts():
+    """Lead counts per status, language, tag and agent (cached aggregate)."""
+    try:
+        return await lead_counts.get_breakdown()
+    except RuntimeError as exc:
+        logger.error("Failed to fetch lead counts: %s", exc)
+        raise HTTPException(status_code=500, detail="Failed to fetch lead counts")
+
+
+@app.get("/agents")
+async def list_agents():
+    """Active agents with their current number of open (not Lost/Won) leads."""
+    try:
+        rows = await get_agents()
+        agents = [{"name": row["name"], "open_leads": row["open_leads"]} for row in rows]
+    except RuntimeError as exc:
+        logger.warning("Agents table unavailable, using routing index: %s", exc)
+        await routing.ensure_fresh()
+        agents = [
+            {"name": name, "open_leads": count}
+            for name, count in routing.index.snapshot().items()
+        ]
+    return {"agents": agents}
+
+
+@app.get("/events")
+async def stream_events(
+    request: Request,
+    agent: Optional[str] = Query(default=None, description="Only events for leads assigned to this agent"),
+    status: Optional[str] = Query(default=None, description="Only events for leads with this status"),
+    email: Optional[str] = Query(default=None, description="Only events for leads submitted from this email"),
+    last_event_id: Optional[str] = Query(default=None, description="Resume token (or Last-Event-ID header)"),
+):
+    """
+    Server-Sent Events stream of lead.created, leads.created (bulk
+    import), lead.status_changed, leads.updated (bulk) and reply.created
+    events. Filters don't apply to leads.updated, which lists the
+    changed ids; leads.created carries only the matching rows.
+
+    Reconnecting clients resume from the Last-Event-ID header (sent
+    automatically by EventSource); a `reset` event means events were
+    missed and the client should refetch.
+    """
+    resume = request.headers.get("last-event-id") or last_event_id
+
+    async def stream():
+        yield "retry: 5000\n\n"
+        async for event in event_bus.subscribe(resume, agent=agent, status=status, email=email):
+            if await request.is_disconnected():
+                break
+            if event["type"] == "heartbeat":
+                yield ": heartbeat\n\n"
+                continue
+            payload = json.dumps(event["data"], default=str)
+            yield f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/leads/bulk")
+async def create_leads_bulk(
+    request: Request,
+    wait: bool = Query(default=False, description="Wait for completion and return per-row results"),
+):
+    """
+    Import many leads at once.
+
+    Accepts a JSON array (application/json), NDJSON (application/x-ndjson)
+    or CSV with a header row (text/csv). Rows need name, email and
+    message; phone and language (hint code) are optional.
+
+    Returns 202 with a job id to poll via GET /leads/bulk/{job_id}, or
+    with `wait=true` the finished job including per-row results.
+    Bodies over BULK_MAX_BYTES are rejected with 413 while streaming.
+    """
+    content_type = request.headers.get("content-type", "application/json").lower()
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes():
+        raise HTTPException(status_code=413, detail=f"Upload too large (max {max_bytes()} bytes)")
+    try:
+        rows = await parse_rows(content_type, request.stream())
+    except UploadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if not rows:
+        raise HTTPException(status_code=422, detail="No leads in upload")
+
+    job, task = start_job(rows, _detect_and_translate_lead, tag_lead)
+    logger.info("Bulk import %s started with %d rows", job["job_id"], len(rows))
+
+    if wait:
+        await task
+        return job
+
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job["job_id"], "status": job["status"], "total": job["total"]},
+    )
+
+
+@app.get("/leads/bulk/{job_id}")
+async def get_bulk_job(job_id: str):
+    """Progress (and, once finished, per-row results) of a bulk import."""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Bulk job {job_id} not found")
+    return job
+
+
+@app.get("/leads/changes", response_model=LeadChangesResponse)
+async def list_lead_changes(
+    since: Optional[str] = Query(default=None, description="Watermark from a previous response"),
+    limit: int = Query(default=200, ge=1, le=1000, description="Max leads to return"),
+):
+    """
+    Delta sync: leads inserted or updated after the `since` watermark.
+
+    Pass the returned `watermark` as `since` next time; `has_more` means
+    another call will return more rows right away. `since=now` returns
+    no rows, just a watermark for "everything up to now" (fetch it
+    before a full GET /leads load). Rows younger than
+    CHANGES_SETTLE_SECONDS are held back so concurrent writes that
+    commit late are not skipped. Both bounds come from the database
+    clock, which is what stamps updated_at.
+    """
+    try:
+        until = await get_changes_horizon(env_number("CHANGES_SETTLE_SECONDS", 2))
+    except RuntimeError as exc:
+        logger.error("Failed to list lead changes: %s", exc)
+        raise HTTPException(status_code=500, detail="Failed to fetch lead changes")
+
+    if since == "now":
+        # Highest possible id: every row at or before `until` counts as seen
+        watermark = _encode_cursor({"updated_at": until, "id": MAX_UUID}, key="updated_at")
+        return LeadChangesResponse(leads=[], watermark=watermark, has_more=False)
+
+    position = None
+    if since:
+        try:
+            position = _decode_cursor(since)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=422, detail="Invalid watermark")
+
+    try:
+        leads = await get_leads_changed_since(position, until, limit=limit)
+    except RuntimeError as exc:
+        logger.error("Failed to list lead changes: %s", exc)
+        raise HTTPException(status_code=500, detail="Failed to fetch lead changes")
+
+    watermark = since
+    if leads:
+        last = leads[-1]
+        watermark = _encode_cursor(last, key="updated_at")
+    return LeadChangesResponse(leads=leads, watermark=watermark, has_more=len(leads) == limit)
+
+
+@app.get("/leads/{lead_id}")
+async def get_lead(lead_id: str):
+    """Retrieve a single lead, including full message bodies."""
+    lead = await get_lead_by_id(lead_id)
+    if not lead:
+        raise HTTPException(status_code=404, detail=f"Lead {lead_id} not found")
+    return lead
+
+
+@app.patch("/leads")
+async def patch_leads_bulk(body: BulkLeadUpdate):
+    """
+    Update the status and/or assignee of many leads at once.
+
+    Select leads either by `ids` or by `filter` (status, assigned_to,
+    language, tag). Changes are applied with chunked set-based updates.
+    Selections over BULK_UPDATE_MAX leads are rejected with 422 and
+    nothing is changed; narrow the filter and retry.
+    """
+    if (body.ids is None) == (body.filter is None):
+        raise HTTPException(status_code=422, detail="Provide exactly one of 'ids' or 'filter'")
+    if body.status is None and body.assigned_to is None:
+        raise HTTPException(status_code=422, detail="Nothing to update: set 'status' and/or 'assigned_to'")
+    if body.status is not None and body.status not in ALLOWED_STATUSES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid status '{body.status}'. Allowed: {ALLOWED_STATUSES}",
+        )
+    if body.assigned_to is not None:
+        agents = await routing.agent_names()
+        if body.assigned_to not in agents:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Unknown agent '{body.assigned_to}'. Allowed: {agents}",
+            )
+
+    max_rows = env_int("BULK_UPDATE_MAX", 10000)
+    filters = body.filter.model_dump(exclude_none=True) if body.filter else None
+    if body.filter and not filters:
+        raise HTTPException(status_code=422, detail="Filter must set at least one field")
+    if body.ids is not None:
+        ids = list(dict.fromkeys(str(lead_id) for lead_id in body.ids))
+        if len(ids) > max_rows:
+            raise HTTPException(status_code=422, detail=f"At most {max_rows} ids per request")
+    else:
+        ids = None
+
+    fields = body.model_dump(include={"status", "assigned_to"}, exclude_none=True)
+    try:
+        result = await bulk_update_leads(fields, ids=ids, filters=filters, max_rows=max_rows)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except RuntimeError as exc:
+        logger.error("Bulk lead update failed: %s", exc)
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    updated_ids = result["ids"]
+    lead_counts.invalidate()
+    if updated_ids:
+        # One event for the whole batch keeps subscriber queues and the
+        # replay buffer from overflowing on large updates
+        event_bus.publish("leads.updated", {"ids": updated_ids, **fields})
+    return {
+        "success": True,
+        "requested": result["requested"],
+        "updated": len(updated_ids),
+        "ids": updated_ids,
+    }
+
+
 @app.patch("/leads/{lead_id}")
 async def patch_lead_status(lead_id: str, body: StatusUpdate):
     """
@@ -265,6 +764,8 @@ async def patch_lead_status(lead_id: str, body: StatusUpdate):
 
     try:
         updated = await update_lead_status(lead_id, body.status)
+        lead_counts.invalidate()
+        event_bus.publish("lead.status_changed", updated)
         return {"success": True, "lead": updated}
     except RuntimeError as exc:
         logger.error("Failed to update lead %s: %s", lead_id, exc)
@@ -274,15 +775,33 @@ async def patch_lead_status(lead_id: str, body: StatusUpdate):
 #  Reply Endpoints                                                     #
 # ------------------------------------------------------------------ #
 
+def _written_in_client_language(body: ReplyRequest, client_language: str) -> bool:
+    """
+    True if the reply is already in *client_language*: the agent said
+    so, or the agent's profile lists the language and the local
+    detector confidently agrees.
+    """
+    if body.language:
+        return body.language.strip().lower() == client_language
+    agent = routing.index.agent_for_email(body.agent_email) or body.agent_name
+    if not routing.index.speaks(agent, client_language):
+        return False
+    detected, score = detect_language_local(body.message)
+    return detected == client_language and score >= local_detection_threshold()
+
+
 @app.post("/leads/{lead_id}/replies")
 async def create_reply(lead_id: str, body: ReplyRequest):
     """
     Agent sends a reply to a lead.
 
     1. Fetch the lead to get the client's language.
-    2. Translate the agent's English reply to the client's language.
-    3. Persist the reply.
-    4. Send email notification to the client.
+    2. Translate the agent's English reply to the client's language
+       (skipped when the agent wrote in that language already).
+    3. Persist the reply and queue the client's email notification
+       (one transaction).
+    4. Send the email now (EMAIL_DELIVERY=inline, default), or leave it
+       to the background sender.
     """
     if not body.message.strip():
         raise HTTPException(status_code=422, detail="Reply message is required")
@@ -299,12 +818,17 @@ async def create_reply(lead_id: str, body: ReplyRequest):
     logger.info("Agent %s replying to lead %s (language: %s)",
                 body.agent_email, lead_id, client_language)
 
-    # Translate English reply to client's language
-    translation = await translate_from_english(body.message, client_language)
-    translated_reply = translation["translated_text"]
+    if _written_in_client_language(body, client_language):
+        # Agent speaks the client's language: send the reply as written
+        translated_reply = body.message
+        logger.info("Reply already in %s — skipping translation", client_language)
+    else:
+        # Translate English reply to client's language
+        translation = await translate_from_english(body.message, client_language)
+        translated_reply = translation["translated_text"]
 
-    logger.info("Reply translated: EN → %s (%d chars → %d chars)",
-                client_language, len(body.message), len(translated_reply))
+        logger.info("Reply translated: EN → %s (%d chars → %d chars)",
+                    client_language, len(body.message), len(translated_reply))
 
     # Persist reply
     reply_record = {
@@ -316,96 +840,74 @@ async def create_reply(lead_id: str, body: ReplyRequest):
         "target_language": client_language,
     }
 
+    email = email_outbox.build_email(client_email, client_name, {
+        "agent_name": reply_record["agent_name"],
+        "original_reply": body.message,
+        "translated_reply": translated_reply,
+        "client_language": client_language,
+    })
+
     try:
-        inserted = await insert_reply(reply_record)
+        inserted = await insert_reply_with_email(reply_record, email)
     except RuntimeError as exc:
         logger.error("Failed to persist reply: %s", exc)
         raise HTTPException(status_code=500, detail="Failed to save reply")
 
-    # Send email notification (best-effort, don't block on failure)
-    try:
-        _send_reply_email(
-            to_email=client_email,
-            to_name=client_name,
-            agent_name=reply_record["agent_name"],
-            original_reply=body.message,
-            translated_reply=translated_reply,
-            client_language=client_language,
-        )
-    except Exception as exc:
-        logger.warning("Email send failed (non-blocking): %s", exc)
+    if email_outbox.delivery_mode() == "inline":
+        try:
+            await email_outbox.send_now(inserted["id"])
+        except RuntimeError as exc:
+            # The row stays in the outbox and goes out with the next drain
+            logger.warning("Inline email for reply %s failed: %s", inserted.get("id"), exc)
+    else:
+        email_outbox.notify()
+    event_bus.publish("reply.created", {
+        **inserted,
+        "assigned_to": lead.get("assigned_to"),
+        "status": lead.get("status"),
+        "email": lead.get("email"),
+    })
 
     return {"success": True, "reply": inserted}
 
 
-@app.get("/leads/{lead_id}/replies")
-async def list_replies(lead_id: str):
-    """Retrieve all replies for a given lead."""
-    replies = await get_replies_for_lead(lead_id)
-    return {"replies": replies}
-
-
-# ------------------------------------------------------------------ #
-#  Email helper                                                        #
-# ------------------------------------------------------------------ #
-
-def _send_reply_email(
-    to_email: str,
-    to_name: str,
-    agent_name: str,
-    original_reply: str,
-    translated_reply: str,
-    client_language: str,
-) -> None:
+@app.api_route("/email-outbox/drain", methods=["GET", "POST"])
+async def drain_email_outbox(request: Request):
     """
-    Send email notification to the client about the agent's reply.
-    Uses SMTP configuration from environment variables.
-    Falls back to logging if SMTP is not configured.
+    Deliver due outbox emails: retries, and any inline send that didn't
+    complete. Call it from a scheduler on deployments without the
+    background sender (Vercel Cron sends GET with
+    `Authorization: Bearer $CRON_SECRET`). If CRON_SECRET is set, other
+    callers get 401.
     """
-    import os
-    import smtplib
-    from email.mime.text import MIMEText
-    from email.mime.multipart import MIMEMultipart
-
-    smtp_host = os.getenv("SMTP_HOST", "")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    smtp_user = os.getenv("SMTP_USER", "")
-    smtp_pass = os.getenv("SMTP_PASS", "")
-    from_email = os.getenv("SMTP_FROM", smtp_user)
-
-    if not smtp_host or not smtp_user:
-        logger.info(
-            "SMTP not configured — email would be sent to %s:\n"
-            "  Agent: %s\n  Reply (EN): %s\n  Reply (%s): %s",
-            to_email, agent_name, original_reply,
-            client_language, translated_reply,
-        )
-        return
+    secret = os.getenv("CRON_SECRET", "")
+    if secret and request.headers.get("authorization") != f"Bearer {secret}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    try:
+        result = await email_outbox.drain()
+    except RuntimeError as exc:
+        logger.error("Outbox drain failed: %s", exc)
+        raise HTTPException(status_code=500, detail="Outbox drain failed")
+    return {"success": True, **result}
 
-    # Build HTML email
-    html_body = f"""
-    <div style="font-family: sans-serif; max-width: 600px; margin: auto;">
-        <h2 style="color: #4361ee;">New Reply from {agent_name}</h2>
-        <p>Hi {to_name},</p>
-        <div style="background: #f1f5f9; padding: 16px; border-radius: 8px; margin: 16px 0;">
-            <p style="margin: 0; font-size: 16px;">{translated_reply}</p>
-        </div>
-        <hr style="border: none; border-top: 1px solid #e2e8f0;" />
-        <p style="color: #94a3b8; font-size: 12px;">Original (English): {original_reply}</p>
-        <p style="color: #94a3b8; font-size: 12px;">— Multilingual Client Leads Manager</p>
-    </div>
-    """
 
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = f"Reply from {agent_name} — Multilingual Leads"
-    msg["From"] = from_email
-    msg["To"] = to_email
-    msg.attach(MIMEText(translated_reply, "plain"))
-    msg.attach(MIMEText(html_body, "html"))
+@app.get("/replies")
+async def list_replies_for_leads(
+    lead_ids: str = Query(..., description="Comma-separated lead ids"),
+):
+    """Retrieve replies for many leads at once, grouped by lead id."""
+    ids = list(dict.fromkeys(i.strip() for i in lead_ids.split(",") if i.strip()))
+    if len(ids) > 500:
+        raise HTTPException(status_code=422, detail="At most 500 lead ids per request")
+    try:
+        return {"replies": await get_replies_for_leads(ids)}
+    except RuntimeError as exc:
+        logger.error("Failed to list replies: %s", exc)
+        raise HTTPException(status_code=500, detail="Failed to fetch replies")
 
-    with smtplib.SMTP(smtp_host, smtp_port) as server:
-        server.starttls()
-        server.login(smtp_user, smtp_pass)
-        server.sendmail(from_email, to_email, msg.as_string())
 
-    logger.info("Reply email sent to %s", to_email)
+@app.get("/leads/{lead_id}/replies")
+async def list_replies(lead_id: str):
+    """Retrieve all replies for a given lead."""
+    replies = await get_replies_for_lead(lead_id)
+    return {"replies": replies}
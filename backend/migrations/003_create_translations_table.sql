@@ -0,0 +1,33 @@
+-- ============================================================
+-- Translations Table — Shared persistent translation cache
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- ============================================================
+
+-- Create translations table (keyed on a hash of
+-- model + source + target + normalized text)
+CREATE TABLE IF NOT EXISTS translations (
+    cache_key           TEXT PRIMARY KEY,
+    model               TEXT NOT NULL,
+    source_language     TEXT NOT NULL DEFAULT '',
+    target_language     TEXT NOT NULL,
+    translated_text     TEXT NOT NULL,
+    created_at          TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Index for pruning old entries
+CREATE INDEX IF NOT EXISTS idx_translations_created_at ON translations(created_at);
+
+-- Enable Row Level Security
+ALTER TABLE translations ENABLE ROW LEVEL SECURITY;
+
+-- Policy: Allow all operations via service key (backend)
+CREATE POLICY "Allow all for service role"
+    ON translations
+    FOR ALL
+    USING (true)
+    WITH CHECK (true);
+
+-- ============================================================
+-- Verify: Run this to check the table was created
+-- SELECT * FROM translations LIMIT 1;
+-- ============================================================
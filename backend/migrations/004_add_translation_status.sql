@@ -0,0 +1,21 @@
+-- ============================================================
+-- Deferred translation — status columns on leads
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- ============================================================
+
+-- 'pending' rows are processed by the background lead workers;
+-- existing and synchronously processed rows are 'done'.
+ALTER TABLE leads
+    ADD COLUMN IF NOT EXISTS translation_status TEXT NOT NULL DEFAULT 'done',
+    ADD COLUMN IF NOT EXISTS language_hint      TEXT NOT NULL DEFAULT '',
+    ADD COLUMN IF NOT EXISTS processed_at       TIMESTAMPTZ DEFAULT NULL;
+
+-- Partial index so re-queueing pending work at startup stays cheap
+CREATE INDEX IF NOT EXISTS idx_leads_translation_pending
+    ON leads (created_at)
+    WHERE translation_status = 'pending';
+
+-- ============================================================
+-- Verify: Run this to check the columns were added
+-- SELECT id, translation_status, language_hint FROM leads LIMIT 1;
+-- ============================================================
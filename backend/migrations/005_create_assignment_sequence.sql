@@ -0,0 +1,29 @@
+-- ============================================================
+-- Round-robin agent assignment — atomic O(1) allocator
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- ============================================================
+
+-- Monotonic counter; nextval() is atomic across concurrent sessions
+CREATE SEQUENCE IF NOT EXISTS lead_assignment_seq START 1;
+
+-- Continue the rotation from the existing number of leads
+SELECT setval(
+    'lead_assignment_seq',
+    GREATEST((SELECT COUNT(*) FROM leads), 1),
+    (SELECT COUNT(*) FROM leads) > 0
+);
+
+-- Return the next agent from the given list in one round-trip.
+-- Called by the backend via PostgREST RPC: POST /rpc/assign_next_agent
+CREATE OR REPLACE FUNCTION assign_next_agent(agents TEXT[])
+RETURNS TEXT
+LANGUAGE sql
+VOLATILE
+AS $$
+    SELECT agents[((nextval('lead_assignment_seq') - 1) % array_length(agents, 1)) + 1];
+$$;
+
+-- ============================================================
+-- Verify: Run this to check the function works
+-- SELECT assign_next_agent(ARRAY['Agent A', 'Agent B', 'Agent C']);
+-- ============================================================
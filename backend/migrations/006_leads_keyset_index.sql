@@ -0,0 +1,17 @@
+-- ============================================================
+-- Keyset pagination — composite (created_at, id) index on leads
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- ============================================================
+
+-- Serves ORDER BY created_at DESC, id DESC with a
+-- (created_at, id) < (cursor) predicate without scanning skipped rows
+CREATE INDEX IF NOT EXISTS idx_leads_created_at_id
+    ON leads (created_at DESC, id DESC);
+
+-- Superseded by the composite index above
+DROP INDEX IF EXISTS idx_leads_created_at;
+
+-- ============================================================
+-- Verify: Run this to check the index is used
+-- EXPLAIN SELECT * FROM leads ORDER BY created_at DESC, id DESC LIMIT 50;
+-- ============================================================
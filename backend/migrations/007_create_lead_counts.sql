@@ -0,0 +1,96 @@
+-- ============================================================
+-- Lead Counts — trigger-maintained aggregate table
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- ============================================================
+
+-- One row per (dimension, value), e.g. ('status', 'New') or ('all', '').
+-- Dimensions: all, status, language, tag, agent (assigned_to).
+CREATE TABLE IF NOT EXISTS lead_counts (
+    dimension   TEXT NOT NULL,
+    value       TEXT NOT NULL,
+    count       BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, value)
+);
+
+-- Add *delta* to one counter (NULL values are counted under '')
+CREATE OR REPLACE FUNCTION bump_lead_count(dim TEXT, val TEXT, delta BIGINT)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO lead_counts (dimension, value, count)
+    VALUES (dim, COALESCE(val, ''), delta)
+    ON CONFLICT (dimension, value)
+    DO UPDATE SET count = lead_counts.count + EXCLUDED.count;
+$$;
+
+CREATE OR REPLACE FUNCTION leads_count_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_lead_count('all', '', 1);
+        PERFORM bump_lead_count('status', NEW.status, 1);
+        PERFORM bump_lead_count('language', NEW.language, 1);
+        PERFORM bump_lead_count('tag', NEW.tag, 1);
+        PERFORM bump_lead_count('agent', NEW.assigned_to, 1);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_lead_count('all', '', -1);
+        PERFORM bump_lead_count('status', OLD.status, -1);
+        PERFORM bump_lead_count('language', OLD.language, -1);
+        PERFORM bump_lead_count('tag', OLD.tag, -1);
+        PERFORM bump_lead_count('agent', OLD.assigned_to, -1);
+    ELSE
+        IF NEW.status IS DISTINCT FROM OLD.status THEN
+            PERFORM bump_lead_count('status', OLD.status, -1);
+            PERFORM bump_lead_count('status', NEW.status, 1);
+        END IF;
+        IF NEW.language IS DISTINCT FROM OLD.language THEN
+            PERFORM bump_lead_count('language', OLD.language, -1);
+            PERFORM bump_lead_count('language', NEW.language, 1);
+        END IF;
+        IF NEW.tag IS DISTINCT FROM OLD.tag THEN
+            PERFORM bump_lead_count('tag', OLD.tag, -1);
+            PERFORM bump_lead_count('tag', NEW.tag, 1);
+        END IF;
+        IF NEW.assigned_to IS DISTINCT FROM OLD.assigned_to THEN
+            PERFORM bump_lead_count('agent', OLD.assigned_to, -1);
+            PERFORM bump_lead_count('agent', NEW.assigned_to, 1);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_leads_counts ON leads;
+CREATE TRIGGER trg_leads_counts
+    AFTER INSERT OR UPDATE OR DELETE ON leads
+    FOR EACH ROW EXECUTE FUNCTION leads_count_trigger();
+
+-- Backfill from existing rows
+TRUNCATE lead_counts;
+INSERT INTO lead_counts (dimension, value, count)
+    SELECT 'all', '', COUNT(*) FROM leads;
+INSERT INTO lead_counts (dimension, value, count)
+    SELECT 'status', status, COUNT(*) FROM leads GROUP BY status;
+INSERT INTO lead_counts (dimension, value, count)
+    SELECT 'language', language, COUNT(*) FROM leads GROUP BY language;
+INSERT INTO lead_counts (dimension, value, count)
+    SELECT 'tag', COALESCE(tag, ''), COUNT(*) FROM leads GROUP BY COALESCE(tag, '');
+INSERT INTO lead_counts (dimension, value, count)
+    SELECT 'agent', COALESCE(assigned_to, ''), COUNT(*) FROM leads GROUP BY COALESCE(assigned_to, '');
+
+-- Enable Row Level Security
+ALTER TABLE lead_counts ENABLE ROW LEVEL SECURITY;
+
+-- Policy: Allow all operations via service key (backend)
+CREATE POLICY "Allow all for service role"
+    ON lead_counts
+    FOR ALL
+    USING (true)
+    WITH CHECK (true);
+
+-- ============================================================
+-- Verify: Run this to check the counters
+-- SELECT * FROM lead_counts ORDER BY dimension, value;
+-- ============================================================
@@ -0,0 +1,30 @@
+-- ============================================================
+-- Leads Summary View — listing rows with truncated message previews
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- ============================================================
+
+-- Previews are computed in the database so list pages never ship
+-- full message bodies; fetch GET /leads/{id} for the full lead.
+CREATE OR REPLACE VIEW leads_summary
+WITH (security_invoker = true)
+AS
+SELECT
+    id,
+    name,
+    email,
+    phone,
+    language,
+    tag,
+    status,
+    assigned_to,
+    created_at,
+    LEFT(original_message, 160)         AS original_preview,
+    LEFT(translated_message, 160)       AS translated_preview,
+    LENGTH(original_message) > 160
+        OR LENGTH(translated_message) > 160 AS truncated
+FROM leads;
+
+-- ============================================================
+-- Verify: Run this to check the view
+-- SELECT * FROM leads_summary LIMIT 1;
+-- ============================================================
@@ -0,0 +1,21 @@
+-- ============================================================
+-- Bulk round-robin assignment — reserve N agents in one call
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- Requires 005_create_assignment_sequence.sql
+-- ============================================================
+
+-- Return the next *n* agents from the rotation, in order.
+-- Called by the backend via PostgREST RPC: POST /rpc/assign_next_agents
+CREATE OR REPLACE FUNCTION assign_next_agents(agents TEXT[], n INTEGER)
+RETURNS SETOF TEXT
+LANGUAGE sql
+VOLATILE
+AS $$
+    SELECT agents[((nextval('lead_assignment_seq') - 1) % array_length(agents, 1)) + 1]
+    FROM generate_series(1, n);
+$$;
+
+-- ============================================================
+-- Verify: Run this to check the function works
+-- SELECT * FROM assign_next_agents(ARRAY['Agent A', 'Agent B', 'Agent C'], 5);
+-- ============================================================
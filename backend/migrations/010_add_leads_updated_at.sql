@@ -0,0 +1,35 @@
+-- ============================================================
+-- Delta sync — updated_at watermark column on leads
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- ============================================================
+
+ALTER TABLE leads
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+-- Existing rows: last change is their creation
+UPDATE leads SET updated_at = created_at WHERE updated_at > created_at;
+
+-- Bump updated_at on every UPDATE (clock_timestamp, not the
+-- transaction start time, so long transactions don't backdate rows)
+CREATE OR REPLACE FUNCTION set_leads_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_leads_updated_at ON leads;
+CREATE TRIGGER trg_leads_updated_at
+    BEFORE UPDATE ON leads
+    FOR EACH ROW EXECUTE FUNCTION set_leads_updated_at();
+
+-- Serves GET /leads/changes: (updated_at, id) > watermark ORDER BY updated_at, id
+CREATE INDEX IF NOT EXISTS idx_leads_updated_at_id ON leads (updated_at, id);
+
+-- ============================================================
+-- Verify: Run this to check the column and index
+-- SELECT id, updated_at FROM leads ORDER BY updated_at DESC LIMIT 5;
+-- ============================================================
@@ -0,0 +1,94 @@
+-- ============================================================
+-- Email outbox — reply notifications delivered in the background
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- Requires 002_create_replies_table.sql
+-- ============================================================
+
+-- One row per email to send. Written in the same transaction as the
+-- reply (insert_reply_with_email) and drained by the backend sender.
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id               UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    reply_id         UUID REFERENCES replies(id) ON DELETE CASCADE,
+    to_email         TEXT NOT NULL,
+    to_name          TEXT NOT NULL DEFAULT '',
+    payload          JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status           TEXT NOT NULL DEFAULT 'pending'
+                     CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+    attempts         INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_error       TEXT,
+    created_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    sent_at          TIMESTAMPTZ
+);
+
+-- The sender only ever scans due work
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due
+    ON email_outbox (next_attempt_at)
+    WHERE status IN ('pending', 'sending');
+
+ALTER TABLE email_outbox ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow all for service role"
+    ON email_outbox
+    FOR ALL
+    USING (true)
+    WITH CHECK (true);
+
+-- Store a reply and its notification atomically.
+-- Called by the backend via PostgREST RPC: POST /rpc/insert_reply_with_email
+CREATE OR REPLACE FUNCTION insert_reply_with_email(reply JSONB, email JSONB)
+RETURNS SETOF replies
+LANGUAGE plpgsql
+VOLATILE
+AS $$
+DECLARE
+    inserted replies;
+BEGIN
+    INSERT INTO replies (lead_id, agent_email, agent_name, original_message,
+                         translated_message, target_language)
+    VALUES ((reply->>'lead_id')::uuid,
+            reply->>'agent_email',
+            COALESCE(reply->>'agent_name', ''),
+            reply->>'original_message',
+            COALESCE(reply->>'translated_message', ''),
+            COALESCE(reply->>'target_language', 'english'))
+    RETURNING * INTO inserted;
+
+    INSERT INTO email_outbox (reply_id, to_email, to_name, payload)
+    VALUES (inserted.id,
+            email->>'to_email',
+            COALESCE(email->>'to_name', ''),
+            COALESCE(email->'payload', '{}'::jsonb));
+
+    RETURN NEXT inserted;
+END;
+$$;
+
+-- Claim up to *batch_size* due emails for one sender. SKIP LOCKED keeps
+-- concurrent senders (several workers) from claiming the same rows; a
+-- claim that isn't settled within *lease_seconds* becomes due again.
+-- Called by the backend via PostgREST RPC: POST /rpc/claim_email_outbox
+CREATE OR REPLACE FUNCTION claim_email_outbox(batch_size INTEGER, lease_seconds INTEGER)
+RETURNS SETOF email_outbox
+LANGUAGE sql
+VOLATILE
+AS $$
+    UPDATE email_outbox AS o
+    SET status = 'sending',
+        attempts = o.attempts + 1,
+        next_attempt_at = NOW() + make_interval(secs => lease_seconds)
+    WHERE o.id IN (
+        SELECT id FROM email_outbox
+        WHERE status IN ('pending', 'sending') AND next_attempt_at <= NOW()
+        ORDER BY next_attempt_at
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING o.*;
+$$;
+
+-- ============================================================
+-- Verify: Run this to check the table and functions
+-- SELECT status, COUNT(*) FROM email_outbox GROUP BY status;
+-- SELECT * FROM claim_email_outbox(10, 60);
+-- ============================================================
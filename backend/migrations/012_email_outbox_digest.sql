@@ -0,0 +1,73 @@
+-- ============================================================
+-- Email outbox digests — coalesce rapid replies to one client
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- Requires 011_create_email_outbox.sql
+-- ============================================================
+
+-- New outbox rows are held for email->>'delay_seconds' (the digest
+-- window) so later replies to the same client can join them.
+CREATE OR REPLACE FUNCTION insert_reply_with_email(reply JSONB, email JSONB)
+RETURNS SETOF replies
+LANGUAGE plpgsql
+VOLATILE
+AS $$
+DECLARE
+    inserted replies;
+BEGIN
+    INSERT INTO replies (lead_id, agent_email, agent_name, original_message,
+                         translated_message, target_language)
+    VALUES ((reply->>'lead_id')::uuid,
+            reply->>'agent_email',
+            COALESCE(reply->>'agent_name', ''),
+            reply->>'original_message',
+            COALESCE(reply->>'translated_message', ''),
+            COALESCE(reply->>'target_language', 'english'))
+    RETURNING * INTO inserted;
+
+    INSERT INTO email_outbox (reply_id, to_email, to_name, payload, next_attempt_at)
+    VALUES (inserted.id,
+            email->>'to_email',
+            COALESCE(email->>'to_name', ''),
+            COALESCE(email->'payload', '{}'::jsonb),
+            NOW() + make_interval(secs => COALESCE((email->>'delay_seconds')::float, 0)));
+
+    RETURN NEXT inserted;
+END;
+$$;
+
+-- Claim due emails plus every not-yet-attempted email to the same
+-- recipients, so replies inside one digest window go out together.
+CREATE OR REPLACE FUNCTION claim_email_outbox(batch_size INTEGER, lease_seconds INTEGER)
+RETURNS SETOF email_outbox
+LANGUAGE sql
+VOLATILE
+AS $$
+    WITH due AS (
+        SELECT id, to_email FROM email_outbox
+        WHERE status IN ('pending', 'sending') AND next_attempt_at <= NOW()
+        ORDER BY next_attempt_at
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    ), joining AS (
+        SELECT id FROM email_outbox
+        WHERE status = 'pending' AND attempts = 0
+          AND to_email IN (SELECT to_email FROM due)
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE email_outbox AS o
+    SET status = 'sending',
+        attempts = o.attempts + 1,
+        next_attempt_at = NOW() + make_interval(secs => lease_seconds)
+    WHERE o.id IN (SELECT id FROM due UNION SELECT id FROM joining)
+    RETURNING o.*;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_email_outbox_pending_to
+    ON email_outbox (to_email)
+    WHERE status = 'pending';
+
+-- ============================================================
+-- Verify: Run this to check pending digests per recipient
+-- SELECT to_email, COUNT(*) FROM email_outbox
+-- WHERE status = 'pending' GROUP BY to_email ORDER BY 2 DESC;
+-- ============================================================
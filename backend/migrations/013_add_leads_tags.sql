@@ -0,0 +1,20 @@
+-- ============================================================
+-- Multi-label tagging — every matching tag on leads
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- ============================================================
+
+-- `tag` stays the primary (highest priority) tag; `tags` holds all
+-- matches from the tagging engine, primary first.
+ALTER TABLE leads
+    ADD COLUMN IF NOT EXISTS tags TEXT[] NOT NULL DEFAULT '{}';
+
+-- Existing rows: their single tag
+UPDATE leads SET tags = ARRAY[tag] WHERE tag IS NOT NULL AND tags = '{}';
+
+-- Serves "leads tagged X" lookups (tags @> ARRAY['pricing'])
+CREATE INDEX IF NOT EXISTS idx_leads_tags ON leads USING GIN (tags);
+
+-- ============================================================
+-- Verify: Run this to check the column was added
+-- SELECT id, tag, tags FROM leads LIMIT 5;
+-- ============================================================
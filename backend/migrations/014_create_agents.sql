@@ -0,0 +1,121 @@
+-- ============================================================
+-- Agents — routing roster with trigger-maintained open workload
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- ============================================================
+
+-- Replaces the hardcoded AGENTS list in the backend. `open_leads`
+-- counts this agent's leads not yet Lost/Won and is kept current by
+-- the trigger below, so every worker routes from the same numbers.
+CREATE TABLE IF NOT EXISTS agents (
+    id                UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    name              TEXT NOT NULL UNIQUE,
+    email             TEXT,
+    active            BOOLEAN NOT NULL DEFAULT TRUE,
+    open_leads        INTEGER NOT NULL DEFAULT 0,
+    last_assigned_at  TIMESTAMPTZ,
+    created_at        TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- The previous hardcoded roster
+INSERT INTO agents (name) VALUES ('Agent A'), ('Agent B'), ('Agent C')
+ON CONFLICT (name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION agents_open_leads_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.status IS NOT DISTINCT FROM OLD.status
+       AND NEW.assigned_to IS NOT DISTINCT FROM OLD.assigned_to THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status NOT IN ('Lost', 'Won') THEN
+        UPDATE agents SET open_leads = open_leads - 1 WHERE name = OLD.assigned_to;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status NOT IN ('Lost', 'Won') THEN
+        UPDATE agents SET open_leads = open_leads + 1 WHERE name = NEW.assigned_to;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_leads_agent_workload ON leads;
+CREATE TRIGGER trg_leads_agent_workload
+    AFTER INSERT OR UPDATE OR DELETE ON leads
+    FOR EACH ROW EXECUTE FUNCTION agents_open_leads_trigger();
+
+-- Backfill from existing rows
+UPDATE agents a SET open_leads = (
+    SELECT COUNT(*) FROM leads
+    WHERE assigned_to = a.name AND status NOT IN ('Lost', 'Won')
+);
+
+-- Serves the backend's startup rebuild of its open-lead index
+CREATE INDEX IF NOT EXISTS idx_leads_open_id
+    ON leads (id)
+    WHERE status IN ('New', 'Contacted', 'Qualified');
+
+ALTER TABLE agents ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow all for service role"
+    ON agents
+    FOR ALL
+    USING (true)
+    WITH CHECK (true);
+
+-- Pick *n* agents, each time the active agent with the fewest open
+-- leads (counting the ones picked earlier in this call); ties go to
+-- the agent assigned least recently. Locking the agent rows makes
+-- concurrent callers (several workers/instances) take turns.
+-- Called by the backend via PostgREST RPC: POST /rpc/assign_least_loaded
+CREATE OR REPLACE FUNCTION assign_least_loaded(n INTEGER DEFAULT 1)
+RETURNS SETOF TEXT
+LANGUAGE plpgsql
+VOLATILE
+AS $$
+DECLARE
+    names  TEXT[];
+    loads  INTEGER[];
+    turns  INTEGER[];
+    best   INTEGER;
+BEGIN
+    SELECT array_agg(name ORDER BY last_assigned_at NULLS FIRST, name),
+           array_agg(open_leads ORDER BY last_assigned_at NULLS FIRST, name)
+    INTO names, loads
+    FROM (
+        SELECT name, open_leads, last_assigned_at FROM agents
+        WHERE active
+        FOR UPDATE
+    ) a;
+
+    IF names IS NULL THEN
+        RETURN;
+    END IF;
+    turns := array_fill(0, ARRAY[array_length(names, 1)]);
+
+    FOR k IN 1..n LOOP
+        best := 1;
+        FOR i IN 2..array_length(names, 1) LOOP
+            IF loads[i] < loads[best]
+               OR (loads[i] = loads[best] AND turns[i] < turns[best]) THEN
+                best := i;
+            END IF;
+        END LOOP;
+        loads[best] := loads[best] + 1;
+        turns[best] := k;
+        RETURN NEXT names[best];
+    END LOOP;
+
+    -- Later turn → later timestamp, so the rotation carries over
+    UPDATE agents a SET last_assigned_at = clock_timestamp() + t.turn * INTERVAL '1 microsecond'
+    FROM unnest(names, turns) AS t(name, turn)
+    WHERE a.name = t.name AND t.turn > 0;
+END;
+$$;
+
+-- ============================================================
+-- Verify: Run this to check workloads and the allocator
+-- SELECT name, active, open_leads, last_assigned_at FROM agents ORDER BY name;
+-- SELECT * FROM assign_least_loaded(5);
+-- ============================================================
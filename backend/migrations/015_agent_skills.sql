@@ -0,0 +1,66 @@
+-- ============================================================
+-- Agent skills — language / tag aware routing
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- Requires 014_create_agents.sql
+-- ============================================================
+
+-- Languages use the backend's names ('arabic', 'chinese', ...); tags
+-- are tagging engine tags ('pricing', 'support', ...). Empty arrays:
+-- no particular language / a generalist for every tag.
+ALTER TABLE agents
+    ADD COLUMN IF NOT EXISTS languages TEXT[] NOT NULL DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS tags      TEXT[] NOT NULL DEFAULT '{}';
+
+-- Same allocator, restricted to *candidates* (the eligible pool the
+-- backend looked up for the lead's language and tag). NULL = everyone.
+DROP FUNCTION IF EXISTS assign_least_loaded(INTEGER);
+CREATE OR REPLACE FUNCTION assign_least_loaded(n INTEGER DEFAULT 1, candidates TEXT[] DEFAULT NULL)
+RETURNS SETOF TEXT
+LANGUAGE plpgsql
+VOLATILE
+AS $$
+DECLARE
+    names  TEXT[];
+    loads  INTEGER[];
+    turns  INTEGER[];
+    best   INTEGER;
+BEGIN
+    SELECT array_agg(name ORDER BY last_assigned_at NULLS FIRST, name),
+           array_agg(open_leads ORDER BY last_assigned_at NULLS FIRST, name)
+    INTO names, loads
+    FROM (
+        SELECT name, open_leads, last_assigned_at FROM agents
+        WHERE active AND (candidates IS NULL OR name = ANY(candidates))
+        FOR UPDATE
+    ) a;
+
+    IF names IS NULL THEN
+        RETURN;
+    END IF;
+    turns := array_fill(0, ARRAY[array_length(names, 1)]);
+
+    FOR k IN 1..n LOOP
+        best := 1;
+        FOR i IN 2..array_length(names, 1) LOOP
+            IF loads[i] < loads[best]
+               OR (loads[i] = loads[best] AND turns[i] < turns[best]) THEN
+                best := i;
+            END IF;
+        END LOOP;
+        loads[best] := loads[best] + 1;
+        turns[best] := k;
+        RETURN NEXT names[best];
+    END LOOP;
+
+    UPDATE agents a SET last_assigned_at = clock_timestamp() + t.turn * INTERVAL '1 microsecond'
+    FROM unnest(names, turns) AS t(name, turn)
+    WHERE a.name = t.name AND t.turn > 0;
+END;
+$$;
+
+-- ============================================================
+-- Verify: Run this to check profiles and a restricted allocation
+-- UPDATE agents SET languages = '{arabic,english}' WHERE name = 'Agent B';
+-- SELECT name, languages, tags, open_leads FROM agents ORDER BY name;
+-- SELECT * FROM assign_least_loaded(3, ARRAY['Agent B']);
+-- ============================================================
@@ -0,0 +1,53 @@
+-- ============================================================
+-- Deferred translation — claimable pending leads
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- Requires 004_add_translation_status.sql
+-- ============================================================
+
+-- A worker owns a lead while translation_status = 'processing' and its
+-- claim_token matches; the claim lapses at next_attempt_at (the lease),
+-- after which any worker may take it again. Failed attempts go back to
+-- 'pending' with a later next_attempt_at.
+ALTER TABLE leads
+    ADD COLUMN IF NOT EXISTS claim_token      UUID DEFAULT NULL,
+    ADD COLUMN IF NOT EXISTS claimed_at       TIMESTAMPTZ DEFAULT NULL,
+    ADD COLUMN IF NOT EXISTS attempts         INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS next_attempt_at  TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+-- Workers only ever scan due, unfinished work
+DROP INDEX IF EXISTS idx_leads_translation_pending;
+CREATE INDEX IF NOT EXISTS idx_leads_translation_due
+    ON leads (next_attempt_at)
+    WHERE translation_status IN ('pending', 'processing');
+
+-- Claim up to *batch_size* due leads for one worker pool. SKIP LOCKED
+-- keeps concurrent processes from claiming the same rows; a claim that
+-- isn't settled within *lease_seconds* becomes due again.
+-- Called by the backend via PostgREST RPC: POST /rpc/claim_pending_leads
+CREATE OR REPLACE FUNCTION claim_pending_leads(batch_size INTEGER, lease_seconds INTEGER)
+RETURNS SETOF leads
+LANGUAGE sql
+VOLATILE
+AS $$
+    UPDATE leads AS l
+    SET translation_status = 'processing',
+        claim_token = uuid_generate_v4(),
+        claimed_at = NOW(),
+        attempts = l.attempts + 1,
+        next_attempt_at = NOW() + make_interval(secs => lease_seconds)
+    WHERE l.id IN (
+        SELECT id FROM leads
+        WHERE translation_status IN ('pending', 'processing')
+          AND next_attempt_at <= NOW()
+        ORDER BY next_attempt_at
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING l.*;
+$$;
+
+-- ============================================================
+-- Verify: Run this to check the columns and function
+-- SELECT translation_status, COUNT(*) FROM leads GROUP BY translation_status;
+-- SELECT id, attempts, next_attempt_at FROM claim_pending_leads(10, 60);
+-- ============================================================
@@ -0,0 +1,22 @@
+-- ============================================================
+-- Delta sync — watermark horizon from the database clock
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- Requires 010_add_leads_updated_at.sql
+-- ============================================================
+
+-- updated_at is stamped with the database clock (clock_timestamp() in
+-- set_leads_updated_at), so GET /leads/changes takes its "up to now"
+-- bound from the same clock instead of the app server's.
+-- Called by the backend via PostgREST RPC: POST /rpc/leads_changes_horizon
+CREATE OR REPLACE FUNCTION leads_changes_horizon(settle_seconds DOUBLE PRECISION DEFAULT 0)
+RETURNS TIMESTAMPTZ
+LANGUAGE sql
+VOLATILE
+AS $$
+    SELECT clock_timestamp() - make_interval(secs => settle_seconds);
+$$;
+
+-- ============================================================
+-- Verify: Run this to check the function
+-- SELECT leads_changes_horizon(2), NOW();
+-- ============================================================
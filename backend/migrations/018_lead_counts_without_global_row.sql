@@ -0,0 +1,47 @@
+-- ============================================================
+-- Lead Counts — drop the global counter, one upsert per write
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- Requires 007_create_lead_counts.sql
+-- ============================================================
+
+-- Every insert used to bump ('all', '') as well, so all concurrent
+-- inserts serialized on that one row lock. The total is now the sum of
+-- the per-status rows (computed by the backend), and each write applies
+-- all of its counter deltas in a single INSERT … ON CONFLICT, touching
+-- the rows in (dimension, value) order so concurrent writers can't
+-- deadlock on each other.
+CREATE OR REPLACE FUNCTION leads_count_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO lead_counts (dimension, value, count)
+    SELECT d.dim, d.val, SUM(d.delta)
+    FROM (
+        SELECT 'status' AS dim, COALESCE(OLD.status, '') AS val, -1 AS delta WHERE TG_OP <> 'INSERT'
+        UNION ALL SELECT 'language', COALESCE(OLD.language, ''), -1 WHERE TG_OP <> 'INSERT'
+        UNION ALL SELECT 'tag', COALESCE(OLD.tag, ''), -1 WHERE TG_OP <> 'INSERT'
+        UNION ALL SELECT 'agent', COALESCE(OLD.assigned_to, ''), -1 WHERE TG_OP <> 'INSERT'
+        UNION ALL SELECT 'status', COALESCE(NEW.status, ''), 1 WHERE TG_OP <> 'DELETE'
+        UNION ALL SELECT 'language', COALESCE(NEW.language, ''), 1 WHERE TG_OP <> 'DELETE'
+        UNION ALL SELECT 'tag', COALESCE(NEW.tag, ''), 1 WHERE TG_OP <> 'DELETE'
+        UNION ALL SELECT 'agent', COALESCE(NEW.assigned_to, ''), 1 WHERE TG_OP <> 'DELETE'
+    ) AS d
+    GROUP BY d.dim, d.val
+    -- Unchanged columns on UPDATE cancel out and touch no row
+    HAVING SUM(d.delta) <> 0
+    ORDER BY d.dim, d.val
+    ON CONFLICT (dimension, value)
+    DO UPDATE SET count = lead_counts.count + EXCLUDED.count;
+    RETURN NULL;
+END;
+$$;
+
+-- The total is derived from the status rows now
+DELETE FROM lead_counts WHERE dimension = 'all';
+
+-- ============================================================
+-- Verify: the status rows add up to the table size
+-- SELECT (SELECT SUM(count) FROM lead_counts WHERE dimension = 'status') AS counted,
+--        (SELECT COUNT(*) FROM leads) AS actual;
+-- ============================================================
@@ -0,0 +1,36 @@
+-- ============================================================
+-- Leads Summary View — tags, updated_at and translation status
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- Requires 004, 008, 010 and 013
+-- ============================================================
+
+-- Summary rows now carry what the dashboards need to merge delta-sync
+-- updates and show the translation badge and tag chips without
+-- falling back to view=full. CREATE OR REPLACE VIEW can only add
+-- columns at the end, so the existing order is kept.
+CREATE OR REPLACE VIEW leads_summary
+WITH (security_invoker = true)
+AS
+SELECT
+    id,
+    name,
+    email,
+    phone,
+    language,
+    tag,
+    status,
+    assigned_to,
+    created_at,
+    LEFT(original_message, 160)         AS original_preview,
+    LEFT(translated_message, 160)       AS translated_preview,
+    LENGTH(original_message) > 160
+        OR LENGTH(translated_message) > 160 AS truncated,
+    tags,
+    updated_at,
+    translation_status
+FROM leads;
+
+-- ============================================================
+-- Verify: Run this to check the new columns
+-- SELECT id, tags, updated_at, translation_status FROM leads_summary LIMIT 1;
+-- ============================================================
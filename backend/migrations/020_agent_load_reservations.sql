@@ -0,0 +1,126 @@
+-- ============================================================
+-- Agents — assign_least_loaded reserves the slots it hands out
+-- Run this in Supabase SQL Editor (Dashboard → SQL Editor)
+-- Requires 014_create_agents.sql and 015_agent_skills.sql
+-- ============================================================
+
+-- assign_least_loaded used to pick by open_leads without changing it,
+-- so until the lead row was written, another worker's call saw the
+-- same loads and picked the same agent. The RPC now adds its picks to
+-- open_leads right away and records them in reserved_leads. When a
+-- lead later becomes open for that agent, the trigger consumes one
+-- reservation instead of counting the lead a second time.
+ALTER TABLE agents
+    ADD COLUMN IF NOT EXISTS reserved_leads INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION agents_open_leads_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    old_agent TEXT;
+    new_agent TEXT;
+BEGIN
+    -- The agent the lead counted against before / after (NULL: closed)
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status NOT IN ('Lost', 'Won') THEN
+        old_agent := OLD.assigned_to;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status NOT IN ('Lost', 'Won') THEN
+        new_agent := NEW.assigned_to;
+    END IF;
+    IF old_agent IS NOT DISTINCT FROM new_agent THEN
+        RETURN NULL;
+    END IF;
+
+    IF old_agent IS NOT NULL THEN
+        UPDATE agents SET open_leads = open_leads - 1 WHERE name = old_agent;
+    END IF;
+    IF new_agent IS NOT NULL THEN
+        UPDATE agents SET reserved_leads = reserved_leads - 1
+        WHERE name = new_agent AND reserved_leads > 0;
+        IF NOT FOUND THEN
+            UPDATE agents SET open_leads = open_leads + 1 WHERE name = new_agent;
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION assign_least_loaded(n INTEGER DEFAULT 1, candidates TEXT[] DEFAULT NULL)
+RETURNS SETOF TEXT
+LANGUAGE plpgsql
+VOLATILE
+AS $$
+DECLARE
+    names  TEXT[];
+    loads  INTEGER[];
+    turns  INTEGER[];
+    picks  INTEGER[];
+    best   INTEGER;
+BEGIN
+    SELECT array_agg(name ORDER BY last_assigned_at NULLS FIRST, name),
+           array_agg(open_leads ORDER BY last_assigned_at NULLS FIRST, name)
+    INTO names, loads
+    FROM (
+        SELECT name, open_leads, last_assigned_at FROM agents
+        WHERE active AND (candidates IS NULL OR name = ANY(candidates))
+        FOR UPDATE
+    ) a;
+
+    IF names IS NULL THEN
+        RETURN;
+    END IF;
+    turns := array_fill(0, ARRAY[array_length(names, 1)]);
+    picks := array_fill(0, ARRAY[array_length(names, 1)]);
+
+    FOR k IN 1..n LOOP
+        best := 1;
+        FOR i IN 2..array_length(names, 1) LOOP
+            IF loads[i] < loads[best]
+               OR (loads[i] = loads[best] AND turns[i] < turns[best]) THEN
+                best := i;
+            END IF;
+        END LOOP;
+        loads[best] := loads[best] + 1;
+        turns[best] := k;
+        picks[best] := picks[best] + 1;
+        RETURN NEXT names[best];
+    END LOOP;
+
+    -- Reserve the picks under the same row locks, so the next caller
+    -- already sees them in open_leads
+    UPDATE agents a
+    SET open_leads = a.open_leads + t.picked,
+        reserved_leads = a.reserved_leads + t.picked,
+        last_assigned_at = clock_timestamp() + t.turn * INTERVAL '1 microsecond'
+    FROM unnest(names, turns, picks) AS t(name, turn, picked)
+    WHERE a.name = t.name AND t.picked > 0;
+END;
+$$;
+
+-- Give back reservations whose lead was never written (insert failed,
+-- claim lost). One array element per reserved slot.
+-- Called by the backend via PostgREST RPC: POST /rpc/release_agent_reservations
+CREATE OR REPLACE FUNCTION release_agent_reservations(names TEXT[])
+RETURNS VOID
+LANGUAGE sql
+VOLATILE
+AS $$
+    UPDATE agents a
+    SET open_leads = a.open_leads - LEAST(a.reserved_leads, t.n),
+        reserved_leads = a.reserved_leads - LEAST(a.reserved_leads, t.n)
+    FROM (SELECT name, COUNT(*)::INTEGER AS n FROM unnest(names) AS name GROUP BY name) t
+    WHERE a.name = t.name;
+$$;
+
+-- ============================================================
+-- Verify: reservations show up in open_leads until the lead lands
+-- SELECT * FROM assign_least_loaded(2);
+-- SELECT name, open_leads, reserved_leads FROM agents ORDER BY name;
+--
+-- Repair drift (e.g. a process died between reserving and writing);
+-- run while no leads are being assigned:
+-- UPDATE agents a SET reserved_leads = 0, open_leads = (
+--     SELECT COUNT(*) FROM leads
+--     WHERE assigned_to = a.name AND status NOT IN ('Lost', 'Won'));
+-- ============================================================
@@ -0,0 +1,84 @@
+"""
+Assignment Service — Skill-aware, least-loaded agent allocation
+
+Each lead is routed to the pool of agents eligible for its language
+and tag (services/routing.py), and within that pool to the agent with
+the fewest open (not Lost/Won) leads; ties go to whoever was assigned
+least recently, so equally loaded agents still rotate. Two modes
+(ASSIGNMENT_MODE):
+  - "db"    (default) one atomic RPC (assign_least_loaded) per pool over
+            the trigger-maintained per-agent counts, so every
+            worker/instance makes consistent decisions. The RPC reserves
+            each pick in the counts right away; callers whose lead is
+            then not written hand the slot back with release_agents().
+  - "local" the in-process heap index from services/routing.py; for a
+            local backend with a single worker.
+
+If the RPC fails, the local index is used for those leads so intake
+never blocks on assignment. Returns None only when no agent is active.
+"""
+
+import logging
+
+from services import routing
+from services.supabase_service import assign_least_loaded, release_agent_reservations
+
+logger = logging.getLogger(__name__)
+
+
+def _mode() -> str:
+    return routing.assignment_mode()
+
+
+async def assign_agent(language: str = "", tag: str = "") -> str | None:
+    """Return the least-loaded agent eligible for a *language* lead tagged *tag*."""
+    return (await assign_agents([(language, tag)]))[0]
+
+
+async def assign_agents(leads: list[tuple[str, str]]) -> list[str | None]:
+    """
+    Assign agents to many leads given as (language, tag) pairs.
+
+    In db mode this makes one RPC per distinct eligible pool.
+    """
+    if not leads:
+        return []
+    await routing.ensure_fresh()
+    pools = [routing.index.route(language, tag) for language, tag in leads]
+    if _mode() == "local":
+        return [routing.index.take(pool) for pool in pools]
+
+    positions: dict[routing.Pool, list[int]] = {}
+    for i, pool in enumerate(pools):
+        positions.setdefault(pool, []).append(i)
+
+    everyone = routing.index.route()
+    assigned: list[str | None] = [None] * len(leads)
+    for pool, indexes in positions.items():
+        try:
+            # The general pool is left open so agents added since the
+            # last index rebuild are included
+            agents = await assign_least_loaded(
+                len(indexes), None if pool == everyone else list(pool),
+            )
+        except RuntimeError as exc:
+            logger.warning("Falling back to in-process assignment: %s", exc)
+            agents = [routing.index.take(pool) for _ in indexes]
+        for i, agent in zip(indexes, agents):
+            assigned[i] = agent
+    return assigned
+
+
+async def release_agents(agents: list[str | None]) -> None:
+    """
+    Give back db-mode reservations for leads that were assigned but not
+    written (failed insert, lost claim). Failures are only logged: the
+    slot then stays counted until the agents' loads are reconciled.
+    """
+    names = [agent for agent in agents if agent]
+    if not names or _mode() == "local":
+        return
+    try:
+        await release_agent_reservations(names)
+    except RuntimeError as exc:
+        logger.warning("Could not release %d agent reservations: %s", len(names), exc)
@@ -0,0 +1,311 @@
+"""
+Bulk Import — Parse, translate and store many leads per request
+
+Used by POST /leads/bulk:
+  1. Parse rows from a JSON array, NDJSON stream or CSV upload.
+  2. Validate rows and deduplicate (message, language hint) pairs.
+  3. Detect + translate each unique message through a bounded
+     concurrent pipeline (BULK_CONCURRENCY).
+  4. Tag, reserve agents (one call per language/tag pool), and write
+     rows with chunked multi-row inserts.
+  5. Publish one leads.created event ({"ids", "leads"}) for the job.
+
+Each import is tracked as an in-process job so clients can poll progress.
+Uploads are capped at BULK_MAX_BYTES while the body streams in, so an
+oversized upload is rejected before it is buffered or parsed.
+"""
+
+import io
+import csv
+import json
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from services import event_bus, lead_counts
+from services.assignment import assign_agents, release_agents
+from services.env import env_int
+from services.supabase_service import PartialInsertError, insert_leads
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ("name", "email", "message")
+MAX_JOBS = 100
+
+Translator = Callable[[str, str], Awaitable[dict[str, str]]]
+Tagger = Callable[[str, str], list[str]]
+
+
+class UploadTooLargeError(ValueError):
+    """The upload body exceeds BULK_MAX_BYTES."""
+
+
+def max_rows() -> int:
+    """Maximum rows accepted per bulk import."""
+    return env_int("BULK_MAX_ROWS", 10000)
+
+
+def max_bytes() -> int:
+    """Maximum upload body size per bulk import."""
+    return env_int("BULK_MAX_BYTES", 10 * 1024 * 1024)
+
+
+# ------------------------------------------------------------------ #
+#  Parsing                                                             #
+# ------------------------------------------------------------------ #
+
+async def _limit_bytes(chunks: AsyncIterator[bytes], limit: int) -> AsyncIterator[bytes]:
+    """Pass chunks through, raising UploadTooLargeError past *limit* bytes."""
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > limit:
+            raise UploadTooLargeError(f"Upload too large (max {limit} bytes)")
+        yield chunk
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Yield decoded lines from a byte stream as they arrive."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def parse_rows(content_type: str, chunks: AsyncIterator[bytes]) -> list[dict[str, Any]]:
+    """
+    Parse an upload into row dicts.
+
+    NDJSON is parsed line by line as the body streams in; CSV (with a
+    header row) and JSON arrays are parsed once the body is complete.
+    Every format stops reading once the body exceeds BULK_MAX_BYTES.
+
+    Raises:
+        UploadTooLargeError: If the body exceeds BULK_MAX_BYTES.
+        ValueError: On malformed input or too many rows.
+    """
+    limit = max_rows()
+    rows: list[dict[str, Any]] = []
+    chunks = _limit_bytes(chunks, max_bytes())
+
+    if "ndjson" in content_type or "jsonl" in content_type:
+        async for line in _iter_lines(chunks):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                raise ValueError(f"Invalid NDJSON on row {len(rows)}: {exc}") from exc
+            rows.append(row if isinstance(row, dict) else {})
+            if len(rows) > limit:
+                raise ValueError(f"Too many rows (max {limit})")
+        return rows
+
+    body = b"".join([chunk async for chunk in chunks])
+
+    if "csv" in content_type:
+        reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+        for row in reader:
+            rows.append(dict(row))
+            if len(rows) > limit:
+                raise ValueError(f"Too many rows (max {limit})")
+    else:
+        try:
+            data = json.loads(body or b"[]")
+        except ValueError as exc:
+            raise ValueError(f"Invalid JSON: {exc}") from exc
+        if isinstance(data, dict):
+            data = data.get("leads", [])
+        if not isinstance(data, list):
+            raise ValueError("Expected a JSON array of leads")
+        rows = [row if isinstance(row, dict) else {} for row in data]
+
+    if len(rows) > limit:
+        raise ValueError(f"Too many rows (max {limit})")
+    return rows
+
+
+def _clean_row(row: dict[str, Any]) -> dict[str, str]:
+    """Normalize a row to stripped strings. Raises ValueError if invalid."""
+    cleaned = {
+        key: str(row.get(key) or "").strip()
+        for key in ("name", "email", "phone", "message", "language")
+    }
+    missing = [field for field in REQUIRED_FIELDS if not cleaned[field]]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)}")
+    return cleaned
+
+
+# ------------------------------------------------------------------ #
+#  Jobs                                                                #
+# ------------------------------------------------------------------ #
+
+_jobs: OrderedDict[str, dict[str, Any]] = OrderedDict()
+_tasks: set[asyncio.Task[dict[str, Any]]] = set()  # keep running jobs referenced
+
+
+def create_job(total: int) -> dict[str, Any]:
+    """Register a new import job (oldest jobs are forgotten past MAX_JOBS)."""
+    job = {
+        "job_id": str(uuid.uuid4()),
+        "status": "running",
+        "total": total,
+        "translated": 0,
+        "inserted": 0,
+        "failed": 0,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "results": [],
+    }
+    _jobs[job["job_id"]] = job
+    while len(_jobs) > MAX_JOBS:
+        _jobs.popitem(last=False)
+    return job
+
+
+def get_job(job_id: str) -> dict[str, Any] | None:
+    """Return a job by id, or None if unknown / expired."""
+    return _jobs.get(job_id)
+
+
+# ------------------------------------------------------------------ #
+#  Pipeline                                                            #
+# ------------------------------------------------------------------ #
+
+async def run_job(
+    job: dict[str, Any],
+    rows: list[dict[str, Any]],
+    translate: Translator,
+    tag: Tagger,
+) -> dict[str, Any]:
+    """
+    Process *rows* for *job* and fill in per-row results.
+
+    Args:
+        translate: (message, language_hint) → detection/translation result
+                   with detected_language and translated_message.
+        tag:       (original message, English text) → tags, primary first.
+    """
+    results: list[dict[str, Any]] = [{"row": i} for i in range(len(rows))]
+    valid: list[tuple[int, dict[str, str]]] = []
+
+    for i, row in enumerate(rows):
+        try:
+            valid.append((i, _clean_row(row)))
+        except ValueError as exc:
+            results[i].update(status="error", error=str(exc))
+            job["failed"] += 1
+
+    # --- Detect + translate each unique message once ---
+    keys = list(dict.fromkeys((row["message"], row["language"]) for _, row in valid))
+    occurrences: dict[tuple[str, str], int] = {}
+    for _, row in valid:
+        key = (row["message"], row["language"])
+        occurrences[key] = occurrences.get(key, 0) + 1
+
+    semaphore = asyncio.Semaphore(max(1, env_int("BULK_CONCURRENCY", 8)))
+
+    async def work(key: tuple[str, str]) -> dict[str, str]:
+        async with semaphore:
+            processed = await translate(*key)
+        job["translated"] += occurrences[key]
+        return processed
+
+    logger.info("Bulk job %s: %d rows, %d unique messages",
+                job["job_id"], len(valid), len(keys))
+    translated = dict(zip(keys, await asyncio.gather(*(work(k) for k in keys))))
+
+    # --- Tag, route and build records ---
+    records = []
+    for _, row in valid:
+        processed = translated[(row["message"], row["language"])]
+        tags = tag(row["message"], processed["translated_message"])
+        records.append({
+            "name": row["name"],
+            "email": row["email"],
+            "phone": row["phone"],
+            "original_message": row["message"],
+            "translated_message": processed["translated_message"],
+            "language": processed["detected_language"],
+            "tag": tags[0],
+            "tags": tags,
+            "status": "New",
+        })
+
+    assigned = await assign_agents([(r["language"], r["tag"]) for r in records])
+    for record, agent in zip(records, assigned):
+        record["assigned_to"] = agent
+
+    # --- Persist in chunks ---
+    try:
+        inserted = await insert_leads(records, chunk_size=env_int("BULK_INSERT_CHUNK", 500))
+    except PartialInsertError as exc:
+        # Rows from chunks committed before the failure are real leads
+        inserted = exc.inserted
+        job["status"] = "failed"
+        job["error"] = str(exc)
+        await release_agents([r["assigned_to"] for r in records[len(inserted):]])
+
+    created = []
+    for n, (i, _) in enumerate(valid):
+        if n < len(inserted):
+            row = inserted[n]
+            results[i].update(
+                status="created",
+                id=row.get("id", ""),
+                language=row.get("language", ""),
+                tag=row.get("tag"),
+                tags=row.get("tags", []),
+                assigned_to=row.get("assigned_to"),
+            )
+            job["inserted"] += 1
+            created.append(row)
+        else:
+            results[i].update(status="error", error="Failed to save lead")
+            job["failed"] += 1
+
+    if created:
+        # One event per import instead of one per row
+        event_bus.publish("leads.created", {
+            "ids": [row.get("id", "") for row in created],
+            "leads": created,
+        })
+
+    job["results"] = results
+    if job["status"] == "running":
+        job["status"] = "done"
+    logger.info("Bulk job %s %s: %d inserted, %d failed",
+                job["job_id"], job["status"], job["inserted"], job["failed"])
+    return job
+
+
+def start_job(
+    rows: list[dict[str, Any]],
+    translate: Translator,
+    tag: Tagger,
+) -> tuple[dict[str, Any], asyncio.Task[dict[str, Any]]]:
+    """Create a job and run it in the background; returns (job, task)."""
+    job = create_job(len(rows))
+
+    async def run() -> dict[str, Any]:
+        try:
+            return await run_job(job, rows, translate, tag)
+        except Exception as exc:
+            logger.error("Bulk job %s crashed: %s", job["job_id"], exc)
+            job["status"] = "failed"
+            job["error"] = str(exc)
+            return job
+        finally:
+            lead_counts.invalidate()
+
+    task = asyncio.create_task(run())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job, task
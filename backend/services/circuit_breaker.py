@@ -0,0 +1,195 @@
+"""
+Circuit Breaker — Fail fast when Gemini is degraded
+
+States:
+  closed     normal operation; outcomes recorded in a rolling window
+  open       provider considered down; calls rejected instantly so the
+             caller goes straight to its fallback path
+  half_open  after a cooldown, a few probe calls decide whether to
+             close again or re-open
+
+before_call() returns a ticket that is passed back to record() /
+release(). Only calls admitted as probes of the current half-open
+period can close or re-open the circuit; calls admitted earlier that
+finish meanwhile are ignored.
+
+The circuit opens when, over the rolling window (with at least
+`min_calls` samples), the error rate or the slow-call rate crosses
+its threshold.
+"""
+
+import time
+import logging
+from collections import deque
+
+from services.env import env_int, env_number
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the circuit is open."""
+
+
+class CircuitBreaker:
+    """Error-rate and latency driven circuit breaker (asyncio, single loop)."""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        min_calls: int = 5,
+        error_rate: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._half_open_period = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        # (timestamp, succeeded, latency)
+        self._window: deque[tuple[float, bool, float]] = deque()
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    # -------------------------------------------------------------- #
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning("Circuit '%s': %s → %s", self.name, self.state, state)
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+        if state == HALF_OPEN:
+            self._half_open_period += 1
+        if state in (OPEN, HALF_OPEN):
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if state == CLOSED:
+            self._window.clear()
+
+    def before_call(self) -> int | None:
+        """
+        Admit or reject a call.
+
+        Returns:
+            A probe ticket if the call was admitted as a half-open probe,
+            else None. Pass it to record() / release().
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with
+                all probe slots taken.
+        """
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit '{self.name}' is open")
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit '{self.name}' is half-open (probe in flight)")
+            self._probes_in_flight += 1
+            return self._half_open_period
+        return None
+
+    def _is_probe(self, ticket: int | None) -> bool:
+        return self.state == HALF_OPEN and ticket == self._half_open_period
+
+    def record(self, succeeded: bool, latency: float, ticket: int | None = None) -> None:
+        """Record the outcome of an admitted call (*ticket* from before_call)."""
+        if self.state == HALF_OPEN:
+            if not self._is_probe(ticket):
+                # Admitted before this half-open period: not a probe
+                return
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if succeeded and latency < self.slow_call_seconds:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CLOSED)
+            else:
+                self._transition(OPEN)
+            return
+
+        now = time.monotonic()
+        self._window.append((now, succeeded, latency))
+        self._prune(now)
+
+        total = len(self._window)
+        if total < self.min_calls:
+            return
+        failures = sum(1 for _, ok, _ in self._window if not ok)
+        slow = sum(1 for _, _, lat in self._window if lat >= self.slow_call_seconds)
+        if failures / total >= self.error_rate or slow / total >= self.slow_call_rate:
+            self._transition(OPEN)
+
+    def release(self, ticket: int | None = None) -> None:
+        """Give back a probe slot for a call that ended without an outcome (e.g. cancelled)."""
+        if self._is_probe(ticket):
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def stats(self) -> dict[str, object]:
+        """State and window counters for the metrics endpoint."""
+        self._prune(time.monotonic())
+        total = len(self._window)
+        failures = sum(1 for _, ok, _ in self._window if not ok)
+        retry_in = 0.0
+        if self.state == OPEN:
+            retry_in = max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "window_calls": total,
+            "window_error_rate": round(failures / total, 3) if total else 0.0,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(retry_in, 1),
+        }
+
+
+# ------------------------------------------------------------------ #
+#  Shared Gemini breaker                                               #
+# ------------------------------------------------------------------ #
+
+_breaker: CircuitBreaker | None = None
+
+
+def get_breaker() -> CircuitBreaker:
+    """Return the process-wide Gemini breaker (created after load_dotenv)."""
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            name="gemini",
+            window_seconds=env_number("GEMINI_CB_WINDOW", 60),
+            min_calls=env_int("GEMINI_CB_MIN_CALLS", 5),
+            error_rate=env_number("GEMINI_CB_ERROR_RATE", 0.5),
+            slow_call_seconds=env_number("GEMINI_CB_SLOW_CALL_SECONDS", 10),
+            slow_call_rate=env_number("GEMINI_CB_SLOW_CALL_RATE", 0.8),
+            open_seconds=env_number("GEMINI_CB_OPEN_SECONDS", 30),
+            half_open_probes=env_int("GEMINI_CB_HALF_OPEN_PROBES", 1),
+        )
+    return _breaker
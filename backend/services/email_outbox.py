@@ -0,0 +1,483 @@
+"""
+Email Outbox — Delivery of reply notifications
+
+POST /leads/{lead_id}/replies stores the reply and an `email_outbox`
+row in one transaction. Delivery depends on EMAIL_DELIVERY:
+
+  inline (default)  Right after that commit the request delivers email
+                    itself (send_now). Works on serverless deployments,
+                    where no background task survives the response.
+  background        A lifespan task drains the outbox instead, so SMTP
+                    stays off the request path. Needs a long-running
+                    server.
+
+Either way, claimed rows are:
+  1. Claimed in batches (claim_email_outbox RPC, SKIP LOCKED, so
+     several workers can deliver side by side).
+  2. Sent over a small pool of authenticated SMTP connections that stay
+     open between batches (no handshake/STARTTLS/login per email).
+     smtplib is blocking, so sends run in worker threads.
+  3. Marked sent, or rescheduled with exponential backoff until
+     EMAIL_MAX_ATTEMPTS (permanent 5xx rejections fail at once).
+
+Retries and anything an inline send missed are delivered by drain(),
+exposed as GET/POST /email-outbox/drain for a scheduler (e.g. Vercel
+Cron), or by the background sender.
+
+Digests: new rows are held for EMAIL_DIGEST_WINDOW seconds, and a
+claim also picks up every fresh row for the same recipient. Replies to
+one client inside the window are rendered into a single email that
+keeps each reply's own translation and original, in order. Inline, a
+held row can't be sent by its own request, so each reply request
+instead delivers whatever has come due (one claim_email_outbox batch,
+digests included); the scheduled drain covers quiet periods. With
+EMAIL_DIGEST_WINDOW=0 an inline request sends just its own row.
+
+If SMTP is not configured the sender logs each email instead, as the
+inline sender used to.
+"""
+
+import os
+import time
+import queue
+import random
+import asyncio
+import logging
+import smtplib
+from html import escape
+from datetime import datetime, timedelta, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any
+
+from services.env import env_int, env_number
+from services.supabase_service import (
+    claim_email_outbox, claim_reply_email, mark_emails_sent, reschedule_email,
+)
+
+logger = logging.getLogger(__name__)
+
+_task: asyncio.Task[None] | None = None
+_wake: asyncio.Event | None = None
+_pool: "_SMTPPool | None" = None
+_stats = {"sent": 0, "retried": 0, "failed": 0, "batches": 0, "digests": 0, "coalesced": 0}
+
+
+def delivery_mode() -> str:
+    """'inline' (send after the reply commits, default) or 'background'."""
+    mode = os.getenv("EMAIL_DELIVERY", "inline").lower()
+    return mode if mode in ("inline", "background") else "inline"
+
+
+def sender_enabled() -> bool:
+    """
+    True when this process runs the background sender: EMAIL_DELIVERY=
+    background, unless EMAIL_OUTBOX_SENDER=0 (drained by another process).
+    """
+    if delivery_mode() != "background":
+        return False
+    return os.getenv("EMAIL_OUTBOX_SENDER", "1").lower() not in ("0", "false", "no")
+
+
+def _smtp_settings() -> dict[str, Any] | None:
+    """SMTP settings from the environment, or None if SMTP isn't configured."""
+    host = os.getenv("SMTP_HOST", "")
+    user = os.getenv("SMTP_USER", "")
+    if not host or not user:
+        return None
+    return {
+        "host": host,
+        "port": env_int("SMTP_PORT", 587),
+        "user": user,
+        "password": os.getenv("SMTP_PASS", ""),
+        "from_email": os.getenv("SMTP_FROM", user),
+        "timeout": env_number("SMTP_TIMEOUT", 30),
+    }
+
+
+# ------------------------------------------------------------------ #
+#  Rendering                                                           #
+# ------------------------------------------------------------------ #
+
+def _digest_window() -> float:
+    return max(0.0, env_number("EMAIL_DIGEST_WINDOW", 30))
+
+
+def build_email(to_email: str, to_name: str, payload: dict[str, Any]) -> dict[str, Any]:
+    """Outbox row fields for a reply notification (held for the digest window)."""
+    return {
+        "to_email": to_email,
+        "to_name": to_name,
+        "payload": payload,
+        "delay_seconds": _digest_window(),
+    }
+
+
+def _group(rows: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    """Group claimed rows into one email per recipient, oldest reply first."""
+    groups: dict[str, list[dict[str, Any]]] = {}
+    for row in sorted(rows, key=lambda r: r.get("created_at") or ""):
+        groups.setdefault(row["to_email"].strip().lower(), []).append(row)
+    return list(groups.values())
+
+
+def _render(group: list[dict[str, Any]], from_email: str) -> MIMEMultipart:
+    """Build the MIME message for one recipient's replies (one or a digest)."""
+    payloads = [row.get("payload") or {} for row in group]
+    agents = list(dict.fromkeys(p.get("agent_name", "") for p in payloads))
+    to_name = group[0].get("to_name") or "Client"
+
+    if len(group) == 1:
+        subject = f"Reply from {agents[0]} — Multilingual Leads"
+        heading = f"New Reply from {escape(agents[0])}"
+    else:
+        subject = f"{len(group)} replies from {', '.join(agents)} — Multilingual Leads"
+        heading = f"{len(group)} New Replies"
+
+    sections = []
+    plain = []
+    for p in payloads:
+        agent_line = (
+            f'<p style="margin: 0 0 8px; color: #64748b; font-size: 13px;">'
+            f'{escape(p.get("agent_name", ""))}</p>'
+            if len(group) > 1 else ""
+        )
+        # Replies written in the client's language have no separate original
+        original_line = (
+            f'<p style="margin: 8px 0 0; color: #94a3b8; font-size: 12px;">'
+            f'Original (English): {escape(p.get("original_reply", ""))}</p>'
+            if p.get("original_reply", "").strip() != p.get("translated_reply", "").strip()
+            else ""
+        )
+        sections.append(f"""
+        <div style="background: #f1f5f9; padding: 16px; border-radius: 8px; margin: 16px 0;">
+            {agent_line}
+            <p style="margin: 0; font-size: 16px;">{escape(p.get("translated_reply", ""))}</p>
+            {original_line}
+        </div>""")
+        prefix = f"{p.get('agent_name', '')}:\n" if len(group) > 1 else ""
+        plain.append(prefix + p.get("translated_reply", ""))
+
+    html_body = f"""
+    <div style="font-family: sans-serif; max-width: 600px; margin: auto;">
+        <h2 style="color: #4361ee;">{heading}</h2>
+        <p>Hi {escape(to_name)},</p>
+        {"".join(sections)}
+        <hr style="border: none; border-top: 1px solid #e2e8f0;" />
+        <p style="color: #94a3b8; font-size: 12px;">— Multilingual Client Leads Manager</p>
+    </div>
+    """
+
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = from_email
+    msg["To"] = group[0]["to_email"]
+    msg.attach(MIMEText("\n\n---\n\n".join(plain), "plain"))
+    msg.attach(MIMEText(html_body, "html"))
+    return msg
+
+
+# ------------------------------------------------------------------ #
+#  SMTP connection pool                                                #
+# ------------------------------------------------------------------ #
+
+class _SMTPPool:
+    """Authenticated SMTP connections reused across batches (thread-safe)."""
+
+    def __init__(self, settings: dict[str, Any], size: int, idle_check: float = 30.0):
+        self.settings = settings
+        self.size = size
+        self.idle_check = idle_check
+        # (connection, last used) — LIFO so the warmest connection is reused
+        self._idle: queue.LifoQueue[tuple[smtplib.SMTP, float]] = queue.LifoQueue()
+        self.connects = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        s = self.settings
+        server = smtplib.SMTP(s["host"], s["port"], timeout=s["timeout"])
+        try:
+            server.starttls()
+            server.login(s["user"], s["password"])
+        except Exception:
+            _close(server)
+            raise
+        self.connects += 1
+        return server
+
+    def acquire(self) -> smtplib.SMTP:
+        """Reuse an idle connection that still answers NOOP, else open one."""
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - last_used < self.idle_check:
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except OSError:  # includes SMTPException
+                pass
+            _close(server)
+
+    def release(self, server: smtplib.SMTP) -> None:
+        if self._idle.qsize() >= self.size:
+            _close(server)
+        else:
+            self._idle.put((server, time.monotonic()))
+
+    def discard(self, server: smtplib.SMTP) -> None:
+        _close(server)
+
+    def close(self) -> None:
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            _close(server)
+
+    def idle(self) -> int:
+        return self._idle.qsize()
+
+
+def _close(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
+
+
+class _Transient(Exception):
+    """Connection-level failure (e.g. login rejected) — always retried."""
+
+
+def _is_permanent(exc: Exception) -> bool:
+    """5xx replies to a message (bad recipient, rejected content) won't succeed on retry."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+def _send_slice(
+    pool: _SMTPPool,
+    groups: list[list[dict[str, Any]]],
+) -> list[tuple[str, Exception | None]]:
+    """
+    Send one email per group over one pooled connection (runs in a
+    worker thread). Returns the outcome for every row.
+
+    A dropped connection is re-opened once per message; per-message
+    SMTP errors are returned rather than raised.
+    """
+    from_email = pool.settings["from_email"]
+    results: list[tuple[str, Exception | None]] = []
+    server: smtplib.SMTP | None = None
+    for n, group in enumerate(groups):
+        msg = _render(group, from_email)
+        outcome: Exception | None = None
+        for attempt in range(2):
+            if server is None:
+                try:
+                    server = pool.acquire()
+                except OSError as exc:
+                    # Can't connect / log in: every remaining row is retried later
+                    return results + [
+                        (row["id"], _Transient(exc)) for g in groups[n:] for row in g
+                    ]
+            try:
+                server.sendmail(from_email, group[0]["to_email"], msg.as_string())
+                outcome = None
+                break
+            except smtplib.SMTPServerDisconnected as exc:
+                outcome = exc
+            except smtplib.SMTPException as exc:
+                outcome = exc
+                break
+            except OSError as exc:
+                outcome = exc
+            pool.discard(server)
+            server = None
+        results.extend((row["id"], outcome) for row in group)
+    if server is not None:
+        pool.release(server)
+    return results
+
+
+# ------------------------------------------------------------------ #
+#  Sender                                                              #
+# ------------------------------------------------------------------ #
+
+def _retry_at(attempts: int) -> datetime | None:
+    """Next attempt time with jittered exponential backoff, or None to give up."""
+    if attempts >= env_int("EMAIL_MAX_ATTEMPTS", 6):
+        return None
+    base = env_number("EMAIL_RETRY_BASE", 30)
+    delay = min(base * 2 ** max(0, attempts - 1), env_number("EMAIL_RETRY_MAX", 3600))
+    delay *= random.uniform(0.5, 1.0)
+    return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+
+async def _deliver(rows: list[dict[str, Any]]) -> None:
+    """Send one claimed batch and record the outcome of every row."""
+    global _pool
+    groups = _group(rows)
+    digests = [g for g in groups if len(g) > 1]
+    _stats["digests"] += len(digests)
+    _stats["coalesced"] += sum(len(g) - 1 for g in digests)
+
+    settings = _smtp_settings()
+    if settings is None:
+        for group in groups:
+            for payload in (row.get("payload") or {} for row in group):
+                logger.info(
+                    "SMTP not configured — email would be sent to %s:\n"
+                    "  Agent: %s\n  Reply (EN): %s\n  Reply (%s): %s",
+                    group[0]["to_email"], payload.get("agent_name", ""),
+                    payload.get("original_reply", ""), payload.get("client_language", ""),
+                    payload.get("translated_reply", ""),
+                )
+        await mark_emails_sent([row["id"] for row in rows])
+        return
+
+    if _pool is None or _pool.settings != settings:
+        if _pool is not None:
+            await asyncio.to_thread(_pool.close)
+        _pool = _SMTPPool(settings, size=max(1, env_int("EMAIL_SMTP_POOL", 2)))
+    pool = _pool
+
+    slices = [groups[i::pool.size] for i in range(min(pool.size, len(groups)))]
+    outcomes = await asyncio.gather(*(asyncio.to_thread(_send_slice, pool, s) for s in slices))
+    _stats["batches"] += 1
+
+    by_id = {row["id"]: row for row in rows}
+    sent: list[str] = []
+    for email_id, error in (item for result in outcomes for item in result):
+        if error is None:
+            sent.append(email_id)
+            continue
+        attempts = int(by_id[email_id].get("attempts") or 1)
+        retry_at = None if _is_permanent(error) else _retry_at(attempts)
+        if retry_at is None:
+            _stats["failed"] += 1
+            logger.error("Email %s to %s failed permanently after %d attempts: %s",
+                         email_id, by_id[email_id]["to_email"], attempts, error)
+        else:
+            _stats["retried"] += 1
+            logger.warning("Email %s failed (attempt %d), retrying at %s: %s",
+                           email_id, attempts, retry_at.isoformat(), error)
+        await reschedule_email(email_id, str(error), retry_at)
+
+    await mark_emails_sent(sent)
+    _stats["sent"] += len(sent)
+    logger.info("Email batch: %d replies in %d emails, %d sent, %d failed",
+                len(rows), len(groups), len(sent), len(rows) - len(sent))
+
+
+def _lease_seconds() -> int:
+    return env_int("EMAIL_LEASE_SECONDS", 120)
+
+
+async def send_now(reply_id: str) -> None:
+    """
+    Inline delivery after a reply commits, on the pooled connection.
+
+    Without a digest window the reply's own email is claimed and sent.
+    With one, that email is held, so one batch of due emails is
+    delivered instead: earlier held replies, each joined by any fresh
+    ones (this reply included) to the same recipient. Failed sends are
+    rescheduled for drain() like any other.
+
+    Raises:
+        RuntimeError: If claiming or recording the outcome fails (the rows
+                      are then delivered by drain() once due).
+    """
+    if _digest_window() > 0:
+        rows = await claim_email_outbox(env_int("EMAIL_BATCH_SIZE", 50), _lease_seconds())
+    else:
+        rows = await claim_reply_email(reply_id, _lease_seconds())
+    if rows:
+        await _deliver(rows)
+
+
+async def drain(max_batches: int | None = None) -> dict[str, int]:
+    """
+    Deliver every due outbox email, at most *max_batches* batches
+    (EMAIL_DRAIN_MAX_BATCHES by default, to fit a serverless time limit).
+
+    Raises:
+        RuntimeError: If claiming or recording outcomes fails.
+    """
+    if max_batches is None:
+        max_batches = env_int("EMAIL_DRAIN_MAX_BATCHES", 10)
+    batch_size = env_int("EMAIL_BATCH_SIZE", 50)
+    claimed = batches = 0
+    while batches < max_batches:
+        rows = await claim_email_outbox(batch_size, _lease_seconds())
+        if not rows:
+            break
+        await _deliver(rows)
+        claimed += len(rows)
+        batches += 1
+    return {"claimed": claimed, "batches": batches}
+
+
+async def _run_sender() -> None:
+    assert _wake is not None
+    poll = env_number("EMAIL_POLL_SECONDS", 5)
+    batch_size = env_int("EMAIL_BATCH_SIZE", 50)
+    lease = _lease_seconds()
+    while True:
+        _wake.clear()
+        try:
+            rows = await claim_email_outbox(batch_size, lease)
+            if rows:
+                await _deliver(rows)
+                continue
+        except RuntimeError as exc:
+            # Claimed rows become due again once their lease expires
+            logger.warning("Email sender: %s", exc)
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=poll)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_sender() -> None:
+    """Start the background outbox sender (no-op if already running)."""
+    global _task, _wake
+    if _task is not None:
+        return
+    _wake = asyncio.Event()
+    _task = asyncio.create_task(_run_sender())
+    logger.info("Email outbox sender started")
+
+
+async def stop_sender() -> None:
+    """Stop the sender and close pooled SMTP connections."""
+    global _task, _wake, _pool
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+    if _pool is not None:
+        await asyncio.to_thread(_pool.close)
+    _task = None
+    _wake = None
+    _pool = None
+
+
+def notify() -> None:
+    """Wake the sender now instead of at its next poll (new email queued)."""
+    if _wake is not None:
+        _wake.set()
+
+
+def stats() -> dict[str, Any]:
+    """Delivery counters for the metrics endpoint."""
+    return {
+        **_stats,
+        "mode": delivery_mode(),
+        "running": _task is not None,
+        "smtp_connections_opened": _pool.connects if _pool else 0,
+        "smtp_idle_connections": _pool.idle() if _pool else 0,
+    }
@@ -0,0 +1,25 @@
+"""
+Env — Typed readers for numeric settings
+
+Settings are read when first needed (after load_dotenv has run). A
+missing or malformed value falls back to the default instead of
+failing the request.
+"""
+
+import os
+
+
+def env_number(name: str, default: float) -> float:
+    """Float setting *name*, or *default* if unset or not a number."""
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    """Integer setting *name*, or *default* if unset or not an integer."""
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
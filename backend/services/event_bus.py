@@ -0,0 +1,167 @@
+"""
+Event Bus — In-process lead change feed for Server-Sent Events
+
+Endpoints publish lead.created, lead.status_changed and reply.created
+events here, plus one leads.updated event ({"ids": [...], <fields>})
+per bulk update and one leads.created event ({"ids": [...], "leads":
+[...]}) per bulk import; GET /events streams them to dashboards so they
+don't have to poll the full lead list.
+
+Every event gets a resume token "<epoch>-<seq>". A client reconnecting
+with Last-Event-ID receives everything it missed from a bounded ring
+buffer; if the token is from another process (restart) or has aged
+out of the buffer, a single "reset" event tells it to refetch.
+
+Events are per process: with several workers each one has its own feed.
+In-process consumers (e.g. the routing workload index) can register a
+synchronous listener with add_listener().
+"""
+
+import time
+import uuid
+import asyncio
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Callable
+
+from services.env import env_int
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = uuid.uuid4().hex[:8]
+_seq = 0
+_buffer: deque[dict[str, Any]] | None = None
+_subscribers: set[asyncio.Queue[dict[str, Any]]] = set()
+_listeners: list[Callable[[str, dict[str, Any]], None]] = []
+
+
+def _get_buffer() -> deque[dict[str, Any]]:
+    global _buffer
+    if _buffer is None:
+        _buffer = deque(maxlen=env_int("EVENT_BUFFER_SIZE", 1000))
+    return _buffer
+
+
+def publish(event_type: str, data: dict[str, Any]) -> None:
+    """Record an event and fan it out to every live subscriber."""
+    global _seq
+    _seq += 1
+    event = {
+        "id": f"{_EPOCH}-{_seq}",
+        "seq": _seq,
+        "type": event_type,
+        "data": data,
+        "ts": time.time(),
+    }
+    _get_buffer().append(event)
+    for listener in _listeners:
+        try:
+            listener(event_type, data)
+        except Exception as exc:
+            logger.error("Event listener failed on %s: %s", event_type, exc)
+    for queue in list(_subscribers):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Dropping slow event subscriber")
+            _subscribers.discard(queue)
+
+
+def add_listener(listener: Callable[[str, dict[str, Any]], None]) -> None:
+    """Call *listener(event_type, data)* for every published event."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def _replay(last_event_id: str | None) -> list[dict[str, Any]] | None:
+    """Events after *last_event_id*, or None if a gap-free resume is impossible."""
+    if not last_event_id:
+        return []
+    epoch, _, seq = last_event_id.partition("-")
+    if epoch != _EPOCH or not seq.isdigit():
+        return None
+    buffer = _get_buffer()
+    last = int(seq)
+    if buffer and buffer[0]["seq"] > last + 1:
+        return None
+    return [event for event in buffer if event["seq"] > last]
+
+
+def _row_matches(
+    data: dict[str, Any],
+    agent: str | None,
+    status: str | None,
+    email: str | None,
+) -> bool:
+    if agent and data.get("assigned_to") != agent:
+        return False
+    if status and data.get("status") != status:
+        return False
+    if email and str(data.get("email", "")).lower() != email.lower():
+        return False
+    return True
+
+
+def _visible(
+    event: dict[str, Any],
+    agent: str | None,
+    status: str | None,
+    email: str | None = None,
+) -> dict[str, Any] | None:
+    """*event* as this subscriber should see it, or None to skip it."""
+    data = event["data"]
+    if event["type"] == "leads.updated":
+        # Bulk updates carry no per-row columns; clients match on ids
+        return event
+    if event["type"] == "leads.created":
+        leads = [row for row in data.get("leads", []) if _row_matches(row, agent, status, email)]
+        if not leads:
+            return None
+        if len(leads) == len(data.get("leads", [])):
+            return event
+        return {**event, "data": {"ids": [row.get("id", "") for row in leads], "leads": leads}}
+    return event if _row_matches(data, agent, status, email) else None
+
+
+async def subscribe(
+    last_event_id: str | None = None,
+    agent: str | None = None,
+    status: str | None = None,
+    heartbeat: float = 15.0,
+    email: str | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Yield events (missed ones first), filtered by agent, status and the
+    submitter's email.
+
+    Yields {"type": "reset"} first if the resume token can't be honoured,
+    and {"type": "heartbeat"} after *heartbeat* idle seconds.
+    """
+    queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=1000)
+    _subscribers.add(queue)
+    try:
+        missed = _replay(last_event_id)
+        if missed is None:
+            yield {"id": f"{_EPOCH}-{_seq}", "type": "reset", "data": {}}
+            missed = []
+        for event in missed:
+            visible = _visible(event, agent, status, email)
+            if visible is not None:
+                yield visible
+
+        while queue in _subscribers:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield {"type": "heartbeat"}
+                continue
+            visible = _visible(event, agent, status, email)
+            if visible is not None:
+                yield visible
+    finally:
+        _subscribers.discard(queue)
+
+
+def stats() -> dict[str, Any]:
+    """Subscriber count and last sequence number for the metrics endpoint."""
+    return {"subscribers": len(_subscribers), "last_event_id": f"{_EPOCH}-{_seq}"}
@@ -10,11 +10,20 @@ functions return sensible defaults so the lead is never lost.
 """
 
 import os
-import logging
+import json
 import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
 
 from google import genai
 
+from services import translation_cache
+from services.circuit_breaker import get_breaker
+from services.env import env_int, env_number
+from services.rate_limiter import get_limiter
+from services.language_detector import detect_language_local
+
 logger = logging.getLogger(__name__)
 
 # ------------------------------------------------------------------ #
@@ -26,6 +35,19 @@ def _get_api_key() -> str:
     return os.getenv("GEMINI_API_KEY", "")
 
 
+def _get_batch_token_budget() -> int:
+    """Approximate input-token budget for one batched translation request."""
+    return env_int("BATCH_TOKEN_BUDGET", 4000)
+
+
+def local_detection_threshold() -> float:
+    """
+    Minimum local-detector confidence needed to skip Gemini detection
+    (also what other callers should require to trust the local detector).
+    """
+    return env_number("LOCAL_DETECTION_THRESHOLD", 0.9)
+
+
 SUPPORTED_LANGUAGES = {
     "english",
     "hindi",
@@ -52,9 +74,104 @@ LANG_CODE_MAP: dict[str, str] = {
 LANG_NAME_TO_CODE: dict[str, str] = {v: k for k, v in LANG_CODE_MAP.items()}
 
 
+# ------------------------------------------------------------------ #
+#  Client                                                              #
+# ------------------------------------------------------------------ #
+
+_client: genai.Client | None = None
+_client_key: str = ""
+
+# Calls currently using each client (by id), and clients replaced by a
+# key rotation that are closed once their last call finishes
+_in_use: dict[int, int] = {}
+_retired: dict[int, genai.Client] = {}
+_closing: set[asyncio.Task[None]] = set()
+
+
 def _get_client() -> genai.Client:
-    """Return a configured Gemini client instance."""
-    return genai.Client(api_key=_get_api_key())
+    """
+    Return the process-wide Gemini client, creating it lazily.
+
+    The client (and its HTTP connection pool) is shared by every call.
+    If GEMINI_API_KEY has rotated since the client was built, a new
+    client is created for the new key; the old one is closed as soon
+    as its in-flight calls have finished.
+    """
+    global _client, _client_key
+    api_key = _get_api_key()
+    if _client is None or api_key != _client_key:
+        if _client is not None:
+            logger.info("GEMINI_API_KEY changed — re-creating Gemini client")
+            _retire(_client)
+        _client = genai.Client(api_key=api_key)
+        _client_key = api_key
+        logger.info("Gemini client initialized")
+    return _client
+
+
+async def _close(client: genai.Client) -> None:
+    try:
+        await client.aio.aclose()
+        client.close()
+    except Exception as exc:
+        logger.warning("Failed to close Gemini client cleanly: %s", exc)
+
+
+def _schedule_close(client: genai.Client) -> None:
+    try:
+        task = asyncio.get_running_loop().create_task(_close(client))
+    except RuntimeError:
+        # No event loop (e.g. a script): the async pool was never used
+        client.close()
+        return
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+def _retire(client: genai.Client) -> None:
+    """Close *client* now if idle, otherwise after its last in-flight call."""
+    if _in_use.get(id(client)):
+        _retired[id(client)] = client
+    else:
+        _schedule_close(client)
+
+
+def _acquire_client(client: genai.Client) -> None:
+    _in_use[id(client)] = _in_use.get(id(client), 0) + 1
+
+
+def _release_client(client: genai.Client) -> None:
+    remaining = _in_use.pop(id(client), 1) - 1
+    if remaining:
+        _in_use[id(client)] = remaining
+    elif id(client) in _retired:
+        logger.info("Closing Gemini client replaced by key rotation")
+        _schedule_close(_retired.pop(id(client)))
+
+
+def init_client() -> None:
+    """Warm up the shared Gemini client (called from the app lifespan)."""
+    if not _get_api_key():
+        logger.warning("GEMINI_API_KEY not set — Gemini client not created")
+        return
+    _get_client()
+
+
+async def close_client() -> None:
+    """Close the shared Gemini client (and any retired ones) and their connection pools."""
+    global _client, _client_key
+    clients = list(_retired.values())
+    _retired.clear()
+    if _client is not None:
+        clients.append(_client)
+    _client = None
+    _client_key = ""
+    for client in clients:
+        await _close(client)
+    if _closing:
+        await asyncio.gather(*_closing, return_exceptions=True)
+    if clients:
+        logger.info("Gemini client closed")
 
 
 # Use flash-lite for more generous free-tier quota
@@ -62,32 +179,131 @@ GEMINI_MODEL = "gemini-2.5-flash"
 MAX_RETRIES = 3
 
 
-def _generate_with_retry(client: genai.Client, prompt: str) -> str:
-    """Call Gemini with exponential backoff on 429 rate-limit errors."""
+async def _generate_with_retry(
+    client: genai.Client,
+    prompt: str,
+    config: dict[str, Any] | None = None,
+) -> str:
+    """
+    Call Gemini with exponential backoff on 429 rate-limit errors.
+
+    Uses the SDK's async surface (``client.aio``) and ``asyncio.sleep``
+    so a slow or rate-limited call never blocks the event loop.
+    *config* is passed through as the generation config (e.g. to request
+    a JSON response matching a schema).
+
+    Every attempt is first admitted by the circuit breaker (raises
+    CircuitOpenError while Gemini is degraded) and then waits on the
+    client-side rate limiter (raises RateLimitTimeout past
+    GEMINI_MAX_WAIT). Either way the caller falls back immediately.
+    The limiter is charged an input+output estimate up front and
+    settled with the response's reported token usage.
+    """
+    breaker = get_breaker()
+    limiter = get_limiter()
     for attempt in range(MAX_RETRIES):
+        ticket = breaker.before_call()
+        started = None
         try:
-            response = client.models.generate_content(
-                model=GEMINI_MODEL,
-                contents=prompt,
-            )
+            charged = _estimate_call_tokens(prompt)
+            await limiter.acquire(charged)
+            started = time.monotonic()
+            _acquire_client(client)
+            try:
+                response = await client.aio.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=prompt,
+                    config=config,
+                )
+            finally:
+                _release_client(client)
+            breaker.record(True, time.monotonic() - started, ticket)
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None and usage.total_token_count:
+                limiter.settle(usage.total_token_count - charged)
             return response.text.strip()
+        except asyncio.CancelledError:
+            breaker.release(ticket)
+            raise
         except Exception as exc:
+            if started is None:
+                breaker.release(ticket)  # never reached Gemini
+            else:
+                breaker.record(False, time.monotonic() - started, ticket)
             if "429" in str(exc) and attempt < MAX_RETRIES - 1:
                 wait = 2 ** (attempt + 1)  # 2s, 4s, 8s
                 logger.warning(
                     "Rate limited (attempt %d/%d), retrying in %ds…",
                     attempt + 1, MAX_RETRIES, wait,
                 )
-                time.sleep(wait)
+                await asyncio.sleep(wait)
             else:
                 raise
     return ""  # should never reach here
 
 
+# ------------------------------------------------------------------ #
+#  Request coalescing (singleflight)                                   #
+# ------------------------------------------------------------------ #
+
+# Normalized (prompt, config) → the in-flight upstream call
+_in_flight: dict[str, asyncio.Task[str]] = {}
+
+
+def _flight_key(prompt: str, config: dict[str, Any] | None) -> str:
+    normalized = " ".join(prompt.split())
+    return f"{GEMINI_MODEL}\x1f{json.dumps(config, sort_keys=True, default=str)}\x1f{normalized}"
+
+
+async def _generate(
+    client: genai.Client,
+    prompt: str,
+    config: dict[str, Any] | None = None,
+) -> str:
+    """
+    Coalesce identical concurrent Gemini calls into one upstream request.
+
+    Every caller with the same normalized prompt awaits the same task
+    and receives its (immutable) text result or its exception. The task
+    is shielded, so one waiter being cancelled doesn't cancel the call
+    for the others.
+    """
+    key = _flight_key(prompt, config)
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_generate_with_retry(client, prompt, config))
+        _in_flight[key] = task
+
+        def _forget(done: asyncio.Task[str]) -> None:
+            if _in_flight.get(key) is done:
+                del _in_flight[key]
+
+        task.add_done_callback(_forget)
+    else:
+        logger.info("Coalescing identical in-flight Gemini request")
+    return await asyncio.shield(task)
+
+
 # ------------------------------------------------------------------ #
 #  Language Detection                                                  #
 # ------------------------------------------------------------------ #
 
+def _local_detection(text: str) -> dict[str, str] | None:
+    """
+    Offline fast path: return a detection result when the local
+    detector is confident enough, otherwise None (ask Gemini).
+    """
+    detected, score = detect_language_local(text)
+    if score < local_detection_threshold():
+        return None
+    logger.info("Local detection: %s (%.2f) — skipping Gemini", detected, score)
+    return {
+        "detected_language": detected,
+        "language_code": LANG_NAME_TO_CODE.get(detected, "en"),
+        "confidence": "high",
+    }
+
+
 async def detect_language(text: str) -> dict[str, str]:
     """
     Detect the language of *text*.
@@ -101,6 +317,10 @@ async def detect_language(text: str) -> dict[str, str]:
 
     Fallback: returns english / "en" / "low" if anything goes wrong.
     """
+    local = _local_detection(text)
+    if local:
+        return local
+
     if not _get_api_key():
         logger.warning("GEMINI_API_KEY not set — skipping detection")
         return _fallback_detection()
@@ -118,7 +338,7 @@ async def detect_language(text: str) -> dict[str, str]:
 
     try:
         client = _get_client()
-        raw = _generate_with_retry(client, prompt).lower().rstrip(".")
+        raw = (await _generate(client, prompt)).lower().rstrip(".")
 
         # Validate against supported set
         detected = raw if raw in SUPPORTED_LANGUAGES else "english"
@@ -175,6 +395,17 @@ async def translate_to_english(text: str, source_language: str = "") -> dict[str
             "source_language": "english",
         }
 
+    cached = await translation_cache.get_translation(
+        text, source_language, "english", GEMINI_MODEL,
+    )
+    if cached is not None:
+        logger.info("Translation cache hit ('%s' → English)", source_language)
+        return {
+            "original_text": text,
+            "translated_text": cached,
+            "source_language": source_language or "unknown",
+        }
+
     lang_hint = f" from {source_language}" if source_language else ""
     prompt = (
         f"Translate the following text{lang_hint} to English. "
@@ -186,7 +417,7 @@ async def translate_to_english(text: str, source_language: str = "") -> dict[str
 
     try:
         client = _get_client()
-        translated = _generate_with_retry(client, prompt)
+        translated = await _generate(client, prompt)
 
         # Strip surrounding quotes if Gemini wraps the response
         if translated.startswith('"') and translated.endswith('"'):
@@ -194,6 +425,9 @@ async def translate_to_english(text: str, source_language: str = "") -> dict[str
 
         logger.info("Gemini translation result: '%s' → '%s'",
                     text[:50], translated[:50])
+        await translation_cache.put_translation(
+            text, source_language, "english", GEMINI_MODEL, translated,
+        )
 
         return {
             "original_text": text,
@@ -206,6 +440,106 @@ async def translate_to_english(text: str, source_language: str = "") -> dict[str
         return _fallback_translation(text, source_language)
 
 
+# ------------------------------------------------------------------ #
+#  Combined Detection + Translation                                    #
+# ------------------------------------------------------------------ #
+
+DETECT_TRANSLATE_SCHEMA: dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": {
+        "language": {"type": "STRING", "enum": sorted(SUPPORTED_LANGUAGES)},
+        "confidence": {"type": "STRING", "enum": ["high", "medium", "low"]},
+        "translation": {"type": "STRING"},
+    },
+    "required": ["language", "confidence", "translation"],
+}
+
+
+async def detect_and_translate(text: str) -> dict[str, str]:
+    """
+    Detect the language of *text* and translate it to English in a
+    single Gemini round-trip (structured JSON response).
+
+    Returns:
+        {
+          "detected_language": "<language name>",   # e.g. "hindi"
+          "language_code": "<2-letter code>",       # e.g. "hi"
+          "confidence": "high" | "medium" | "low",
+          "original_text": "<input text>",
+          "translated_text": "<english translation>"
+        }
+
+    Fallback: english / "en" / "low" with the original text unchanged.
+    """
+    local = _local_detection(text)
+    if local:
+        translation = await translate_to_english(text, local["detected_language"])
+        return {
+            **local,
+            "original_text": text,
+            "translated_text": translation["translated_text"],
+        }
+
+    if not _get_api_key():
+        logger.warning("GEMINI_API_KEY not set — skipping detect+translate")
+        return _fallback_detect_and_translate(text)
+
+    if not text or not text.strip():
+        return _fallback_detect_and_translate(text)
+
+    prompt = (
+        "Detect the language of the following text and translate it to English. "
+        "Supported languages: english, hindi, spanish, french, german, arabic, portuguese, chinese. "
+        "If the language is not in the list, use 'english'. "
+        "If the text is already English, return it unchanged as the translation.\n\n"
+        f"Text: \"{text.strip()}\""
+    )
+    config = {
+        "response_mime_type": "application/json",
+        "response_schema": DETECT_TRANSLATE_SCHEMA,
+    }
+
+    try:
+        client = _get_client()
+        raw = await _generate(client, prompt, config)
+        data = json.loads(raw)
+
+        language = str(data.get("language", "")).lower()
+        detected = language if language in SUPPORTED_LANGUAGES else "english"
+        code = LANG_NAME_TO_CODE.get(detected, "en")
+
+        confidence = str(data.get("confidence", "")).lower()
+        if confidence not in ("high", "medium", "low"):
+            confidence = "high"
+        # Same rule as detect_language: an "english" verdict on text that
+        # doesn't look English is never better than medium.
+        if detected == "english" and not _looks_english(text) and confidence == "high":
+            confidence = "medium"
+
+        translated = text if detected == "english" else str(data.get("translation", "")).strip()
+        if not translated:
+            translated = text
+
+        logger.info("Gemini detect+translate: %s (%s) '%s' → '%s'",
+                    detected, confidence, text[:50], translated[:50])
+        if detected != "english":
+            await translation_cache.put_translation(
+                text, detected, "english", GEMINI_MODEL, translated,
+            )
+
+        return {
+            "detected_language": detected,
+            "language_code": code,
+            "confidence": confidence,
+            "original_text": text,
+            "translated_text": translated,
+        }
+
+    except Exception as exc:
+        logger.error("Gemini detect_and_translate failed: %s", exc)
+        return _fallback_detect_and_translate(text)
+
+
 # ------------------------------------------------------------------ #
 #  Reverse Translation (English → Target Language)                     #
 # ------------------------------------------------------------------ #
@@ -237,6 +571,13 @@ async def translate_from_english(text: str, target_language: str = "") -> dict[s
     if not target_language or target_language.lower() == "english":
         return {"original_text": text, "translated_text": text, "target_language": "english"}
 
+    cached = await translation_cache.get_translation(
+        text, "english", target_language, GEMINI_MODEL,
+    )
+    if cached is not None:
+        logger.info("Translation cache hit (English → '%s')", target_language)
+        return {"original_text": text, "translated_text": cached, "target_language": target_language}
+
     prompt = (
         f"Translate the following English text to {target_language}. "
         "Respond with ONLY the translated text, nothing else.\n\n"
@@ -247,13 +588,16 @@ async def translate_from_english(text: str, target_language: str = "") -> dict[s
 
     try:
         client = _get_client()
-        translated = _generate_with_retry(client, prompt)
+        translated = await _generate(client, prompt)
 
         if translated.startswith('"') and translated.endswith('"'):
             translated = translated[1:-1]
 
         logger.info("Reverse translation result: '%s' → '%s'",
                     text[:50], translated[:50])
+        await translation_cache.put_translation(
+            text, "english", target_language, GEMINI_MODEL, translated,
+        )
 
         return {
             "original_text": text,
@@ -266,6 +610,192 @@ async def translate_from_english(text: str, target_language: str = "") -> dict[s
         return {"original_text": text, "translated_text": text, "target_language": target_language}
 
 
+# ------------------------------------------------------------------ #
+#  Batched Translation                                                 #
+# ------------------------------------------------------------------ #
+
+BATCH_SCHEMA: dict[str, Any] = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "index": {"type": "INTEGER"},
+            "translation": {"type": "STRING"},
+        },
+        "required": ["index", "translation"],
+    },
+}
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 chars/token plus JSON framing)."""
+    return len(text) // 4 + 8
+
+
+def _estimate_call_tokens(prompt: str) -> int:
+    """
+    Quota estimate for one call: TPM counts output tokens too, and a
+    translation's output is about as long as its input.
+    """
+    return 2 * _estimate_tokens(prompt)
+
+
+def _pack_batches(texts: list[str], budget: int) -> list[list[str]]:
+    """Greedily pack *texts* into batches that stay within *budget* tokens."""
+    batches: list[list[str]] = []
+    current: list[str] = []
+    used = 0
+    for text in texts:
+        cost = _estimate_tokens(text)
+        if current and used + cost > budget:
+            batches.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def _translate_batch(texts: list[str], source: str, target: str) -> list[str] | None:
+    """
+    Translate several texts in one structured Gemini request.
+
+    Returns the translations in input order, or None if the response
+    doesn't map back cleanly to every input index.
+    """
+    payload = json.dumps(
+        [{"index": i, "text": t.strip()} for i, t in enumerate(texts)],
+        ensure_ascii=False,
+    )
+    source_hint = f" from {source}" if source else ""
+    prompt = (
+        f"Translate the text of each item below{source_hint} to {target}. "
+        "Return a JSON array with exactly one object per input item, "
+        "keeping its index and giving its translation.\n\n"
+        f"{payload}"
+    )
+    config = {
+        "response_mime_type": "application/json",
+        "response_schema": BATCH_SCHEMA,
+    }
+
+    client = _get_client()
+    raw = await _generate(client, prompt, config)
+    try:
+        data = json.loads(raw)
+        results = {int(item["index"]): str(item["translation"]).strip() for item in data}
+    except (ValueError, TypeError, KeyError) as exc:
+        logger.warning("Malformed batch translation response: %s", exc)
+        return None
+
+    if set(results) != set(range(len(texts))):
+        logger.warning("Batch translation returned %d/%d items", len(results), len(texts))
+        return None
+    return [results[i] for i in range(len(texts))]
+
+
+async def _translate_many(
+    texts: list[str],
+    source: str,
+    target: str,
+    translate_one: Callable[[str], Awaitable[dict[str, str]]],
+) -> list[str]:
+    """
+    Shared driver for the batched APIs: serve cache hits (one cache
+    lookup for all texts), dedupe the rest, pack them into token-bounded
+    batches and map results back by index; each batch's results are
+    cached with one upsert. A batch that fails or comes back malformed
+    is retried item by item through *translate_one*.
+    """
+    translations = list(texts)
+    pending: dict[str, list[int]] = {}
+
+    wanted = [t for t in texts if t and t.strip()]
+    cached = await translation_cache.get_translations(wanted, source, target, GEMINI_MODEL)
+    for i, text in enumerate(texts):
+        if text in cached:
+            translations[i] = cached[text]
+        elif text and text.strip():
+            pending.setdefault(text, []).append(i)
+
+    async def run(batch: list[str]) -> list[str]:
+        try:
+            result = await _translate_batch(batch, source, target)
+        except Exception as exc:
+            logger.error("Gemini batch translation failed: %s", exc)
+            result = None
+
+        if result is None:
+            logger.info("Falling back to per-item translation for %d texts", len(batch))
+            singles = await asyncio.gather(*(translate_one(t) for t in batch))
+            return [r["translated_text"] for r in singles]
+
+        await translation_cache.put_translations(
+            list(zip(batch, result)), source, target, GEMINI_MODEL,
+        )
+        return result
+
+    batches = _pack_batches(list(pending), _get_batch_token_budget())
+    logger.info("Translating %d unique texts in %d batch(es) → %s",
+                len(pending), len(batches), target)
+
+    for batch, result in zip(batches, await asyncio.gather(*(run(b) for b in batches))):
+        for text, translated in zip(batch, result):
+            for i in pending[text]:
+                translations[i] = translated
+
+    return translations
+
+
+async def translate_many_to_english(
+    texts: list[str], source_language: str = "",
+) -> list[dict[str, str]]:
+    """
+    Translate many *texts* to English with as few Gemini requests as possible.
+
+    Returns one result per input, in order, shaped like translate_to_english().
+    """
+    if not _get_api_key() or source_language.lower() == "english":
+        return [
+            {"original_text": t, "translated_text": t, "source_language": source_language or "unknown"}
+            for t in texts
+        ]
+
+    translations = await _translate_many(
+        texts, source_language, "english",
+        lambda t: translate_to_english(t, source_language),
+    )
+    return [
+        {"original_text": t, "translated_text": tr, "source_language": source_language or "unknown"}
+        for t, tr in zip(texts, translations)
+    ]
+
+
+async def translate_many_from_english(
+    texts: list[str], target_language: str = "",
+) -> list[dict[str, str]]:
+    """
+    Translate many English *texts* into *target_language* in batches.
+
+    Returns one result per input, in order, shaped like translate_from_english().
+    """
+    if not target_language or target_language.lower() == "english":
+        return [{"original_text": t, "translated_text": t, "target_language": "english"} for t in texts]
+
+    if not _get_api_key():
+        return [{"original_text": t, "translated_text": t, "target_language": target_language} for t in texts]
+
+    translations = await _translate_many(
+        texts, "english", target_language,
+        lambda t: translate_from_english(t, target_language),
+    )
+    return [
+        {"original_text": t, "translated_text": tr, "target_language": target_language}
+        for t, tr in zip(texts, translations)
+    ]
+
+
 # ------------------------------------------------------------------ #
 #  Fallback helpers                                                    #
 # ------------------------------------------------------------------ #
@@ -288,6 +818,15 @@ def _fallback_translation(text: str, source_language: str = "") -> dict[str, str
     }
 
 
+def _fallback_detect_and_translate(text: str) -> dict[str, str]:
+    """Safe default when combined detection + translation is unavailable."""
+    return {
+        **_fallback_detection(),
+        "original_text": text,
+        "translated_text": text,
+    }
+
+
 def _looks_english(text: str) -> bool:
     """Quick heuristic: if most characters are ASCII letters, it's probably English."""
     if not text:
@@ -0,0 +1,287 @@
+"""
+Local Language Detector — Offline fast path before Gemini
+
+Identifies the eight supported languages without a network call:
+  1. Hindi, Arabic and Chinese by Unicode script (unambiguous).
+  2. Latin-script languages (english, spanish, french, german,
+     portuguese) with a character-trigram naive Bayes model built
+     at import time from small embedded sample texts, including
+     distractor samples for look-alike unsupported languages
+     (Italian, Dutch, romanized Hindi).
+
+Returns a language name plus a confidence in [0, 1]. Latin-script
+confidence is calibrated (tempered evidence, unsupported-language and
+unseen-trigram penalties) against benchmarks/language_fixtures.json;
+see benchmarks/bench_language_detector.py. Callers decide whether the
+confidence is good enough or Gemini should be asked.
+"""
+
+import math
+import re
+from collections import Counter
+
+# ------------------------------------------------------------------ #
+#  Script detection                                                    #
+# ------------------------------------------------------------------ #
+
+# (start, end, language) — inclusive code point ranges
+_SCRIPT_RANGES: list[tuple[int, int, str]] = [
+    (0x0900, 0x097F, "hindi"),       # Devanagari
+    (0xA8E0, 0xA8FF, "hindi"),       # Devanagari Extended
+    (0x0600, 0x06FF, "arabic"),      # Arabic
+    (0x0750, 0x077F, "arabic"),      # Arabic Supplement
+    (0x08A0, 0x08FF, "arabic"),      # Arabic Extended-A
+    (0xFB50, 0xFDFF, "arabic"),      # Arabic Presentation Forms-A
+    (0xFE70, 0xFEFF, "arabic"),      # Arabic Presentation Forms-B
+    (0x3400, 0x4DBF, "chinese"),     # CJK Extension A
+    (0x4E00, 0x9FFF, "chinese"),     # CJK Unified Ideographs
+    (0xF900, 0xFAFF, "chinese"),     # CJK Compatibility Ideographs
+]
+
+# Japanese kana / Korean hangul share Han characters but are unsupported;
+# their presence means "not confidently chinese".
+_OTHER_CJK_RANGES: list[tuple[int, int]] = [
+    (0x3040, 0x30FF),  # Hiragana + Katakana
+    (0xAC00, 0xD7AF),  # Hangul syllables
+]
+
+
+def _script_of(ch: str) -> str | None:
+    cp = ord(ch)
+    for start, end, lang in _SCRIPT_RANGES:
+        if start <= cp <= end:
+            return lang
+    for start, end in _OTHER_CJK_RANGES:
+        if start <= cp <= end:
+            return "other"
+    if ch.isalpha():
+        return "latin" if cp < 0x0250 else "other"
+    return None
+
+
+# ------------------------------------------------------------------ #
+#  Latin-script trigram model                                          #
+# ------------------------------------------------------------------ #
+
+_SAMPLES: dict[str, str] = {
+    "english": (
+        "Hello, I would like to know the price of your product. "
+        "Can you send me more information about the enterprise plan? "
+        "We are interested in a demo for our team next week. "
+        "What is the cost for a yearly subscription and how does the support work? "
+        "I have an issue with my account and I need help as soon as possible. "
+        "Please contact me by phone or email when you are available. "
+        "Thank you for your quick answer, we are looking forward to working with you. "
+        "Our company has more than fifty employees and we want to grow this year. "
+        "Is there a discount if we buy licenses for the whole organization? "
+        "Could we book a short call with your sales team to go over the details? "
+        "The invoice we received last month was wrong and should be corrected. "
+        "Which integrations do you offer and is there an API for developers? "
+        "I cannot log in since this morning, the page keeps showing an error."
+    ),
+    "spanish": (
+        "Hola, me gustaría saber el precio de su producto. "
+        "¿Pueden enviarme más información sobre el plan empresarial? "
+        "Estamos interesados en una demostración para nuestro equipo la próxima semana. "
+        "¿Cuál es el costo de una suscripción anual y cómo funciona el soporte? "
+        "Tengo un problema con mi cuenta y necesito ayuda lo antes posible. "
+        "Por favor, contáctenme por teléfono o correo cuando estén disponibles. "
+        "Gracias por su rápida respuesta, esperamos trabajar con ustedes. "
+        "Nuestra empresa tiene más de cincuenta empleados y queremos crecer este año. "
+        "¿Hay algún descuento si compramos licencias para toda la organización? "
+        "¿Podríamos reservar una llamada corta con su equipo comercial para ver los detalles? "
+        "La factura que recibimos el mes pasado estaba mal y hay que corregirla. "
+        "¿Qué integraciones ofrecen y existe una API para desarrolladores? "
+        "No puedo entrar desde esta mañana, la página sigue mostrando un error."
+    ),
+    "french": (
+        "Bonjour, je voudrais connaître le prix de votre produit. "
+        "Pouvez-vous m'envoyer plus d'informations sur l'offre entreprise ? "
+        "Nous sommes intéressés par une démonstration pour notre équipe la semaine prochaine. "
+        "Quel est le coût d'un abonnement annuel et comment fonctionne le support ? "
+        "J'ai un problème avec mon compte et j'ai besoin d'aide le plus vite possible. "
+        "Merci de me contacter par téléphone ou par courriel quand vous êtes disponibles. "
+        "Merci pour votre réponse rapide, nous avons hâte de travailler avec vous. "
+        "Notre société compte plus de cinquante employés et nous voulons grandir cette année. "
+        "Y a-t-il une réduction si nous achetons des licences pour toute l'organisation ? "
+        "Pourrions-nous prévoir un court appel avec votre équipe commerciale pour voir les détails ? "
+        "La facture reçue le mois dernier était fausse et doit être corrigée. "
+        "Quelles intégrations proposez-vous et existe-t-il une API pour les développeurs ? "
+        "Je ne peux pas me connecter depuis ce matin, la page affiche toujours une erreur."
+    ),
+    "german": (
+        "Hallo, ich möchte gerne den Preis Ihres Produkts erfahren. "
+        "Können Sie mir weitere Informationen über den Unternehmensplan schicken? "
+        "Wir sind an einer Demo für unser Team in der nächsten Woche interessiert. "
+        "Was kostet ein Jahresabonnement und wie funktioniert der Support? "
+        "Ich habe ein Problem mit meinem Konto und brauche so schnell wie möglich Hilfe. "
+        "Bitte kontaktieren Sie mich per Telefon oder E-Mail, wenn Sie verfügbar sind. "
+        "Vielen Dank für Ihre schnelle Antwort, wir freuen uns auf die Zusammenarbeit. "
+        "Unser Unternehmen hat mehr als fünfzig Mitarbeiter und wir wollen dieses Jahr wachsen. "
+        "Gibt es einen Rabatt, wenn wir Lizenzen für die ganze Organisation kaufen? "
+        "Könnten wir ein kurzes Gespräch mit Ihrem Vertrieb vereinbaren, um die Details zu besprechen? "
+        "Die Rechnung vom letzten Monat war falsch und muss korrigiert werden. "
+        "Welche Integrationen bieten Sie an und gibt es eine Schnittstelle für Entwickler? "
+        "Seit heute Morgen kann ich mich nicht einloggen, die Seite zeigt immer einen Fehler."
+    ),
+    "portuguese": (
+        "Olá, gostaria de saber o preço do seu produto. "
+        "Vocês podem me enviar mais informações sobre o plano empresarial? "
+        "Estamos interessados em uma demonstração para a nossa equipe na próxima semana. "
+        "Qual é o custo de uma assinatura anual e como funciona o suporte? "
+        "Tenho um problema com a minha conta e preciso de ajuda o mais rápido possível. "
+        "Por favor, entrem em contato comigo por telefone ou e-mail quando estiverem disponíveis. "
+        "Obrigado pela resposta rápida, estamos ansiosos para trabalhar com vocês. "
+        "A nossa empresa tem mais de cinquenta funcionários e queremos crescer este ano. "
+        "Existe algum desconto se comprarmos licenças para toda a organização? "
+        "Podemos marcar uma ligação rápida com a equipe comercial para ver os detalhes? "
+        "A fatura que recebemos no mês passado estava errada e precisa ser corrigida. "
+        "Quais integrações vocês oferecem e existe uma API para desenvolvedores? "
+        "Não consigo entrar desde hoje de manhã, a página continua mostrando um erro."
+    ),
+}
+
+# Unsupported languages that Latin-script supported ones are easily
+# confused with. They compete in the model but are never returned: a
+# text that fits one of them best gets zero confidence (ask Gemini).
+_DISTRACTOR_SAMPLES: dict[str, str] = {
+    "italian": (
+        "Salve, vorrei avere maggiori informazioni sul vostro prodotto e sui prezzi. "
+        "Potete mandarmi una presentazione dell'offerta per le aziende? "
+        "Siamo interessati a una prova gratuita per il nostro gruppo il mese prossimo. "
+        "Quanto costa l'abbonamento annuale e come funziona l'assistenza tecnica? "
+        "Ho un problema con il pagamento e ho bisogno di aiuto il prima possibile. "
+        "Vi prego di contattarmi via telefono o posta elettronica quando siete disponibili. "
+        "Grazie mille per la risposta, non vediamo l'ora di lavorare con voi. "
+        "La nostra società ha più di cinquanta dipendenti e vogliamo crescere quest'anno. "
+        "C'è uno sconto se acquistiamo le licenze per tutta l'organizzazione?"
+    ),
+    "dutch": (
+        "Hallo, ik wil graag weten wat de prijs van uw product is. "
+        "Kunt u mij meer informatie sturen over het abonnement voor bedrijven? "
+        "Wij hebben interesse in een demonstratie voor ons team volgende week. "
+        "Wat kost een jaarabonnement en hoe werkt de ondersteuning? "
+        "Ik heb een probleem met mijn account en heb zo snel mogelijk hulp nodig. "
+        "Neem alstublieft contact met mij op per telefoon of e-mail wanneer het u uitkomt. "
+        "Bedankt voor het snelle antwoord, wij kijken ernaar uit om met u samen te werken. "
+        "Ons bedrijf heeft meer dan vijftig medewerkers en wij willen dit jaar groeien. "
+        "Is er korting als wij licenties voor de hele organisatie kopen?"
+    ),
+    "romanized_hindi": (
+        "Namaste, mujhe aapke product ki keemat ke baare mein jaankari chahiye. "
+        "Kya aap mujhe business plan ke baare mein aur details bhej sakte hain? "
+        "Hum agle hafte apni team ke liye demo dekhna chahte hain. "
+        "Saal bhar ki subscription kitne ki hai aur support kaise kaam karta hai? "
+        "Mere account mein dikkat aa rahi hai aur mujhe jaldi madad chahiye. "
+        "Jab aap free ho tab mujhe phone ya email par sampark kijiye. "
+        "Jaldi jawab dene ke liye dhanyavaad, hum aapke saath kaam karne ke liye utsuk hain. "
+        "Hamari company mein pachaas se zyada log kaam karte hain aur hum is saal badhna chahte hain. "
+        "Agar hum poori sanstha ke liye license lein to kya koi discount milega?"
+    ),
+}
+
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+# Below this many trigrams the posterior is shrunk towards uniform,
+# so a two-word message never reports near-certain confidence.
+MIN_TRIGRAMS = 24
+
+# Naive Bayes treats every trigram as independent evidence, so its raw
+# posterior saturates at ~1.0 for any message of a sentence or more —
+# even one in an unsupported language. The log-likelihoods are scaled
+# as if the text had at most this many trigrams.
+EVIDENCE_TRIGRAMS = 30
+
+# Share of the text's trigrams the winning model must have seen for
+# full confidence; below it confidence drops proportionally (text the
+# model mostly can't read, e.g. an unsupported language).
+FULL_COVERAGE = 0.5
+
+
+def _trigrams(text: str) -> list[str]:
+    """Padded character trigrams of every word in *text* (lowercased)."""
+    grams: list[str] = []
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f" {word} "
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _build_model() -> tuple[dict[str, dict[str, float]], dict[str, float]]:
+    """Return per-language trigram log-probabilities and unseen log-probs."""
+    samples = {**_SAMPLES, **_DISTRACTOR_SAMPLES}
+    counts = {lang: Counter(_trigrams(sample)) for lang, sample in samples.items()}
+    vocab = set().union(*counts.values())
+    log_probs: dict[str, dict[str, float]] = {}
+    unseen: dict[str, float] = {}
+    for lang, counter in counts.items():
+        denom = sum(counter.values()) + len(vocab)
+        log_probs[lang] = {g: math.log((c + 1) / denom) for g, c in counter.items()}
+        unseen[lang] = math.log(1 / denom)
+    return log_probs, unseen
+
+
+_LOG_PROBS, _UNSEEN = _build_model()
+LATIN_LANGUAGES = tuple(_SAMPLES)
+
+
+def _detect_latin(text: str) -> tuple[str, float]:
+    grams = _trigrams(text)
+    if not grams:
+        return "english", 0.0
+
+    scale = min(len(grams), EVIDENCE_TRIGRAMS) / len(grams)
+    scores = {
+        lang: scale * sum(log_probs.get(g, _UNSEEN[lang]) for g in grams)
+        for lang, log_probs in _LOG_PROBS.items()
+    }
+    best = max(scores, key=scores.get)
+    top = scores[best]
+    posterior = 1 / sum(math.exp(s - top) for s in scores.values())
+    if best not in LATIN_LANGUAGES:
+        # Best explained by an unsupported language
+        return max(LATIN_LANGUAGES, key=scores.get), 0.0
+
+    coverage = sum(1 for g in grams if g in _LOG_PROBS[best]) / len(grams)
+    posterior *= min(1.0, coverage / FULL_COVERAGE)
+
+    # Shrink towards uniform for short inputs
+    weight = min(1.0, len(grams) / MIN_TRIGRAMS)
+    uniform = 1 / len(_LOG_PROBS)
+    return best, max(0.0, uniform + (posterior - uniform) * weight)
+
+
+# ------------------------------------------------------------------ #
+#  Public API                                                          #
+# ------------------------------------------------------------------ #
+
+def detect_language_local(text: str) -> tuple[str, float]:
+    """
+    Detect the language of *text* offline.
+
+    Returns:
+        (language_name, confidence) — e.g. ("hindi", 0.97).
+        Confidence is 0.0 for empty / letter-free input.
+    """
+    if not text or not text.strip():
+        return "english", 0.0
+
+    by_script: Counter[str] = Counter()
+    for ch in text:
+        script = _script_of(ch)
+        if script:
+            by_script[script] += 1
+
+    total = sum(by_script.values())
+    if total == 0:
+        return "english", 0.0
+
+    script, count = by_script.most_common(1)[0]
+    share = count / total
+
+    if script in ("hindi", "arabic", "chinese"):
+        return script, share
+    if script == "latin":
+        lang, confidence = _detect_latin(text)
+        return lang, confidence * share
+    return "english", 0.0
@@ -0,0 +1,80 @@
+"""
+Lead Counts — O(1) totals for lead listings
+
+Counts per status, language, tag and agent come from the small
+`lead_counts` aggregate table (kept current by triggers, migrations 007
+and 018). The overall total is the sum of the per-status rows; there is
+no global counter row for every insert to contend on.
+The whole table is cached in-process for LEAD_COUNTS_TTL seconds, so a
+dashboard poll normally costs no count query at all.
+
+If the aggregate table is unavailable, counts fall back to a direct
+(filtered) count on `leads`.
+"""
+
+import time
+import logging
+
+from services.env import env_number
+from services.supabase_service import get_lead_count, get_lead_counts
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ("status", "language", "tag", "agent")
+
+_cache: dict[str, dict[str, int]] | None = None
+_cached_at = 0.0
+
+
+def _ttl() -> float:
+    return env_number("LEAD_COUNTS_TTL", 5)
+
+
+def invalidate() -> None:
+    """Drop the cached counters (e.g. right after a write from this process)."""
+    global _cache
+    _cache = None
+
+
+async def get_breakdown() -> dict[str, dict[str, int]]:
+    """
+    Return {dimension: {value: count}} for all, status, language, tag, agent.
+
+    Raises:
+        RuntimeError: If the aggregate table can't be read.
+    """
+    global _cache, _cached_at
+    if _cache is not None and time.monotonic() - _cached_at < _ttl():
+        return _cache
+
+    breakdown: dict[str, dict[str, int]] = {d: {} for d in DIMENSIONS}
+    for row in await get_lead_counts():
+        if row["dimension"] in breakdown:
+            breakdown[row["dimension"]][row["value"]] = int(row["count"])
+    breakdown = {"all": {"": sum(breakdown["status"].values())}, **breakdown}
+
+    _cache = breakdown
+    _cached_at = time.monotonic()
+    return breakdown
+
+
+async def count_leads(status: str | None = None, estimated: bool = False) -> int:
+    """
+    Total leads matching the listing filter.
+
+    Args:
+        status:    Optional status filter (same as GET /leads).
+        estimated: Return the planner's estimate instead of an exact count.
+    """
+    if estimated:
+        return await get_lead_count(status_filter=status, estimated=True)
+
+    try:
+        breakdown = await get_breakdown()
+    except RuntimeError:
+        logger.warning("lead_counts unavailable — falling back to COUNT(*)")
+        return await get_lead_count(status_filter=status)
+
+    if status:
+        return breakdown["status"].get(status, 0)
+    return breakdown["all"].get("", 0)
@@ -0,0 +1,179 @@
+"""
+Lead Worker — Background pool for deferred lead processing
+
+In deferred intake mode the lead row is stored immediately, already
+claimed by this process (translation_status = 'processing' with a
+claim_token and a lease), and queued here. A small pool of asyncio
+workers runs detection, translation, tagging and assignment (via the
+processor callback supplied by the app) and updates the row only while
+the claim still holds.
+
+Pending work survives restarts and is shared between processes: a
+poller claims due rows atomically (claim_pending_leads RPC), so a lead
+whose lease lapsed (crashed process) or whose retry is due is picked up
+by exactly one worker. Failed attempts are rescheduled with exponential
+backoff and marked 'failed' after LEAD_MAX_ATTEMPTS.
+"""
+
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from services.env import env_int, env_number
+from services.supabase_service import claim_pending_leads, release_lead_claim
+
+logger = logging.getLogger(__name__)
+
+Processor = Callable[[dict[str, Any]], Awaitable[None]]
+
+_queue: asyncio.Queue[dict[str, Any]] | None = None
+_workers: list[asyncio.Task[None]] = []
+_poller: asyncio.Task[None] | None = None
+_room: asyncio.Event | None = None  # set whenever a worker takes a lead
+_processor: Processor | None = None
+
+
+def _worker_count() -> int:
+    return max(1, env_int("LEAD_WORKERS", 4))
+
+
+def _capacity() -> int:
+    """Claimed leads the local queue holds at most before the poller waits."""
+    return _worker_count() * 2
+
+
+def _lease_seconds() -> int:
+    return max(1, env_int("LEAD_LEASE_SECONDS", 300))
+
+
+def _retry_at(attempts: int) -> datetime | None:
+    """Next attempt time with jittered exponential backoff, or None to give up."""
+    if attempts >= env_int("LEAD_MAX_ATTEMPTS", 5):
+        return None
+    base = env_number("LEAD_RETRY_BASE", 30)
+    delay = min(base * 2 ** max(0, attempts - 1), env_number("LEAD_RETRY_MAX", 1800))
+    delay *= random.uniform(0.5, 1.0)
+    return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+
+def new_claim() -> dict[str, Any]:
+    """
+    Claim columns for a lead inserted by this process, so the poller of
+    another process doesn't take it while it waits in the local queue.
+    """
+    now = datetime.now(timezone.utc)
+    return {
+        "translation_status": "processing",
+        "claim_token": str(uuid.uuid4()),
+        "claimed_at": now.isoformat(),
+        "attempts": 1,
+        "next_attempt_at": (now + timedelta(seconds=_lease_seconds())).isoformat(),
+    }
+
+
+async def _release(lead: dict[str, Any], exc: Exception) -> None:
+    attempts = int(lead.get("attempts") or 1)
+    retry_at = _retry_at(attempts)
+    if retry_at is None:
+        logger.error("Lead %s failed permanently after %d attempts: %s",
+                     lead.get("id", "?"), attempts, exc)
+    else:
+        logger.warning("Lead %s failed (attempt %d), retrying at %s: %s",
+                       lead.get("id", "?"), attempts, retry_at.isoformat(), exc)
+    try:
+        await release_lead_claim(lead["id"], lead["claim_token"], retry_at)
+    except RuntimeError as release_exc:
+        # The lease still expires, so the lead becomes due again anyway
+        logger.warning("Could not reschedule lead %s: %s", lead.get("id", "?"), release_exc)
+
+
+async def _run_worker(worker_id: int) -> None:
+    assert _queue is not None and _room is not None and _processor is not None
+    while True:
+        lead = await _queue.get()
+        _room.set()
+        try:
+            await _processor(lead)
+        except Exception as exc:
+            logger.error("Worker %d failed to process lead %s: %s",
+                         worker_id, lead.get("id", "?"), exc)
+            await _release(lead, exc)
+        finally:
+            _queue.task_done()
+
+
+async def _run_poller() -> None:
+    """Claim due leads from the DB whenever the local queue has room."""
+    assert _queue is not None and _room is not None
+    poll = env_number("LEAD_POLL_SECONDS", 10)
+    capacity = _capacity()
+    while True:
+        _room.clear()
+        room = capacity - _queue.qsize()
+        if room > 0:
+            try:
+                claimed = await claim_pending_leads(room, _lease_seconds())
+            except RuntimeError as exc:
+                logger.warning("Lead poller: %s", exc)
+                claimed = []
+            for lead in claimed:
+                _queue.put_nowait(lead)
+            if claimed:
+                logger.info("Claimed %d pending leads", len(claimed))
+                if len(claimed) == room:
+                    # Backlog: claim more as soon as a worker frees a slot
+                    await _room.wait()
+                    continue
+        elif not _room.is_set():
+            # Queue full (e.g. local intake): wait for a slot, but no longer
+            # than a poll interval so expired leases are still re-claimed
+            try:
+                await asyncio.wait_for(_room.wait(), timeout=poll)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await asyncio.sleep(poll)
+
+
+async def start_workers(processor: Processor) -> None:
+    """Start the worker pool and the poller that claims pending leads."""
+    global _queue, _processor, _poller, _room
+    if _workers:
+        return
+
+    _queue = asyncio.Queue()
+    _room = asyncio.Event()
+    _processor = processor
+    for i in range(_worker_count()):
+        _workers.append(asyncio.create_task(_run_worker(i)))
+    _poller = asyncio.create_task(_run_poller())
+    logger.info("Started %d lead workers", len(_workers))
+
+
+async def stop_workers() -> None:
+    """Cancel the pool (unfinished claims lapse and are picked up again)."""
+    global _queue, _processor, _poller, _room
+    tasks = [*_workers, *([_poller] if _poller is not None else [])]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _workers.clear()
+    _poller = None
+    _room = None
+    _queue = None
+    _processor = None
+
+
+def enqueue_lead(lead: dict[str, Any]) -> None:
+    """Queue a lead row claimed by this process (see new_claim)."""
+    if _queue is None:
+        raise RuntimeError("Lead workers are not running")
+    _queue.put_nowait(lead)
+
+
+def queue_depth() -> int:
+    """Number of leads waiting for a worker."""
+    return _queue.qsize() if _queue is not None else 0
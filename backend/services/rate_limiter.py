@@ -0,0 +1,164 @@
+"""
+Rate Limiter — Client-side token buckets for Gemini quota
+
+Paces outgoing Gemini calls below the configured quota instead of
+discovering it via 429s:
+  - requests-per-minute bucket (GEMINI_RPM)
+  - tokens-per-minute bucket   (GEMINI_TPM)
+
+Token charges are estimates (input plus expected output, which both
+count towards Gemini's TPM quota) and are settled against the usage
+reported in each response.
+
+Callers wait asynchronously (FIFO). If a call would have to wait
+longer than GEMINI_MAX_WAIT seconds, RateLimitTimeout is raised so the
+caller can take its fallback path. A limit of 0 disables that bucket.
+"""
+
+import os
+import time
+import asyncio
+import logging
+
+from services.env import env_int, env_number
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when a call would wait longer than the configured max wait."""
+
+
+class _TokenBucket:
+    """Continuously refilling bucket holding at most one minute of quota."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until *amount* tokens are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Requests- and tokens-per-minute limiter with queue-depth metrics."""
+
+    def __init__(self, rpm: int, tpm: int, max_wait: float):
+        self.requests = _TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = _TokenBucket(tpm) if tpm > 0 else None
+        self.max_wait = max_wait
+        self._lock = asyncio.Lock()
+
+        self.queue_depth = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_observed_wait = 0.0
+
+    def _time_until(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.time_until(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.time_until(tokens))
+        return wait
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """
+        Wait until one request and *tokens* tokens are available.
+
+        Returns the time spent waiting (seconds).
+
+        Raises:
+            RateLimitTimeout: If the wait would exceed max_wait.
+        """
+        if not self.requests and not self.tokens:
+            return 0.0
+
+        start = time.monotonic()
+        self.queue_depth += 1
+        try:
+            async with self._lock:
+                while True:
+                    wait = self._time_until(tokens)
+                    if wait <= 0:
+                        break
+                    if time.monotonic() - start + wait > self.max_wait:
+                        self.rejected += 1
+                        raise RateLimitTimeout(
+                            f"Gemini rate limit: would wait {wait:.1f}s "
+                            f"(max {self.max_wait:.1f}s)"
+                        )
+                    await asyncio.sleep(wait)
+
+                if self.requests:
+                    self.requests.consume(1)
+                if self.tokens:
+                    self.tokens.consume(tokens)
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_observed_wait = max(self.max_observed_wait, waited)
+        return waited
+
+    def settle(self, tokens: int) -> None:
+        """
+        Correct the tokens-per-minute bucket once a call's real usage is
+        known: *tokens* is actual minus the amount passed to acquire()
+        (negative refunds an over-estimate).
+        """
+        if self.tokens and tokens:
+            self.tokens._refill()
+            self.tokens.tokens = min(self.tokens.capacity, self.tokens.tokens - tokens)
+
+    def stats(self) -> dict[str, float]:
+        """Queue depth and wait-time counters for the metrics endpoint."""
+        return {
+            "queue_depth": self.queue_depth,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "avg_wait_seconds": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+            "max_wait_seconds": round(self.max_observed_wait, 4),
+            "available_requests": round(self.requests.tokens, 2) if self.requests else None,
+            "available_tokens": round(self.tokens.tokens, 2) if self.tokens else None,
+        }
+
+
+# ------------------------------------------------------------------ #
+#  Shared Gemini limiter                                               #
+# ------------------------------------------------------------------ #
+
+_limiter: RateLimiter | None = None
+
+
+def get_limiter() -> RateLimiter:
+    """Return the process-wide Gemini limiter (created after load_dotenv)."""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(
+            rpm=env_int("GEMINI_RPM", 0),
+            tpm=env_int("GEMINI_TPM", 0),
+            max_wait=env_number("GEMINI_MAX_WAIT", 10),
+        )
+        logger.info("Gemini rate limiter: rpm=%s tpm=%s max_wait=%ss",
+                    os.getenv("GEMINI_RPM", "0"), os.getenv("GEMINI_TPM", "0"),
+                    _limiter.max_wait)
+    return _limiter
@@ -0,0 +1,306 @@
+"""
+Routing — Agent roster, skill-based pools and open-lead workload index
+
+Agents come from the `agents` table (migrations 014-015) with optional
+skill profiles: the languages they read/write and the tags they handle.
+
+Each lead is routed to a pool of eligible agents, looked up by
+(language, tag) in a table precomputed whenever the roster is loaded:
+  1. agents speaking the language and handling the tag
+  2. agents speaking the language
+  3. agents handling the tag
+  4. the general pool (every active agent)
+so e.g. Arabic leads reach an Arabic speaker when there is one.
+
+The index tracks which open (not Lost/Won) leads each agent holds:
+  - rebuilt from the DB on startup and every ROUTING_RESYNC_SECONDS;
+    in local mode from every open lead (paged), in db mode only from
+    the trigger-maintained agents.open_leads counts
+  - kept current in between from lead.created / leads.created /
+    lead.status_changed / leads.updated events (registered as an
+    event_bus listener); with count-seeded loads, changes to leads
+    opened before the rebuild are left to the next resync
+  - one min-heap per distinct pool over (open leads, last assignment)
+    gives the pool's least-loaded agent in O(log n); stale heap
+    entries are skipped lazily instead of being searched for
+
+With several workers each process only sees its own events, so in
+ASSIGNMENT_MODE=db (see services/assignment.py) the pick itself is
+made by the assign_least_loaded RPC, restricted to the pool, from the
+trigger-maintained counts. This index serves local mode, the RPC
+fallback, pool lookups and GET /agents.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import logging
+from typing import Any
+
+from services.env import env_number
+from services.supabase_service import OPEN_STATUSES, get_agents, get_open_lead_assignments
+
+logger = logging.getLogger(__name__)
+
+# Used when the agents table can't be read (e.g. migration not applied)
+DEFAULT_AGENTS = ["Agent A", "Agent B", "Agent C"]
+
+Pool = tuple[str, ...]
+
+
+def assignment_mode() -> str:
+    """ASSIGNMENT_MODE: "db" (default) or "local"."""
+    return os.getenv("ASSIGNMENT_MODE", "db").lower()
+
+
+def _skills(values: Any) -> frozenset[str]:
+    return frozenset(str(v).strip().lower() for v in (values or []) if str(v).strip())
+
+
+class WorkloadIndex:
+    """Open leads per agent with lazily-pruned per-pool min-heaps (single event loop)."""
+
+    def __init__(self) -> None:
+        self._load: dict[str, int] = {}
+        self._turn: dict[str, int] = {}
+        self._reserved: dict[str, int] = {}
+        self._leads: dict[str, str] = {}   # open lead id → agent
+        self._counts_only = False           # loads seeded from counts, not ids
+        self._languages: dict[str, frozenset[str]] = {}
+        self._tags: dict[str, frozenset[str]] = {}
+        self._emails: dict[str, str] = {}  # email → agent name
+        self._all: Pool = ()
+        self._routes: dict[tuple[str, str], Pool] = {}
+        self._heaps: dict[Pool, list[tuple[int, int, str]]] = {}
+        self._pools_of: dict[str, list[Pool]] = {}
+        self._ticks = itertools.count(1)
+
+    def reset(
+        self,
+        agents: list[dict[str, Any]],
+        open_leads: list[dict[str, Any]] | None,
+    ) -> None:
+        """
+        Replace the index with *agents* (rows with name and optional
+        email, languages, tags, open_leads) and their open (id,
+        assigned_to) rows, or, if *open_leads* is None, with loads taken
+        from each agent's `open_leads` count.
+        """
+        names = [row["name"] for row in agents]
+        self._counts_only = open_leads is None
+        self._load = {
+            row["name"]: int(row.get("open_leads") or 0) if open_leads is None else 0
+            for row in agents
+        }
+        self._turn = {name: 0 for name in names}
+        self._reserved = {}
+        self._leads = {}
+        self._languages = {row["name"]: _skills(row.get("languages")) for row in agents}
+        self._tags = {row["name"]: _skills(row.get("tags")) for row in agents}
+        self._emails = {
+            row["email"].strip().lower(): row["name"] for row in agents if row.get("email")
+        }
+        for row in open_leads or []:
+            agent = row.get("assigned_to")
+            if agent in self._load:
+                self._leads[row["id"]] = agent
+                self._load[agent] += 1
+
+        self._all = tuple(sorted(names))
+        self._routes = {}
+        self._heaps = {}
+        self._pools_of = {name: [] for name in names}
+        self._add_pool(self._all)
+
+        # Precompute every (language, tag) pair any profile mentions
+        languages = set().union(*self._languages.values()) if names else set()
+        tags = set().union(*self._tags.values()) if names else set()
+        for language in languages | {""}:
+            for tag in tags | {""}:
+                self.route(language, tag)
+
+    @property
+    def agents(self) -> list[str]:
+        return list(self._load)
+
+    @property
+    def pool_count(self) -> int:
+        return len(self._heaps)
+
+    # -------------------------------------------------------------- #
+
+    def _add_pool(self, pool: Pool) -> None:
+        if pool in self._heaps:
+            return
+        heap = [(self._load[a], self._turn[a], a) for a in pool]
+        heapq.heapify(heap)
+        self._heaps[pool] = heap
+        for agent in pool:
+            self._pools_of[agent].append(pool)
+
+    def _pool(self, members: list[str]) -> Pool:
+        pool = tuple(sorted(members))
+        self._add_pool(pool)
+        return pool
+
+    def route(self, language: str = "", tag: str = "") -> Pool:
+        """Eligible agents for a lead in *language* tagged *tag*."""
+        key = (language.strip().lower(), tag.strip().lower())
+        pool = self._routes.get(key)
+        if pool is not None:
+            return pool
+
+        language, tag = key
+        speaks = [a for a in self._all if language and language in self._languages[a]]
+        handles = [a for a in self._all if tag and tag in self._tags[a]]
+        both = [a for a in speaks if a in handles]
+        members = both or speaks or handles
+        pool = self._pool(members) if members else self._all
+        self._routes[key] = pool
+        return pool
+
+    def speaks(self, agent: str, language: str) -> bool:
+        """True if *agent*'s profile lists *language*."""
+        return language.strip().lower() in self._languages.get(agent, frozenset())
+
+    def agent_for_email(self, email: str) -> str | None:
+        return self._emails.get(email.strip().lower())
+
+    # -------------------------------------------------------------- #
+
+    def _push(self, agent: str) -> None:
+        entry = (self._load[agent], self._turn[agent], agent)
+        for pool in self._pools_of[agent]:
+            heap = self._heaps[pool]
+            heapq.heappush(heap, entry)
+            # Compact once stale entries dominate
+            if len(heap) > 4 * len(pool) + 64:
+                heap[:] = [(self._load[a], self._turn[a], a) for a in pool]
+                heapq.heapify(heap)
+
+    def _adjust(self, agent: str, delta: int) -> None:
+        self._load[agent] += delta
+        self._push(agent)
+
+    def least_loaded(self, pool: Pool | None = None) -> str | None:
+        """The pool's agent with the fewest open leads (least recently assigned on ties)."""
+        heap = self._heaps.get(pool if pool is not None else self._all)
+        while heap:
+            load, turn, agent = heap[0]
+            if self._load.get(agent) == load and self._turn.get(agent) == turn:
+                return agent
+            heapq.heappop(heap)
+        return None
+
+    def take(self, pool: Pool | None = None) -> str | None:
+        """Assign the pool's least-loaded agent and reserve the slot until its lead is seen."""
+        agent = self.least_loaded(pool)
+        if agent is None:
+            return None
+        self._turn[agent] = next(self._ticks)
+        self._reserved[agent] = self._reserved.get(agent, 0) + 1
+        self._adjust(agent, 1)
+        return agent
+
+    def observe(self, lead: dict[str, Any], created: bool = False) -> None:
+        """
+        Apply a lead row (or partial {"id", "status"?, "assigned_to"?}
+        update) to the index. *created* marks a lead that is new since
+        the last rebuild.
+        """
+        lead_id = lead.get("id")
+        if not lead_id:
+            return
+        if self._counts_only and not created and lead_id not in self._leads:
+            # Already in the seeded counts; its previous state is unknown
+            return
+        previous = self._leads.pop(lead_id, None)
+        if previous is not None:
+            self._adjust(previous, -1)
+
+        agent = lead["assigned_to"] if "assigned_to" in lead else previous
+        status = lead.get("status")
+        is_open = status in OPEN_STATUSES if status is not None else previous is not None
+        if not is_open or agent not in self._load:
+            return
+
+        self._leads[lead_id] = agent
+        if self._reserved.get(agent):
+            # Slot already counted by take()
+            self._reserved[agent] -= 1
+        else:
+            self._adjust(agent, 1)
+
+    def snapshot(self) -> dict[str, int]:
+        return dict(self._load)
+
+
+# ------------------------------------------------------------------ #
+#  Shared index                                                        #
+# ------------------------------------------------------------------ #
+
+index = WorkloadIndex()
+_built_at: float | None = None
+_rebuild_lock = asyncio.Lock()
+
+
+def _resync_seconds() -> float:
+    return env_number("ROUTING_RESYNC_SECONDS", 300)
+
+
+async def rebuild() -> None:
+    """
+    Reload the roster from the DB (defaults if unavailable). Local mode
+    also pages in every open lead; db mode seeds loads from the
+    agents' open_leads counts.
+    """
+    global _built_at
+    async with _rebuild_lock:
+        try:
+            agents = await get_agents()
+            open_leads = (
+                await get_open_lead_assignments() if assignment_mode() == "local" else None
+            )
+        except RuntimeError as exc:
+            logger.warning("Routing index using default agents: %s", exc)
+            agents = [{"name": name} for name in DEFAULT_AGENTS]
+            open_leads = []
+        index.reset(agents, open_leads)
+        _built_at = time.monotonic()
+        logger.info("Routing index built: %s", index.snapshot())
+
+
+async def ensure_fresh() -> None:
+    """Rebuild the index if it was never built or is older than the resync period."""
+    if _built_at is None or time.monotonic() - _built_at >= _resync_seconds():
+        await rebuild()
+
+
+async def agent_names() -> list[str]:
+    """Active agent names."""
+    await ensure_fresh()
+    return index.agents
+
+
+def on_event(event_type: str, data: dict[str, Any]) -> None:
+    """event_bus listener: keep the index current from lead events."""
+    if event_type in ("lead.created", "lead.status_changed"):
+        index.observe(data, created=event_type == "lead.created")
+    elif event_type == "leads.created":
+        for lead in data.get("leads", []):
+            index.observe(lead, created=True)
+    elif event_type == "leads.updated":
+        fields = {k: v for k, v in data.items() if k != "ids"}
+        for lead_id in data.get("ids", []):
+            index.observe({"id": lead_id, **fields})
+
+
+def stats() -> dict[str, Any]:
+    """Open leads per agent for the metrics endpoint."""
+    return {
+        "open_leads": index.snapshot(),
+        "pools": index.pool_count,
+        "age_seconds": round(time.monotonic() - _built_at, 1) if _built_at else None,
+    }
@@ -2,16 +2,23 @@
 Supabase Service — Database Client & Lead Operations
 
 Provides:
-  - Supabase client initialization
+  - Async Supabase client initialization (shared, tuned HTTP pool)
   - Lead CRUD operations (insert, list)
+
+All queries are awaited on the async PostgREST client, so a DB
+round-trip never blocks the event loop.
 """
 
 import os
+import asyncio
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from supabase import create_client, Client
+import httpx
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+
+from services.env import env_int, env_number
 
 logger = logging.getLogger(__name__)
 
@@ -19,29 +26,64 @@ logger = logging.getLogger(__name__)
 #  Client                                                              #
 # ------------------------------------------------------------------ #
 
-_client: Client | None = None
-
-
-def get_supabase() -> Client:
-    """Return a singleton Supabase client."""
-    global _client
-    if _client is None:
-        url = os.getenv("SUPABASE_URL", "")
-        key = os.getenv("SUPABASE_KEY", "")
-        if not url or not key:
-            raise RuntimeError(
-                "SUPABASE_URL and SUPABASE_KEY must be set in .env"
+_client: AsyncClient | None = None
+_http: httpx.AsyncClient | None = None
+_client_lock = asyncio.Lock()
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    """Shared HTTP pool for PostgREST calls (keep-alive, pool size, timeouts)."""
+    pool_size = env_int("SUPABASE_POOL_SIZE", 20)
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=env_number("SUPABASE_KEEPALIVE", 30),
+        ),
+        timeout=httpx.Timeout(
+            env_number("SUPABASE_TIMEOUT", 10),
+            connect=env_number("SUPABASE_CONNECT_TIMEOUT", 5),
+        ),
+    )
+
+
+async def get_supabase() -> AsyncClient:
+    """Return a singleton async Supabase client backed by a shared HTTP pool."""
+    global _client, _http
+    if _client is not None:
+        return _client
+    async with _client_lock:
+        if _client is None:
+            url = os.getenv("SUPABASE_URL", "")
+            key = os.getenv("SUPABASE_KEY", "")
+            if not url or not key:
+                raise RuntimeError(
+                    "SUPABASE_URL and SUPABASE_KEY must be set in .env"
+                )
+            _http = _build_http_client()
+            _client = await acreate_client(
+                url, key, options=AsyncClientOptions(httpx_client=_http),
             )
-        _client = create_client(url, key)
-        logger.info("Supabase client initialized")
+            logger.info("Supabase client initialized")
     return _client
 
 
+async def close_supabase() -> None:
+    """Close the shared HTTP pool (called from the app lifespan)."""
+    global _client, _http
+    if _http is not None:
+        await _http.aclose()
+        logger.info("Supabase HTTP pool closed")
+    _client = None
+    _http = None
+
+
 # ------------------------------------------------------------------ #
 #  Lead Operations                                                     #
 # ------------------------------------------------------------------ #
 
 LEADS_TABLE = "leads"
+LEADS_SUMMARY_VIEW = "leads_summary"
 
 
 async def insert_lead(lead_data: dict[str, Any]) -> dict[str, Any]:
@@ -58,8 +100,8 @@ async def insert_lead(lead_data: dict[str, Any]) -> dict[str, Any]:
         RuntimeError: If the insert fails.
     """
     try:
-        client = get_supabase()
-        response = (
+        client = await get_supabase()
+        response = await (
             client.table(LEADS_TABLE)
             .insert(lead_data)
             .execute()
@@ -76,35 +118,107 @@ async def insert_lead(lead_data: dict[str, Any]) -> dict[str, Any]:
         raise RuntimeError(f"Database insert failed: {exc}") from exc
 
 
+class PartialInsertError(RuntimeError):
+    """A bulk insert failed part-way; *inserted* holds the committed rows."""
+
+    def __init__(self, message: str, inserted: list[dict[str, Any]]):
+        super().__init__(message)
+        self.inserted = inserted
+
+
+async def insert_leads(
+    leads_data: list[dict[str, Any]],
+    chunk_size: int = 500,
+) -> list[dict[str, Any]]:
+    """
+    Insert many leads with multi-row inserts of at most *chunk_size* rows.
+
+    Returns:
+        The inserted rows, in input order.
+
+    Raises:
+        PartialInsertError: If a chunk fails. Earlier chunks stay inserted
+                            and are returned in its `inserted` attribute;
+                            later chunks are not attempted.
+    """
+    inserted: list[dict[str, Any]] = []
+    try:
+        client = await get_supabase()
+        for start in range(0, len(leads_data), chunk_size):
+            response = await (
+                client.table(LEADS_TABLE)
+                .insert(leads_data[start:start + chunk_size])
+                .execute()
+            )
+            inserted.extend(response.data or [])
+        logger.info("Bulk-inserted %d leads", len(inserted))
+        return inserted
+    except Exception as exc:
+        logger.error("Failed to bulk-insert leads after %d rows: %s", len(inserted), exc)
+        raise PartialInsertError(f"Database insert failed: {exc}", inserted) from exc
+
+
 async def get_all_leads(
     limit: int = 100,
     offset: int = 0,
     status_filter: str | None = None,
+    cursor: tuple[str, str] | None = None,
+    fields: list[str] | None = None,
+    summary: bool = False,
+    include_replies: bool = False,
 ) -> list[dict[str, Any]]:
     """
     Retrieve leads from the `leads` table.
 
     Args:
         limit:          Max rows to return (default 100).
-        offset:         Pagination offset.
+        offset:         Pagination offset (ignored when *cursor* is given).
         status_filter:  Optional filter by status (e.g. 'New', 'Contacted').
+        cursor:         Optional keyset position (created_at, id) of the
+                        last row already seen; returns rows strictly after it.
+        fields:         Optional column projection (default: all columns).
+        summary:        Read from the `leads_summary` view (message
+                        previews instead of full bodies).
+        include_replies: Embed each lead's replies (oldest first) via the
+                        `fk_replies_lead` foreign key.
 
     Returns:
-        List of lead dictionaries, ordered by created_at descending.
+        List of lead dictionaries, ordered by (created_at, id) descending.
     """
     try:
-        client = get_supabase()
+        client = await get_supabase()
+        columns = ",".join(fields) if fields else "*"
+        if include_replies:
+            columns += ",replies(*)"
         query = (
-            client.table(LEADS_TABLE)
-            .select("*")
+            client.table(LEADS_SUMMARY_VIEW if summary else LEADS_TABLE)
+            .select(columns)
             .order("created_at", desc=True)
-            .range(offset, offset + limit - 1)
+            .order("id", desc=True)
         )
+        if include_replies:
+            query = query.order("created_at", desc=False, foreign_table=REPLIES_TABLE)
 
         if status_filter:
             query = query.eq("status", status_filter)
 
-        response = query.execute()
+        if cursor:
+            created_at, lead_id = cursor
+            # PostgREST has no row comparison, so the keyset predicate is
+            # an OR; the redundant created_at bound is what lets the planner
+            # start the idx_leads_created_at_id scan at the cursor.
+            query = (
+                query.lte("created_at", created_at)
+                .or_(
+                    f'created_at.lt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.lt.{lead_id})'
+                )
+                .limit(limit)
+            )
+        else:
+            query = query.range(offset, offset + limit - 1)
+
+        response = await query.execute()
         return response.data or []
 
     except Exception as exc:
@@ -112,15 +226,87 @@ async def get_all_leads(
         raise RuntimeError(f"Database query failed: {exc}") from exc
 
 
-async def get_lead_count() -> int:
-    """Return total number of leads in the database."""
+async def get_leads_changed_since(
+    watermark: tuple[str, str] | None,
+    until: str,
+    limit: int = 200,
+) -> list[dict[str, Any]]:
+    """
+    Retrieve leads inserted or updated after *watermark*.
+
+    Args:
+        watermark: (updated_at, id) of the last row already seen, or None
+                   to start from the beginning.
+        until:     Only rows with updated_at <= this ISO timestamp (lets
+                   in-flight transactions settle before rows are handed out).
+        limit:     Max rows to return.
+
+    Returns:
+        List of lead dictionaries, ordered by (updated_at, id) ascending.
+    """
     try:
-        client = get_supabase()
-        response = (
+        client = await get_supabase()
+        query = (
             client.table(LEADS_TABLE)
-            .select("id", count="exact")
-            .execute()
+            .select("*")
+            .lte("updated_at", until)
+            .order("updated_at", desc=False)
+            .order("id", desc=False)
+            .limit(limit)
+        )
+        if watermark:
+            updated_at, lead_id = watermark
+            # Redundant lower bound makes the OR sargable on idx_leads_updated_at_id
+            query = query.gte("updated_at", updated_at).or_(
+                f'updated_at.gt."{updated_at}",'
+                f'and(updated_at.eq."{updated_at}",id.gt.{lead_id})'
+            )
+        response = await query.execute()
+        return response.data or []
+    except Exception as exc:
+        logger.error("Failed to fetch changed leads: %s", exc)
+        raise RuntimeError(f"Database query failed: {exc}") from exc
+
+
+async def get_changes_horizon(settle_seconds: float) -> str:
+    """
+    Return the database clock minus *settle_seconds* (ISO timestamp) via
+    the `leads_changes_horizon` RPC — the same clock that stamps
+    updated_at, so watermarks don't depend on app-server clock skew.
+
+    Raises:
+        RuntimeError: If the RPC fails.
+    """
+    try:
+        client = await get_supabase()
+        response = await client.rpc(
+            "leads_changes_horizon", {"settle_seconds": settle_seconds},
+        ).execute()
+        if not response.data:
+            raise RuntimeError("Horizon returned empty data")
+        return str(response.data)
+    except Exception as exc:
+        logger.error("Failed to fetch changes horizon: %s", exc)
+        raise RuntimeError(f"Database query failed: {exc}") from exc
+
+
+async def get_lead_count(status_filter: str | None = None, estimated: bool = False) -> int:
+    """
+    Return the number of leads (optionally only those with *status_filter*).
+
+    With *estimated* the planner's row estimate is returned instead of
+    an exact count.
+    """
+    try:
+        client = await get_supabase()
+        query = (
+            client.table(LEADS_TABLE)
+            .select("id", count="planned" if estimated else "exact")
+            .limit(1)
         )
+        if status_filter:
+            query = query.eq("status", status_filter)
+        response = await query.execute()
         return response.count or 0
     except Exception as exc:
         logger.error("Failed to count leads: %s", exc)
@@ -142,8 +328,8 @@ async def update_lead_status(lead_id: str, status: str) -> dict[str, Any]:
         RuntimeError: If the update fails or lead is not found.
     """
     try:
-        client = get_supabase()
-        response = (
+        client = await get_supabase()
+        response = await (
             client.table(LEADS_TABLE)
             .update({"status": status})
             .eq("id", lead_id)
@@ -161,6 +347,199 @@ async def update_lead_status(lead_id: str, status: str) -> dict[str, Any]:
         raise RuntimeError(f"Database update failed: {exc}") from exc
 
 
+async def update_lead(lead_id: str, fields: dict[str, Any]) -> dict[str, Any]:
+    """
+    Update arbitrary columns of a lead.
+
+    Args:
+        lead_id: UUID of the lead to update.
+        fields:  Column → value mapping.
+
+    Returns:
+        The updated row as a dictionary.
+
+    Raises:
+        RuntimeError: If the update fails or lead is not found.
+    """
+    try:
+        client = await get_supabase()
+        response = await (
+            client.table(LEADS_TABLE)
+            .update(fields)
+            .eq("id", lead_id)
+            .execute()
+        )
+
+        if response.data and len(response.data) > 0:
+            return response.data[0]
+
+        raise RuntimeError(f"Lead {lead_id} not found")
+
+    except Exception as exc:
+        logger.error("Failed to update lead %s: %s", lead_id, exc)
+        raise RuntimeError(f"Database update failed: {exc}") from exc
+
+
+async def claim_pending_leads(batch_size: int, lease_seconds: int) -> list[dict[str, Any]]:
+    """
+    Claim up to *batch_size* due pending leads for this worker pool via
+    the `claim_pending_leads` RPC. Each returned row carries the
+    `claim_token` that later updates must present.
+
+    Raises:
+        RuntimeError: If the RPC fails.
+    """
+    try:
+        client = await get_supabase()
+        response = await client.rpc(
+            "claim_pending_leads",
+            {"batch_size": batch_size, "lease_seconds": lease_seconds},
+        ).execute()
+        return response.data or []
+    except Exception as exc:
+        logger.error("Failed to claim pending leads: %s", exc)
+        raise RuntimeError(f"Database query failed: {exc}") from exc
+
+
+async def update_claimed_lead(
+    lead_id: str,
+    claim_token: str,
+    fields: dict[str, Any],
+) -> dict[str, Any] | None:
+    """
+    Update a lead only while this worker still holds its claim.
+
+    Returns:
+        The updated row, or None if the claim was lost (the lease expired
+        and another worker took the lead).
+
+    Raises:
+        RuntimeError: If the update fails.
+    """
+    try:
+        client = await get_supabase()
+        response = await (
+            client.table(LEADS_TABLE)
+            .update({**fields, "claim_token": None})
+            .eq("id", lead_id)
+            .eq("claim_token", claim_token)
+            .execute()
+        )
+        return response.data[0] if response.data else None
+    except Exception as exc:
+        logger.error("Failed to update claimed lead %s: %s", lead_id, exc)
+        raise RuntimeError(f"Database update failed: {exc}") from exc
+
+
+async def release_lead_claim(
+    lead_id: str,
+    claim_token: str,
+    next_attempt_at: datetime | None,
+) -> None:
+    """
+    Record a failed processing attempt: retry at *next_attempt_at*, or
+    give up (translation_status 'failed') when it is None. No-op if the
+    claim was already lost.
+
+    Raises:
+        RuntimeError: If the update fails.
+    """
+    fields: dict[str, Any] = {"claim_token": None}
+    if next_attempt_at is None:
+        fields["translation_status"] = "failed"
+    else:
+        fields["translation_status"] = "pending"
+        fields["next_attempt_at"] = next_attempt_at.isoformat()
+    try:
+        client = await get_supabase()
+        await (
+            client.table(LEADS_TABLE)
+            .update(fields)
+            .eq("id", lead_id)
+            .eq("claim_token", claim_token)
+            .execute()
+        )
+    except Exception as exc:
+        logger.error("Failed to release lead %s: %s", lead_id, exc)
+        raise RuntimeError(f"Database update failed: {exc}") from exc
+
+
+LEAD_FILTER_COLUMNS = ("status", "assigned_to", "language", "tag")
+
+
+async def bulk_update_leads(
+    fields: dict[str, Any],
+    ids: list[str] | None = None,
+    filters: dict[str, str] | None = None,
+    chunk_size: int = 100,
+    max_rows: int = 10000,
+) -> dict[str, Any]:
+    """
+    Apply *fields* to many leads with set-based UPDATE ... RETURNING.
+
+    Args:
+        fields:     Columns to set (e.g. {"status": "Lost"}).
+        ids:        Explicit lead ids to update, or
+        filters:    Column → value equality filter selecting the leads
+                    (columns from LEAD_FILTER_COLUMNS).
+        chunk_size: Max ids per UPDATE statement (ids travel in the
+                    URL, so ~100 keeps it well under common limits).
+        max_rows:   Upper bound on rows selected by *filters*.
+
+    Returns:
+        {"requested": number of leads selected, "ids": ids actually updated}
+
+    Raises:
+        ValueError:   If *filters* selects more than *max_rows* leads
+                      (nothing is updated).
+        RuntimeError: If a query fails (earlier chunks stay applied).
+    """
+    filters = {k: v for k, v in (filters or {}).items() if k in LEAD_FILTER_COLUMNS and v}
+    updated: list[str] = []
+    try:
+        client = await get_supabase()
+
+        if ids is None:
+            # Resolve the filter to ids first so each UPDATE stays bounded;
+            # one id past the cap tells an oversized selection apart
+            ids = []
+            while len(ids) <= max_rows:
+                query = client.table(LEADS_TABLE).select("id").order("id")
+                for column, value in filters.items():
+                    query = query.eq(column, value)
+                if ids:
+                    query = query.gt("id", ids[-1])
+                page_size = min(1000, max_rows + 1 - len(ids))
+                response = await query.limit(page_size).execute()
+                page = [row["id"] for row in response.data or []]
+                ids.extend(page)
+                if len(page) < page_size:
+                    break
+            if len(ids) > max_rows:
+                raise ValueError(f"Filter matches more than {max_rows} leads")
+
+        for start in range(0, len(ids), chunk_size):
+            query = (
+                client.table(LEADS_TABLE)
+                .update(fields)
+                .in_("id", ids[start:start + chunk_size])
+            )
+            # Re-check the filter so rows changed meanwhile are skipped
+            for column, value in filters.items():
+                query = query.eq(column, value)
+            response = await query.execute()
+            updated.extend(row["id"] for row in response.data or [])
+
+        logger.info("Bulk-updated %d leads: %s", len(updated), fields)
+        return {"requested": len(ids), "ids": updated}
+
+    except ValueError:
+        raise
+    except Exception as exc:
+        logger.error("Failed to bulk-update leads after %d rows: %s", len(updated), exc)
+        raise RuntimeError(f"Database update failed: {exc}") from exc
+
+
 # ------------------------------------------------------------------ #
 #  Reply Operations                                                    #
 # ------------------------------------------------------------------ #
@@ -171,8 +550,8 @@ REPLIES_TABLE = "replies"
 async def get_lead_by_id(lead_id: str) -> dict[str, Any] | None:
     """Fetch a single lead by its UUID."""
     try:
-        client = get_supabase()
-        response = (
+        client = await get_supabase()
+        response = await (
             client.table(LEADS_TABLE)
             .select("*")
             .eq("id", lead_id)
@@ -197,8 +576,8 @@ async def insert_reply(reply_data: dict[str, Any]) -> dict[str, Any]:
         The inserted row as a dictionary.
     """
     try:
-        client = get_supabase()
-        response = (
+        client = await get_supabase()
+        response = await (
             client.table(REPLIES_TABLE)
             .insert(reply_data)
             .execute()
@@ -215,8 +594,8 @@ async def insert_reply(reply_data: dict[str, Any]) -> dict[str, Any]:
 async def get_replies_for_lead(lead_id: str) -> list[dict[str, Any]]:
     """Retrieve all replies for a given lead, ordered by creation date."""
     try:
-        client = get_supabase()
-        response = (
+        client = await get_supabase()
+        response = await (
             client.table(REPLIES_TABLE)
             .select("*")
             .eq("lead_id", lead_id)
@@ -228,3 +607,391 @@ async def get_replies_for_lead(lead_id: str) -> list[dict[str, Any]]:
         logger.error("Failed to fetch replies for lead %s: %s", lead_id, exc)
         return []
 
+
+
+async def get_replies_for_leads(
+    lead_ids: list[str],
+    chunk_size: int = 100,
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Retrieve replies for many leads with one `in.(...)` query per chunk.
+
+    Returns:
+        {lead_id: [replies ordered by creation date]} — every requested
+        id is present, with an empty list if it has no replies.
+    """
+    grouped: dict[str, list[dict[str, Any]]] = {lead_id: [] for lead_id in lead_ids}
+    try:
+        client = await get_supabase()
+        for start in range(0, len(lead_ids), chunk_size):
+            response = await (
+                client.table(REPLIES_TABLE)
+                .select("*")
+                .in_("lead_id", lead_ids[start:start + chunk_size])
+                .order("created_at", desc=False)
+                .execute()
+            )
+            for reply in response.data or []:
+                grouped.setdefault(reply["lead_id"], []).append(reply)
+        return grouped
+    except Exception as exc:
+        logger.error("Failed to fetch replies for %d leads: %s", len(lead_ids), exc)
+        raise RuntimeError(f"Database query failed: {exc}") from exc
+
+
+# ------------------------------------------------------------------ #
+#  Translation Cache Operations                                        #
+# ------------------------------------------------------------------ #
+
+TRANSLATIONS_TABLE = "translations"
+
+
+async def get_cached_translation(cache_key: str) -> str | None:
+    """Look up a cached translation by its key. Returns None on miss or error."""
+    try:
+        client = await get_supabase()
+        response = await (
+            client.table(TRANSLATIONS_TABLE)
+            .select("translated_text")
+            .eq("cache_key", cache_key)
+            .limit(1)
+            .execute()
+        )
+        if response.data and len(response.data) > 0:
+            return response.data[0].get("translated_text")
+        return None
+    except Exception as exc:
+        logger.warning("Failed to read cached translation: %s", exc)
+        return None
+
+
+async def upsert_cached_translation(record: dict[str, Any]) -> None:
+    """Insert or replace a cached translation (best-effort)."""
+    try:
+        client = await get_supabase()
+        await (
+            client.table(TRANSLATIONS_TABLE)
+            .upsert(record, on_conflict="cache_key")
+            .execute()
+        )
+    except Exception as exc:
+        logger.warning("Failed to store cached translation: %s", exc)
+
+
+async def get_cached_translations(
+    cache_keys: list[str],
+    chunk_size: int = 100,
+) -> dict[str, str]:
+    """
+    Look up many cached translations with one `in.(...)` query per chunk.
+
+    Returns:
+        {cache_key: translated_text} for the keys found; {} on error.
+    """
+    found: dict[str, str] = {}
+    try:
+        client = await get_supabase()
+        for start in range(0, len(cache_keys), chunk_size):
+            response = await (
+                client.table(TRANSLATIONS_TABLE)
+                .select("cache_key,translated_text")
+                .in_("cache_key", cache_keys[start:start + chunk_size])
+                .execute()
+            )
+            for row in response.data or []:
+                found[row["cache_key"]] = row["translated_text"]
+        return found
+    except Exception as exc:
+        logger.warning("Failed to read cached translations: %s", exc)
+        return found
+
+
+async def upsert_cached_translations(records: list[dict[str, Any]]) -> None:
+    """Insert or replace many cached translations in one request (best-effort)."""
+    if not records:
+        return
+    try:
+        client = await get_supabase()
+        await (
+            client.table(TRANSLATIONS_TABLE)
+            .upsert(records, on_conflict="cache_key")
+            .execute()
+        )
+    except Exception as exc:
+        logger.warning("Failed to store %d cached translations: %s", len(records), exc)
+
+
+# ------------------------------------------------------------------ #
+#  Assignment Operations                                               #
+# ------------------------------------------------------------------ #
+
+AGENTS_TABLE = "agents"
+OPEN_STATUSES = ("New", "Contacted", "Qualified")
+
+
+async def get_agents(active_only: bool = True) -> list[dict[str, Any]]:
+    """
+    Return the agent roster with each agent's trigger-maintained
+    `open_leads` count, ordered by name.
+
+    Raises:
+        RuntimeError: If the query fails (e.g. migration not applied).
+    """
+    try:
+        client = await get_supabase()
+        query = client.table(AGENTS_TABLE).select("*")
+        if active_only:
+            query = query.eq("active", True)
+        response = await query.order("name").execute()
+        return response.data or []
+    except Exception as exc:
+        logger.error("Failed to fetch agents: %s", exc)
+        raise RuntimeError(f"Database query failed: {exc}") from exc
+
+
+async def get_open_lead_assignments(page_size: int = 1000) -> list[dict[str, Any]]:
+    """
+    Return (id, assigned_to) for every lead that is not Lost/Won,
+    paging by id.
+
+    Raises:
+        RuntimeError: If a query fails.
+    """
+    rows: list[dict[str, Any]] = []
+    try:
+        client = await get_supabase()
+        while True:
+            query = (
+                client.table(LEADS_TABLE)
+                .select("id, assigned_to")
+                .in_("status", list(OPEN_STATUSES))
+                .order("id")
+            )
+            if rows:
+                query = query.gt("id", rows[-1]["id"])
+            response = await query.limit(page_size).execute()
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+    except Exception as exc:
+        logger.error("Failed to fetch open leads: %s", exc)
+        raise RuntimeError(f"Database query failed: {exc}") from exc
+
+
+async def assign_least_loaded(count: int = 1, candidates: list[str] | None = None) -> list[str]:
+    """
+    Reserve *count* agents, least-loaded first, via the
+    `assign_least_loaded` RPC (atomic across workers). Each pick is
+    counted in the agent's open_leads until its lead is written, or
+    until release_agent_reservations gives it back.
+
+    Args:
+        count:      Number of leads to assign.
+        candidates: Eligible agent names, or None for every active agent.
+
+    Raises:
+        RuntimeError: If the RPC fails or returns the wrong number of agents.
+    """
+    try:
+        client = await get_supabase()
+        response = await client.rpc(
+            "assign_least_loaded", {"n": count, "candidates": candidates},
+        ).execute()
+        assigned = response.data or []
+        if len(assigned) != count:
+            raise RuntimeError(f"assign_least_loaded returned {len(assigned)}/{count} agents")
+        return assigned
+    except Exception as exc:
+        logger.error("Failed to assign %d agents: %s", count, exc)
+        raise RuntimeError(f"Agent assignment failed: {exc}") from exc
+
+
+async def release_agent_reservations(names: list[str]) -> None:
+    """
+    Return slots reserved by assign_least_loaded whose leads were never
+    written (one entry per slot) via the `release_agent_reservations` RPC.
+
+    Raises:
+        RuntimeError: If the RPC fails.
+    """
+    if not names:
+        return
+    try:
+        client = await get_supabase()
+        await client.rpc("release_agent_reservations", {"names": names}).execute()
+    except Exception as exc:
+        logger.error("Failed to release %d agent reservations: %s", len(names), exc)
+        raise RuntimeError(f"Agent release failed: {exc}") from exc
+
+
+# ------------------------------------------------------------------ #
+#  Lead Count Operations                                               #
+# ------------------------------------------------------------------ #
+
+LEAD_COUNTS_TABLE = "lead_counts"
+
+
+async def get_lead_counts() -> list[dict[str, Any]]:
+    """
+    Return every row of the trigger-maintained `lead_counts` table.
+
+    Raises:
+        RuntimeError: If the query fails (e.g. migration not applied).
+    """
+    try:
+        client = await get_supabase()
+        response = await (
+            client.table(LEAD_COUNTS_TABLE)
+            .select("dimension, value, count")
+            .execute()
+        )
+        return response.data or []
+    except Exception as exc:
+        logger.error("Failed to fetch lead counts: %s", exc)
+        raise RuntimeError(f"Database query failed: {exc}") from exc
+
+
+# ------------------------------------------------------------------ #
+#  Email Outbox Operations                                             #
+# ------------------------------------------------------------------ #
+
+EMAIL_OUTBOX_TABLE = "email_outbox"
+
+
+async def insert_reply_with_email(
+    reply_data: dict[str, Any],
+    email: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Insert a reply and its outbox email in one transaction via the
+    `insert_reply_with_email` RPC.
+
+    Args:
+        reply_data: Dictionary with reply fields.
+        email:      Outbox fields (to_email, to_name, payload).
+
+    Returns:
+        The inserted reply row as a dictionary.
+
+    Raises:
+        RuntimeError: If the RPC fails or returns nothing.
+    """
+    try:
+        client = await get_supabase()
+        response = await client.rpc(
+            "insert_reply_with_email", {"reply": reply_data, "email": email},
+        ).execute()
+        if response.data:
+            logger.info("Reply inserted with outbox email: %s",
+                        response.data[0].get("id", "?"))
+            return response.data[0]
+        raise RuntimeError("Insert returned empty data")
+    except Exception as exc:
+        logger.error("Failed to insert reply: %s", exc)
+        raise RuntimeError(f"Database insert failed: {exc}") from exc
+
+
+async def claim_email_outbox(batch_size: int, lease_seconds: int) -> list[dict[str, Any]]:
+    """
+    Claim up to *batch_size* due outbox emails for this sender.
+
+    Raises:
+        RuntimeError: If the RPC fails.
+    """
+    try:
+        client = await get_supabase()
+        response = await client.rpc(
+            "claim_email_outbox",
+            {"batch_size": batch_size, "lease_seconds": lease_seconds},
+        ).execute()
+        return response.data or []
+    except Exception as exc:
+        logger.error("Failed to claim outbox emails: %s", exc)
+        raise RuntimeError(f"Database query failed: {exc}") from exc
+
+
+async def claim_reply_email(reply_id: str, lease_seconds: int) -> list[dict[str, Any]]:
+    """
+    Claim the not-yet-attempted outbox email of one reply (inline
+    delivery right after the reply is stored).
+
+    Raises:
+        RuntimeError: If the update fails.
+    """
+    lease_until = datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+    try:
+        client = await get_supabase()
+        response = await (
+            client.table(EMAIL_OUTBOX_TABLE)
+            .update({
+                "status": "sending",
+                "attempts": 1,
+                "next_attempt_at": lease_until.isoformat(),
+            })
+            .eq("reply_id", reply_id)
+            .eq("status", "pending")
+            .eq("attempts", 0)
+            .execute()
+        )
+        return response.data or []
+    except Exception as exc:
+        logger.error("Failed to claim email for reply %s: %s", reply_id, exc)
+        raise RuntimeError(f"Database update failed: {exc}") from exc
+
+
+async def mark_emails_sent(email_ids: list[str]) -> None:
+    """
+    Mark outbox emails as delivered.
+
+    Raises:
+        RuntimeError: If the update fails.
+    """
+    if not email_ids:
+        return
+    try:
+        client = await get_supabase()
+        await (
+            client.table(EMAIL_OUTBOX_TABLE)
+            .update({
+                "status": "sent",
+                "sent_at": datetime.now(timezone.utc).isoformat(),
+                "last_error": None,
+            })
+            .in_("id", email_ids)
+            .execute()
+        )
+    except Exception as exc:
+        logger.error("Failed to mark %d emails sent: %s", len(email_ids), exc)
+        raise RuntimeError(f"Database update failed: {exc}") from exc
+
+
+async def reschedule_email(
+    email_id: str,
+    error: str,
+    next_attempt_at: datetime | None,
+) -> None:
+    """
+    Record a failed delivery: retry at *next_attempt_at*, or give up
+    (status 'failed') when it is None.
+
+    Raises:
+        RuntimeError: If the update fails.
+    """
+    fields: dict[str, Any] = {"last_error": error[:1000]}
+    if next_attempt_at is None:
+        fields["status"] = "failed"
+    else:
+        fields["status"] = "pending"
+        fields["next_attempt_at"] = next_attempt_at.isoformat()
+    try:
+        client = await get_supabase()
+        await (
+            client.table(EMAIL_OUTBOX_TABLE)
+            .update(fields)
+            .eq("id", email_id)
+            .execute()
+        )
+    except Exception as exc:
+        logger.error("Failed to reschedule email %s: %s", email_id, exc)
+        raise RuntimeError(f"Database update failed: {exc}") from exc
@@ -0,0 +1,246 @@
+"""
+Tagging Engine — Multilingual keyword tagging compiled from a config file
+
+Rules live in config/tag_rules.json (override with TAG_RULES_PATH):
+each tag has a priority and keyword/phrase lists for the supported
+languages. All keywords are folded into prefix tries and compiled to
+regexes, so a message is scanned directly whatever its language — no
+translation needed first.
+
+Keyword syntax:
+  - matching is case-insensitive and whole-word: "cost" doesn't fire
+    on "costume"
+  - a leading / trailing "*" drops that word boundary ("price*" also
+    matches "prices", "*preis*" matches "Gesamtpreise")
+  - spaces in phrases match any run of whitespace
+  - keywords containing Chinese / Japanese characters match anywhere
+    (those scripts don't separate words with spaces)
+
+A message gets every matching tag, highest priority first. The rules
+file is re-read when its mtime changes (checked at most every
+TAG_RULES_RELOAD_SECONDS); an invalid edit is logged and the previous
+rules stay active.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+from typing import Any
+
+from services.env import env_number
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "tag_rules.json",
+)
+
+# The original English-only rules, used if the rules file can't be loaded
+_FALLBACK_RULES: dict[str, Any] = {
+    "default_tag": "general",
+    "tags": {
+        "pricing": {"priority": 40, "keywords": {"english": ["*price*", "*cost*"]}},
+        "demo": {"priority": 30, "keywords": {"english": ["*demo*"]}},
+        "support": {"priority": 20, "keywords": {"english": ["*support*", "*issue*"]}},
+        "enterprise": {"priority": 10, "keywords": {"english": ["*enterprise*"]}},
+    },
+}
+
+# Characters that continue a word: \w plus combining marks and vowel
+# signs (Latin diacritics, Devanagari matras, Arabic harakat), which \w
+# alone doesn't cover.
+_WORD_CHARS = "\\w\u0300-\u036f\u0900-\u0963\u0966-\u097f\u0610-\u061a\u064b-\u065f\u0670"
+_NO_BOUNDARY_SCRIPT = re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+
+
+# ------------------------------------------------------------------ #
+#  Compilation                                                         #
+# ------------------------------------------------------------------ #
+
+_END = ""  # trie key marking "a keyword ends here"
+
+
+def _insert(trie: dict[str, Any], text: str, trail: bool, group: int) -> None:
+    node = trie
+    for ch in text:
+        node = node.setdefault(ch, {})
+    node.setdefault(_END, (trail, group))
+
+
+def _node_pattern(node: dict[str, Any]) -> str:
+    """Regex for a trie node: longer continuations first, then the keyword end."""
+    branches = [
+        (r"\s+" if ch == " " else re.escape(ch)) + _node_pattern(child)
+        for ch, child in sorted(node.items()) if ch != _END
+    ]
+    if _END in node:
+        trail, group = node[_END]
+        # Empty named group: m.lastgroup tells which keyword matched
+        branches.append((f"(?![{_WORD_CHARS}])" if trail else "") + f"(?P<k{group}>)")
+    return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+
+def _keyword_parts(keyword: str) -> tuple[str, bool, bool] | None:
+    """(lowercased text, needs leading boundary, needs trailing boundary)."""
+    text = " ".join(keyword.strip().lower().split())
+    lead = not text.startswith("*")
+    trail = not text.endswith("*")
+    text = text.strip("*").strip()
+    if not text:
+        return None
+    if _NO_BOUNDARY_SCRIPT.search(text):
+        lead = trail = False
+    return text, lead, trail
+
+
+class TagEngine:
+    """Compiled tag rules. Raises ValueError on malformed rules."""
+
+    def __init__(self, rules: dict[str, Any]):
+        tags = rules.get("tags")
+        if not isinstance(tags, dict) or not tags:
+            raise ValueError("Tag rules need a non-empty 'tags' object")
+        self.default_tag = str(rules.get("default_tag") or "general")
+
+        specs = []
+        for name, spec in tags.items():
+            keywords_by_language = spec.get("keywords") if isinstance(spec, dict) else None
+            if not isinstance(keywords_by_language, dict):
+                raise ValueError(f"Tag '{name}' needs a 'keywords' object")
+            try:
+                priority = float(spec.get("priority", 0))
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"Tag '{name}' has an invalid priority") from exc
+            keywords = [
+                str(k) for words in keywords_by_language.values() for k in (words or [])
+            ]
+            specs.append((priority, str(name), keywords))
+
+        # Highest priority first: a keyword listed under two tags goes to
+        # the higher one, and results are ordered by this rank
+        specs.sort(key=lambda spec: -spec[0])
+
+        # Two tries over every keyword of every tag: one only tried at
+        # word starts, one (leading "*", CJK) tried at every position
+        word_start: dict[str, Any] = {}
+        anywhere: dict[str, Any] = {}
+        self._group_tags: list[str] = []
+        for _, name, keywords in specs:
+            for keyword in keywords:
+                parts = _keyword_parts(keyword)
+                if not parts:
+                    continue
+                text, lead, trail = parts
+                _insert(word_start if lead else anywhere, text, trail, len(self._group_tags))
+                self._group_tags.append(name)
+
+        if not self._group_tags:
+            raise ValueError("Tag rules contain no keywords")
+
+        self.tags = list(dict.fromkeys(name for _, name, _ in specs if name in self._group_tags))
+        self.keyword_count = len(self._group_tags)
+        self._rank = {name: i for i, name in enumerate(self.tags)}
+
+        # Kept as two regexes: one alternation of both tries defeats re's
+        # literal-prefix scanning and is ~3x slower on long messages
+        self._patterns = []
+        if word_start:
+            self._patterns.append(re.compile(f"(?<![{_WORD_CHARS}]){_node_pattern(word_start)}"))
+        if anywhere:
+            self._patterns.append(re.compile(_node_pattern(anywhere)))
+
+    def match(self, text: str) -> list[str]:
+        """Every tag matching *text*, highest priority first (may be empty)."""
+        text = text.lower()
+        found: set[str] = set()
+        for pattern in self._patterns:
+            for m in pattern.finditer(text):
+                found.add(self._group_tags[int(m.lastgroup[1:])])
+                if len(found) == len(self.tags):
+                    return sorted(found, key=self._rank.__getitem__)
+        return sorted(found, key=self._rank.__getitem__)
+
+
+# ------------------------------------------------------------------ #
+#  Shared engine with hot reload                                       #
+# ------------------------------------------------------------------ #
+
+_engine: TagEngine | None = None
+_loaded_mtime: float | None = None
+_checked_at = 0.0
+_reloads = 0
+
+
+def _rules_path() -> str:
+    return os.getenv("TAG_RULES_PATH") or DEFAULT_RULES_PATH
+
+
+def _reload_interval() -> float:
+    return env_number("TAG_RULES_RELOAD_SECONDS", 5)
+
+
+def reload() -> TagEngine:
+    """
+    Re-read the rules file now.
+
+    Keeps the current engine (or the built-in fallback rules on first
+    load) if the file is missing or invalid.
+    """
+    global _engine, _loaded_mtime, _checked_at, _reloads
+    path = _rules_path()
+    _checked_at = time.monotonic()
+    try:
+        # Remember the version even if it's invalid, so it's reported once
+        _loaded_mtime = os.path.getmtime(path)
+        with open(path, encoding="utf-8") as f:
+            engine = TagEngine(json.load(f))
+    except (OSError, ValueError) as exc:
+        logger.error("Could not load tag rules from %s: %s", path, exc)
+        if _engine is None:
+            _engine = TagEngine(_FALLBACK_RULES)
+        return _engine
+
+    _engine = engine
+    _reloads += 1
+    logger.info("Loaded tag rules from %s: %d tags, %d keywords",
+                path, len(engine.tags), engine.keyword_count)
+    return engine
+
+
+def get_engine() -> TagEngine:
+    """Return the active engine, reloading it if the rules file changed."""
+    global _checked_at
+    if _engine is None:
+        return reload()
+    if time.monotonic() - _checked_at >= _reload_interval():
+        try:
+            changed = os.path.getmtime(_rules_path()) != _loaded_mtime
+        except OSError:
+            changed = False
+        if changed:
+            return reload()
+        _checked_at = time.monotonic()
+    return _engine
+
+
+def tag_message(text: str) -> list[str]:
+    """Tags found in *text* (any supported language), highest priority first."""
+    return get_engine().match(text)
+
+
+def default_tag() -> str:
+    """Tag for messages that match no rule."""
+    return get_engine().default_tag
+
+
+def stats() -> dict[str, Any]:
+    """Loaded rules summary for the metrics endpoint."""
+    engine = get_engine()
+    return {
+        "rules_path": _rules_path(),
+        "tags": engine.tags,
+        "keywords": engine.keyword_count,
+        "reloads": _reloads,
+    }
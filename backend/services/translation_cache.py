@@ -0,0 +1,208 @@
+"""
+Translation Cache — In-memory LRU in front of a persistent store
+
+Leads and agent replies repeat a lot ("what is the price?", canned
+answers), so translations are cached by (model, source, target,
+normalized text):
+  1. A bounded in-process LRU with TTL (fast, per instance).
+  2. The Supabase `translations` table (shared by every instance,
+     so cold serverless instances benefit too).
+
+Both tiers are best-effort: a cache failure never breaks translation.
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+
+from services.env import env_int
+from services.supabase_service import (
+    get_cached_translation, get_cached_translations,
+    upsert_cached_translation, upsert_cached_translations,
+)
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------ #
+#  Configuration                                                       #
+# ------------------------------------------------------------------ #
+
+def _persistent_enabled() -> bool:
+    """Persistent tier is on unless TRANSLATION_CACHE_PERSIST=0."""
+    return os.getenv("TRANSLATION_CACHE_PERSIST", "1") != "0"
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    """Collapse whitespace and case so trivial variants share an entry."""
+    return _WHITESPACE_RE.sub(" ", text.strip()).casefold()
+
+
+def make_key(text: str, source: str, target: str, model: str) -> str:
+    """Return the cache key for a translation request."""
+    raw = "\x1f".join([model, source.lower(), target.lower(), _normalize(text)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ------------------------------------------------------------------ #
+#  In-memory LRU tier                                                  #
+# ------------------------------------------------------------------ #
+
+class _LRUCache:
+    """Bounded LRU mapping with a per-entry TTL (not thread-safe; asyncio only)."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> str | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.evictions += 1
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        if self.max_size <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_memory: _LRUCache | None = None
+
+
+def _get_memory() -> _LRUCache:
+    """Return the in-memory tier, created lazily (after load_dotenv has run)."""
+    global _memory
+    if _memory is None:
+        _memory = _LRUCache(
+            max_size=env_int("TRANSLATION_CACHE_SIZE", 2048),
+            ttl=env_int("TRANSLATION_CACHE_TTL", 3600),
+        )
+    return _memory
+
+
+_stats = {"hits": 0, "persistent_hits": 0, "misses": 0}
+
+
+# ------------------------------------------------------------------ #
+#  Public API                                                          #
+# ------------------------------------------------------------------ #
+
+async def get_translation(text: str, source: str, target: str, model: str) -> str | None:
+    """Return a cached translation, checking memory then the persistent tier."""
+    key = make_key(text, source, target, model)
+
+    memory = _get_memory()
+    cached = memory.get(key)
+    if cached is not None:
+        _stats["hits"] += 1
+        return cached
+
+    if _persistent_enabled():
+        cached = await get_cached_translation(key)
+        if cached is not None:
+            _stats["persistent_hits"] += 1
+            memory.set(key, cached)
+            return cached
+
+    _stats["misses"] += 1
+    return None
+
+
+async def put_translation(
+    text: str, source: str, target: str, model: str, translated: str,
+) -> None:
+    """Store a translation in both tiers."""
+    key = make_key(text, source, target, model)
+    _get_memory().set(key, translated)
+
+    if _persistent_enabled():
+        await upsert_cached_translation({
+            "cache_key": key,
+            "model": model,
+            "source_language": source.lower(),
+            "target_language": target.lower(),
+            "translated_text": translated,
+        })
+
+
+async def get_translations(
+    texts: list[str], source: str, target: str, model: str,
+) -> dict[str, str]:
+    """
+    Batch form of get_translation(): one persistent-tier query for all
+    memory misses. Returns {text: translation} for the texts found.
+    """
+    memory = _get_memory()
+    found: dict[str, str] = {}
+    missing: dict[str, list[str]] = {}  # cache key → texts
+    for text in dict.fromkeys(texts):
+        key = make_key(text, source, target, model)
+        cached = memory.get(key)
+        if cached is not None:
+            _stats["hits"] += 1
+            found[text] = cached
+        else:
+            missing.setdefault(key, []).append(text)
+
+    if missing and _persistent_enabled():
+        for key, cached in (await get_cached_translations(list(missing))).items():
+            memory.set(key, cached)
+            for text in missing.pop(key, []):
+                _stats["persistent_hits"] += 1
+                found[text] = cached
+
+    _stats["misses"] += sum(len(group) for group in missing.values())
+    return found
+
+
+async def put_translations(
+    pairs: list[tuple[str, str]], source: str, target: str, model: str,
+) -> None:
+    """Batch form of put_translation() for (text, translated) pairs: one upsert."""
+    records: dict[str, dict[str, str]] = {}
+    memory = _get_memory()
+    for text, translated in pairs:
+        key = make_key(text, source, target, model)
+        memory.set(key, translated)
+        records[key] = {
+            "cache_key": key,
+            "model": model,
+            "source_language": source.lower(),
+            "target_language": target.lower(),
+            "translated_text": translated,
+        }
+
+    if _persistent_enabled():
+        await upsert_cached_translations(list(records.values()))
+
+
+def get_stats() -> dict[str, int]:
+    """Hit / miss / eviction counters for the metrics endpoint."""
+    memory = _get_memory()
+    return {
+        **_stats,
+        "evictions": memory.evictions,
+        "size": len(memory),
+        "max_size": memory.max_size,
+    }
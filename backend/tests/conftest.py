@@ -0,0 +1,71 @@
+"""Shared fixtures: keep tests offline and module-level state isolated."""
+
+import httpx
+import pytest
+
+from services import circuit_breaker, gemini_service, rate_limiter, supabase_service, translation_cache
+
+
+class FakeModels:
+    """Stands in for ``client.aio.models``: sleeps, counts, echoes the prompt."""
+
+    def __init__(self, latency: float = 0.0, respond=None):
+        self.latency = latency
+        self.respond = respond or (lambda prompt, config: "translated")
+        self.calls = 0
+
+    async def generate_content(self, model, contents, config=None):
+        import asyncio
+
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        text = self.respond(contents, config)
+        if isinstance(text, Exception):
+            raise text
+        return type("Response", (), {"text": text, "usage_metadata": None})()
+
+
+class FakeClient:
+    def __init__(self, models: FakeModels):
+        self.aio = type("AsyncClient", (), {"models": models})()
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    """No Supabase cache tier, fresh in-memory cache and Gemini state."""
+    monkeypatch.setenv("TRANSLATION_CACHE_PERSIST", "0")
+    monkeypatch.setattr(translation_cache, "_memory", None)
+    monkeypatch.setattr(gemini_service, "_in_flight", {})
+    monkeypatch.setattr(circuit_breaker, "_breaker", None)
+    monkeypatch.setattr(rate_limiter, "_limiter", None)
+    yield
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """Install a fake Gemini client; returns its FakeModels."""
+    models = FakeModels()
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(gemini_service, "_get_client", lambda: FakeClient(models))
+    return models
+
+
+@pytest.fixture
+def fake_postgrest(monkeypatch):
+    """Route the real Supabase client to an async httpx handler.
+
+    Returns ``install(handler)``; *handler* receives each PostgREST
+    request and returns an ``httpx.Response``.
+    """
+    monkeypatch.setenv("SUPABASE_URL", "http://supabase.test")
+    monkeypatch.setenv("SUPABASE_KEY", "test-key")
+    monkeypatch.setattr(supabase_service, "_client", None)
+    monkeypatch.setattr(supabase_service, "_http", None)
+
+    def install(handler):
+        monkeypatch.setattr(
+            supabase_service, "_build_http_client",
+            lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+    return install
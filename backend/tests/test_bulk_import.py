@@ -0,0 +1,129 @@
+"""Bulk import: partial chunk failures, one batched event, upload size cap."""
+
+import asyncio
+
+import httpx
+
+import main
+from services import bulk_import, lead_counts, supabase_service
+
+
+class _FailingLeadsTable:
+    """Multi-row inserts succeed until chunk number *fail_on* (1-based)."""
+
+    def __init__(self, fail_on: int):
+        self.fail_on = fail_on
+        self.chunks = 0
+        self._rows = []
+
+    def insert(self, rows):
+        self._rows = rows
+        return self
+
+    async def execute(self):
+        self.chunks += 1
+        if self.chunks == self.fail_on:
+            raise Exception("connection reset")
+        data = [{**row, "id": f"id-{row['name']}"} for row in self._rows]
+        return type("Response", (), {"data": data})()
+
+
+def test_partial_chunk_failure_reports_committed_rows(monkeypatch):
+    table = _FailingLeadsTable(fail_on=2)
+    client = type("Client", (), {"table": lambda self, name: table})()
+
+    async def get_supabase():
+        return client
+
+    async def assign_agents(leads):
+        return ["agent@example.com"] * len(leads)
+
+    async def translate(message, language):
+        return {"detected_language": "english", "translated_message": message}
+
+    async def release_agents(agents):
+        released.extend(agents)
+
+    published, released = [], []
+    monkeypatch.setattr(bulk_import, "release_agents", release_agents)
+    monkeypatch.setenv("BULK_INSERT_CHUNK", "3")
+    monkeypatch.setattr(supabase_service, "get_supabase", get_supabase)
+    monkeypatch.setattr(bulk_import, "assign_agents", assign_agents)
+    monkeypatch.setattr(bulk_import.event_bus, "publish",
+                        lambda kind, data: published.append((kind, data["ids"], len(data["leads"]))))
+
+    rows = [{"name": f"n{i}", "email": f"n{i}@example.com", "message": "hello"}
+            for i in range(7)]
+    job = bulk_import.create_job(len(rows))
+    asyncio.run(bulk_import.run_job(job, rows, translate, lambda msg, en: ["general"]))
+
+    assert job["status"] == "failed"
+    assert (job["inserted"], job["failed"]) == (3, 4)
+    assert [r["status"] for r in job["results"]] == ["created"] * 3 + ["error"] * 4
+    # One event for the committed rows, not one per row
+    assert published == [("leads.created", ["id-n0", "id-n1", "id-n2"], 3)]
+    # Agents reserved for the rows that were never written are given back
+    assert released == ["agent@example.com"] * 4
+
+
+def _post(body, content_type="application/x-ndjson", wait=False, headers=None):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/leads/bulk", content=body, params={"wait": wait},
+                headers={"content-type": content_type, **(headers or {})},
+            )
+
+    return asyncio.run(run())
+
+
+def test_upload_over_the_byte_cap_is_rejected_while_streaming(monkeypatch):
+    monkeypatch.setenv("BULK_MAX_BYTES", "1000")
+    line = b'{"name": "n", "email": "n@example.com", "message": "hello"}\n'
+    started = []
+    monkeypatch.setattr(main, "start_job", lambda *args: started.append(1))
+
+    async def chunks():
+        for _ in range(100):       # no Content-Length: chunked transfer
+            yield line
+
+    for content_type in ("application/x-ndjson", "text/csv", "application/json"):
+        response = _post(chunks(), content_type)
+        assert response.status_code == 413, content_type
+
+    response = _post(line * 100, headers={"content-length": str(len(line) * 100)})
+    assert response.status_code == 413
+    assert started == []
+
+
+def test_background_job_invalidates_counts_when_it_finishes(monkeypatch):
+    async def run_job(job, rows, translate, tag):
+        await asyncio.sleep(0.05)
+        job["status"] = "done"
+        return job
+
+    monkeypatch.setattr(bulk_import, "run_job", run_job)
+    monkeypatch.setattr(lead_counts, "_cache", {"all": {"": 1}})
+
+    async def run():
+        job, task = bulk_import.start_job([{}], None, None)
+        assert lead_counts._cache is not None      # still running
+        await task
+        return job
+
+    job = asyncio.run(run())
+    assert job["status"] == "done"
+    assert lead_counts._cache is None
+
+
+def test_batched_event_is_filtered_per_subscriber():
+    event = {"type": "leads.created", "data": {"ids": ["a", "b"], "leads": [
+        {"id": "a", "email": "ana@example.com", "assigned_to": "Agent A", "status": "New"},
+        {"id": "b", "email": "bo@example.com", "assigned_to": "Agent B", "status": "New"},
+    ]}}
+
+    assert bulk_import.event_bus._visible(event, None, "New") is event
+    mine = bulk_import.event_bus._visible(event, None, None, email="BO@example.com")
+    assert mine["data"]["ids"] == ["b"] and len(mine["data"]["leads"]) == 1
+    assert bulk_import.event_bus._visible(event, "Agent C", None) is None
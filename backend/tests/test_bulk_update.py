@@ -0,0 +1,146 @@
+"""PATCH /leads: filter-mode cap, id validation and URL-bounded id chunks."""
+
+import asyncio
+
+import httpx
+
+import main
+from services import supabase_service
+
+
+class _LeadsTable:
+    """Just enough of the PostgREST builder for bulk_update_leads."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.updates = 0
+
+    def select(self, columns):
+        return _Query(self, None)
+
+    def update(self, fields):
+        return _Query(self, fields)
+
+
+class _Query:
+    def __init__(self, table, fields):
+        self.table, self.fields = table, fields
+        self.filters, self.after, self.ids, self.size = {}, None, None, None
+
+    def order(self, column):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def gt(self, column, value):
+        self.after = value
+        return self
+
+    def in_(self, column, values):
+        self.ids = set(values)
+        return self
+
+    def limit(self, size):
+        self.size = size
+        return self
+
+    async def execute(self):
+        rows = sorted(
+            (r for r in self.table.rows
+             if all(r[k] == v for k, v in self.filters.items())
+             and (self.after is None or r["id"] > self.after)
+             and (self.ids is None or r["id"] in self.ids)),
+            key=lambda r: r["id"],
+        )[:self.size]
+        if self.fields is not None:
+            self.table.updates += 1
+            for row in rows:
+                row.update(self.fields)
+        return type("Response", (), {"data": [{"id": r["id"]} for r in rows]})()
+
+
+def _patch(monkeypatch, rows):
+    table = _LeadsTable(rows)
+    client = type("Client", (), {"table": lambda self, name: table})()
+
+    async def get_supabase():
+        return client
+
+    published = []
+    monkeypatch.setattr(supabase_service, "get_supabase", get_supabase)
+    monkeypatch.setattr(main.event_bus, "publish", lambda kind, data: published.append((kind, data)))
+    monkeypatch.setenv("BULK_UPDATE_MAX", "5")
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.patch("/leads", json={"filter": {"status": "New"}, "status": "Lost"})
+
+    return table, published, asyncio.run(run())
+
+
+def test_filter_over_cap_is_rejected_without_changes(monkeypatch):
+    rows = [{"id": f"{i:03d}", "status": "New"} for i in range(6)]
+    table, published, response = _patch(monkeypatch, rows)
+
+    assert response.status_code == 422
+    assert "more than 5" in response.json()["detail"]
+    assert table.updates == 0
+    assert all(r["status"] == "New" for r in rows)
+    assert published == []
+
+
+def test_filter_at_cap_reports_requested(monkeypatch):
+    rows = [{"id": f"{i:03d}", "status": "New"} for i in range(5)]
+    rows.append({"id": "999", "status": "Won"})
+    _, published, response = _patch(monkeypatch, rows)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["requested"], body["updated"]) == (5, 5)
+    # One event for the whole batch, not one per lead
+    assert published == [("leads.updated", {"ids": body["ids"], "status": "Lost"})]
+
+
+def _patch_ids(body):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.patch("/leads", json=body)
+        await supabase_service.close_supabase()
+        return response
+
+    return asyncio.run(run())
+
+
+def test_malformed_ids_are_rejected_before_any_query(monkeypatch, fake_postgrest):
+    requests = []
+    fake_postgrest(lambda request: requests.append(request))
+
+    response = _patch_ids({"ids": ["00000000-0000-0000-0000-000000000001", "1) or (1=1"], "status": "Lost"})
+
+    assert response.status_code == 422
+    assert requests == []
+
+
+def test_ids_are_updated_in_chunks_of_100(monkeypatch, fake_postgrest):
+    ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(250)]
+    urls = []
+
+    def handler(request):
+        assert request.method == "PATCH"
+        urls.append(str(request.url))
+        chunk = request.url.params["id"].removeprefix("in.(").removesuffix(")").split(",")
+        return httpx.Response(200, json=[{"id": lead_id} for lead_id in chunk])
+
+    fake_postgrest(handler)
+    monkeypatch.setattr(main.event_bus, "publish", lambda kind, data: None)
+
+    response = _patch_ids({"ids": [i.upper() for i in ids] + ids[:3], "status": "Lost"})
+
+    assert response.status_code == 200
+    assert response.json()["ids"] == ids          # normalized and deduplicated
+    assert len(urls) == 3
+    assert max(len(url) for url in urls) < 4096
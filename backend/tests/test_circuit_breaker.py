@@ -0,0 +1,100 @@
+"""Circuit breaker state transitions: open, half-open probe, close."""
+
+import pytest
+
+from services import circuit_breaker
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker("test", min_calls=4, error_rate=0.5, slow_call_seconds=5, open_seconds=30)
+
+
+def _trip(breaker: CircuitBreaker) -> None:
+    for ok in (True, False, True, False):
+        breaker.record(ok, 0.1, breaker.before_call())
+
+
+def test_opens_on_error_rate_and_rejects_until_cooldown(clock):
+    breaker = _breaker()
+    for ok in (True, False, True):
+        breaker.record(ok, 0.1, breaker.before_call())
+    assert breaker.state == CLOSED       # below min_calls
+
+    breaker.record(False, 0.1, breaker.before_call())
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock[0] += 31
+    assert breaker.before_call() is not None
+    assert breaker.state == HALF_OPEN
+
+
+def test_successful_probe_closes_failed_probe_reopens(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock[0] += 31
+
+    probe = breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()            # the only probe slot is taken
+    breaker.record(False, 0.1, probe)
+    assert breaker.state == OPEN and breaker.times_opened == 2
+
+    clock[0] += 31
+    breaker.record(True, 0.1, breaker.before_call())
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_calls"] == 0
+
+
+def test_slow_probe_counts_as_failure(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock[0] += 31
+    breaker.record(True, 6.0, breaker.before_call())
+    assert breaker.state == OPEN
+
+
+def test_call_admitted_while_closed_is_not_taken_for_the_probe(clock):
+    breaker = _breaker()
+    straggler = breaker.before_call()    # admitted while closed
+    assert straggler is None
+    _trip(breaker)
+    clock[0] += 31
+    probe = breaker.before_call()
+
+    # The slow pre-open call finishes first: it neither closes nor
+    # re-opens the circuit, and doesn't free the probe slot
+    breaker.record(True, 0.1, straggler)
+    assert breaker.state == HALF_OPEN
+    breaker.record(False, 0.1, straggler)
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(True, 0.1, probe)
+    assert breaker.state == CLOSED
+
+
+def test_probe_from_an_earlier_half_open_period_is_ignored(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock[0] += 31
+    stale = breaker.before_call()
+    breaker.release(stale)               # cancelled
+    breaker.record(False, 0.1, breaker.before_call())   # re-opens
+    clock[0] += 31
+    probe = breaker.before_call()
+
+    breaker.record(True, 0.1, stale)
+    assert breaker.state == HALF_OPEN
+    breaker.record(True, 0.1, probe)
+    assert breaker.state == CLOSED
@@ -0,0 +1,319 @@
+"""Reply email delivery against a local SMTP server (aiosmtpd, STARTTLS + AUTH)."""
+
+import ssl
+import socket
+import asyncio
+import datetime as dt
+from datetime import datetime, timezone
+from email import message_from_bytes, policy
+
+import httpx
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult, LoginPassword
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+import main
+from services import email_outbox
+
+
+def _tls_context(tmp_path) -> ssl.SSLContext:
+    """Server context with a throwaway self-signed certificate."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - dt.timedelta(days=1))
+        .not_valid_after(now + dt.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    cert_file, key_file = tmp_path / "cert.pem", tmp_path / "key.pem"
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+class _Handler:
+    """Records delivered messages; *reply* is the DATA response to send."""
+
+    def __init__(self):
+        self.reply = "250 OK"
+        self.messages = []
+        self.logins = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.reply.startswith("250"):
+            self.messages.append(message_from_bytes(envelope.content, policy=policy.default))
+        return self.reply
+
+    def authenticate(self, server, session, envelope, mechanism, auth_data):
+        self.logins += 1
+        ok = isinstance(auth_data, LoginPassword) and auth_data.password == b"secret"
+        return AuthResult(success=ok)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp(tmp_path, monkeypatch):
+    """Local STARTTLS + AUTH server; the outbox's DB calls are recorded."""
+    handler = _Handler()
+    port = _free_port()
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=port,
+        tls_context=_tls_context(tmp_path),
+        authenticator=handler.authenticate, auth_require_tls=True,
+    )
+    controller.start()
+
+    monkeypatch.setenv("SMTP_HOST", "127.0.0.1")
+    monkeypatch.setenv("SMTP_PORT", str(port))
+    monkeypatch.setenv("SMTP_USER", "mailer@example.com")
+    monkeypatch.setenv("SMTP_PASS", "secret")
+    monkeypatch.setenv("SMTP_TIMEOUT", "5")
+    monkeypatch.setattr(email_outbox, "_pool", None)
+    monkeypatch.setattr(email_outbox, "_stats", dict.fromkeys(email_outbox._stats, 0))
+
+    handler.sent, handler.rescheduled = [], []
+
+    async def mark_emails_sent(ids):
+        handler.sent.extend(ids)
+
+    async def reschedule_email(email_id, error, next_attempt_at):
+        handler.rescheduled.append((email_id, error, next_attempt_at))
+
+    monkeypatch.setattr(email_outbox, "mark_emails_sent", mark_emails_sent)
+    monkeypatch.setattr(email_outbox, "reschedule_email", reschedule_email)
+    yield handler
+    if email_outbox._pool is not None:
+        email_outbox._pool.close()
+    controller.stop()
+
+
+def _row(email_id: str, attempts: int = 1) -> dict:
+    return {
+        "id": email_id,
+        "to_email": f"{email_id}@example.com",
+        "to_name": "Client",
+        "attempts": attempts,
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "payload": {
+            "agent_name": "Ana",
+            "original_reply": "Thanks, we'll call you tomorrow.",
+            "translated_reply": "Gracias, le llamaremos mañana.",
+            "client_language": "spanish",
+        },
+    }
+
+
+def _post_reply(monkeypatch, delays):
+    """POST a reply through the endpoint; records the outbox row's delay."""
+    async def get_lead_by_id(lead_id):
+        return {"id": lead_id, "language": "spanish", "email": "e1@example.com",
+                "name": "Client", "status": "New", "assigned_to": "Ana"}
+
+    async def insert_reply_with_email(reply, email):
+        delays.append(email["delay_seconds"])
+        return {**reply, "id": "reply-1"}
+
+    monkeypatch.setenv("EMAIL_DELIVERY", "inline")
+    monkeypatch.setattr(main, "get_lead_by_id", get_lead_by_id)
+    monkeypatch.setattr(main, "insert_reply_with_email", insert_reply_with_email)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/leads/lead-1/replies", json={
+                "message": "Gracias, le llamaremos mañana.",
+                "agent_email": "ana@example.com", "language": "spanish",
+            })
+
+    return asyncio.run(run())
+
+
+def test_reply_email_is_sent_inline_after_commit(smtp, monkeypatch):
+    monkeypatch.setenv("EMAIL_DIGEST_WINDOW", "0")
+    claimed, delays = [], []
+
+    async def claim_reply_email(reply_id, lease_seconds):
+        claimed.append(reply_id)
+        return [_row("e1", attempts=1)]
+
+    monkeypatch.setattr(email_outbox, "claim_reply_email", claim_reply_email)
+
+    response = _post_reply(monkeypatch, delays)
+
+    assert response.status_code == 200
+    assert delays == [0]
+    assert claimed == ["reply-1"]
+    assert smtp.sent == ["e1"]
+    [msg] = smtp.messages
+    assert msg["To"] == "e1@example.com"
+    assert msg["Subject"].startswith("Reply from Ana")
+
+
+def test_inline_reply_is_held_and_due_digests_go_out(smtp, monkeypatch):
+    monkeypatch.setenv("EMAIL_DIGEST_WINDOW", "30")
+    delays = []
+    earlier, fresh = _row("e1"), _row("e2")
+    fresh["to_email"] = "E1@example.com "
+    fresh["created_at"] = "2026-01-01T00:00:20+00:00"
+    fresh["payload"] = {**fresh["payload"], "agent_name": "Bo", "translated_reply": "Hasta pronto."}
+
+    async def claim_email_outbox(batch_size, lease_seconds):
+        # The held reply came due; the fresh one to the same client joins it
+        return [fresh, earlier]
+
+    async def claim_reply_email(reply_id, lease_seconds):
+        raise AssertionError("a held reply must not be sent on its own")
+
+    monkeypatch.setattr(email_outbox, "claim_email_outbox", claim_email_outbox)
+    monkeypatch.setattr(email_outbox, "claim_reply_email", claim_reply_email)
+
+    response = _post_reply(monkeypatch, delays)
+
+    assert response.status_code == 200
+    assert delays == [30]
+    assert sorted(smtp.sent) == ["e1", "e2"]
+    [msg] = smtp.messages
+    assert msg["Subject"].startswith("2 replies from Ana, Bo")
+    assert email_outbox.stats()["digests"] == 1
+
+
+def test_group_orders_each_recipients_replies_oldest_first():
+    a1, b1, a2 = _row("a"), _row("b"), _row("a2")
+    a2["to_email"] = "A@Example.com"
+    a1["created_at"], b1["created_at"], a2["created_at"] = (
+        "2026-01-01T00:00:30+00:00", "2026-01-01T00:00:10+00:00", "2026-01-01T00:00:05+00:00",
+    )
+
+    groups = email_outbox._group([a1, b1, a2])
+
+    assert [[row["id"] for row in group] for group in groups] == [["a2", "a"], ["b"]]
+
+
+def _parts(msg):
+    plain, html = (part.get_payload(decode=True).decode() for part in msg.get_payload())
+    return plain, html
+
+
+def test_digest_keeps_each_replys_translation_and_original():
+    first, second = _row("e1"), _row("e2")
+    second["payload"] = {
+        "agent_name": "Bo", "original_reply": "See you soon.",
+        "translated_reply": "Hasta pronto.", "client_language": "spanish",
+    }
+    # Written in the client's language: no separate original line
+    third = _row("e3")
+    third["payload"] = {"agent_name": "Ana", "original_reply": "Hola", "translated_reply": "Hola"}
+
+    msg = email_outbox._render([first, second, third], "mailer@example.com")
+    plain, html = _parts(msg)
+
+    assert msg["Subject"] == "3 replies from Ana, Bo — Multilingual Leads"
+    assert plain.index("Gracias, le llamaremos") < plain.index("Hasta pronto") < plain.index("Ana:\nHola")
+    assert "Original (English): Thanks, we&#x27;ll call you tomorrow." in html
+    assert "Original (English): See you soon." in html
+    assert html.count("Original (English)") == 2
+
+
+def test_render_escapes_html_from_replies_and_names():
+    row = _row("e1")
+    row["to_name"] = "<b>Eve</b>"
+    row["payload"] = {
+        "agent_name": "Ana & Co", "original_reply": "<script>x()</script>",
+        "translated_reply": "<img src=x onerror=alert(1)>",
+    }
+
+    _, html = _parts(email_outbox._render([row], "mailer@example.com"))
+
+    assert "<script>" not in html and "<img" not in html and "<b>" not in html
+    assert "&lt;img src=x onerror=alert(1)&gt;" in html
+    assert "Hi &lt;b&gt;Eve&lt;/b&gt;" in html
+    assert "New Reply from Ana &amp; Co" in html
+
+
+def test_transient_failure_is_retried_with_backoff(smtp, monkeypatch):
+    monkeypatch.setenv("EMAIL_RETRY_BASE", "30")
+    monkeypatch.setenv("EMAIL_MAX_ATTEMPTS", "6")
+    smtp.reply = "451 4.3.0 Try again later"
+
+    started = datetime.now(timezone.utc)
+    asyncio.run(email_outbox._deliver([_row("e1", attempts=1), _row("e2", attempts=3)]))
+
+    assert smtp.sent == [] and smtp.messages == []
+    delays = {email_id: (retry_at - started).total_seconds()
+              for email_id, _, retry_at in smtp.rescheduled}
+    # Jittered base * 2^(attempts-1): attempt 1 → 15-30s, attempt 3 → 60-120s
+    assert 15 <= delays["e1"] <= 31
+    assert 60 <= delays["e2"] <= 121
+    assert email_outbox.stats()["retried"] == 2
+
+
+def test_permanent_rejection_fails_without_retry(smtp):
+    smtp.reply = "550 5.1.1 Mailbox unavailable"
+
+    asyncio.run(email_outbox._deliver([_row("e1", attempts=1)]))
+
+    [(email_id, error, retry_at)] = smtp.rescheduled
+    assert email_id == "e1" and "550" in error
+    assert retry_at is None
+    assert email_outbox.stats()["failed"] == 1
+
+
+def test_connection_is_reused_across_drained_batches(smtp, monkeypatch):
+    monkeypatch.setenv("EMAIL_BATCH_SIZE", "1")
+    batches = [[_row("e1")], [_row("e2")], [_row("e3")]]
+
+    async def claim_email_outbox(batch_size, lease_seconds):
+        return batches.pop(0) if batches else []
+
+    monkeypatch.setattr(email_outbox, "claim_email_outbox", claim_email_outbox)
+
+    result = asyncio.run(email_outbox.drain())
+
+    assert result == {"claimed": 3, "batches": 3}
+    assert smtp.sent == ["e1", "e2", "e3"]
+    assert len(smtp.messages) == 3
+    # One STARTTLS + login for all three batches
+    assert smtp.logins == 1
+    assert email_outbox.stats()["smtp_connections_opened"] == 1
+
+
+def test_drain_endpoint_requires_cron_secret(monkeypatch):
+    monkeypatch.setenv("CRON_SECRET", "s3cret")
+
+    async def drain():
+        return {"claimed": 0, "batches": 0}
+
+    monkeypatch.setattr(email_outbox, "drain", drain)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            denied = await client.get("/email-outbox/drain")
+            allowed = await client.get("/email-outbox/drain",
+                                       headers={"Authorization": "Bearer s3cret"})
+            return denied, allowed
+
+    denied, allowed = asyncio.run(run())
+
+    assert denied.status_code == 401
+    assert allowed.status_code == 200 and allowed.json()["batches"] == 0
@@ -0,0 +1,36 @@
+"""Key rotation replaces the shared Gemini client and closes the old one."""
+
+import asyncio
+
+from services import gemini_service
+
+
+def test_rotated_client_closed_after_in_flight_call(monkeypatch):
+    closed = []
+
+    async def close(client):
+        closed.append(client)
+
+    monkeypatch.setattr(gemini_service, "_close", close)
+    monkeypatch.setattr(gemini_service, "_client", None)
+
+    async def run():
+        monkeypatch.setenv("GEMINI_API_KEY", "key-1")
+        old = gemini_service._get_client()
+        assert gemini_service._get_client() is old
+
+        gemini_service._acquire_client(old)      # a call is in flight
+        monkeypatch.setenv("GEMINI_API_KEY", "key-2")
+        new = gemini_service._get_client()
+        assert new is not old
+        await asyncio.sleep(0)
+        assert closed == []
+
+        gemini_service._release_client(old)      # ...and finishes
+        await asyncio.sleep(0)
+        assert closed == [old]
+
+        await gemini_service.close_client()
+        assert closed == [old, new]
+
+    asyncio.run(run())
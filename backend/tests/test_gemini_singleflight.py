@@ -0,0 +1,49 @@
+"""Identical concurrent Gemini calls share one upstream request."""
+
+import asyncio
+
+import pytest
+
+from services import gemini_service
+
+N = 100
+
+
+def test_identical_translations_make_one_upstream_call(fake_gemini):
+    fake_gemini.latency = 0.05
+    fake_gemini.respond = lambda prompt, config: "I need a quote"
+
+    async def run():
+        return await asyncio.gather(*(
+            gemini_service.translate_to_english("necesito un presupuesto", "spanish")
+            for _ in range(N)
+        ))
+
+    results = asyncio.run(run())
+
+    assert fake_gemini.calls == 1
+    assert {r["translated_text"] for r in results} == {"I need a quote"}
+    # Every caller gets its own result dict
+    assert len({id(r) for r in results}) == N
+
+
+def test_upstream_failure_reaches_every_waiter(fake_gemini):
+    fake_gemini.latency = 0.05
+    fake_gemini.respond = lambda prompt, config: ValueError("upstream exploded")
+    client = gemini_service._get_client()
+
+    async def run():
+        return await asyncio.gather(
+            *(gemini_service._generate(client, "same prompt") for _ in range(N)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    assert fake_gemini.calls == 1
+    assert all(isinstance(r, ValueError) and str(r) == "upstream exploded" for r in results)
+    # The failed flight is forgotten, so the next call goes upstream again
+    assert gemini_service._in_flight == {}
+    with pytest.raises(ValueError):
+        asyncio.run(gemini_service._generate(client, "same prompt"))
+    assert fake_gemini.calls == 2
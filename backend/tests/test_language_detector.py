@@ -0,0 +1,43 @@
+"""The local fast path must never answer for text Gemini should see."""
+
+import json
+
+import pytest
+
+from benchmarks.bench_language_detector import FIXTURES
+from services.gemini_service import local_detection_threshold, _local_detection
+from services.language_detector import detect_language_local
+
+with open(FIXTURES, encoding="utf-8") as f:
+    SAMPLES = json.load(f)["samples"]
+
+
+@pytest.mark.parametrize("text", [
+    "bhai mujhe demo chahiye jaldi se, humari company ko enterprise plan ke baare mein batao",
+    "Buongiorno, vorrei sapere quanto costa il piano professionale per dieci utenti.",
+    "Goedemiddag, wat kost het professionele pakket voor tien gebruikers?",
+])
+def test_lookalike_languages_go_to_gemini(text):
+    assert _local_detection(text) is None
+
+
+def test_unsupported_fixtures_never_fast_path():
+    threshold = local_detection_threshold()
+    leaked = [
+        (s["note"], *detect_language_local(s["text"]))
+        for s in SAMPLES if not s["language"]
+    ]
+    assert [x for x in leaked if x[2] >= threshold] == []
+
+
+def test_supported_fixtures_mostly_fast_path_and_never_wrong():
+    threshold = local_detection_threshold()
+    supported = [s for s in SAMPLES if s["language"]]
+    answered = [
+        (s["language"], lang)
+        for s in supported
+        for lang, score in [detect_language_local(s["text"])]
+        if score >= threshold
+    ]
+    assert all(expected == lang for expected, lang in answered)
+    assert len(answered) >= 0.9 * len(supported)
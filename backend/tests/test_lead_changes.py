@@ -0,0 +1,52 @@
+"""GET /leads/changes takes its bounds from the database clock."""
+
+import asyncio
+
+import httpx
+
+import main
+
+# Database clock well behind the app server's
+DB_HORIZON = "2020-01-01T00:00:00.000000+00:00"
+
+
+def _get(monkeypatch, since):
+    seen = {}
+
+    async def get_changes_horizon(settle_seconds):
+        seen["settle"] = settle_seconds
+        return DB_HORIZON
+
+    async def get_leads_changed_since(watermark, until, limit=200):
+        seen["watermark"], seen["until"] = watermark, until
+        return []
+
+    monkeypatch.setenv("CHANGES_SETTLE_SECONDS", "2")
+    monkeypatch.setattr(main, "get_changes_horizon", get_changes_horizon)
+    monkeypatch.setattr(main, "get_leads_changed_since", get_leads_changed_since)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/leads/changes", params={"since": since})
+
+    return seen, asyncio.run(run())
+
+
+def test_since_now_watermark_uses_db_clock(monkeypatch):
+    seen, response = _get(monkeypatch, "now")
+
+    assert response.status_code == 200
+    assert seen["settle"] == 2
+    assert main._decode_cursor(response.json()["watermark"]) == (DB_HORIZON, main.MAX_UUID)
+
+
+def test_changes_are_bounded_by_db_clock(monkeypatch):
+    watermark = main._encode_cursor(
+        {"updated_at": "2019-12-31T00:00:00+00:00", "id": main.MAX_UUID}, key="updated_at",
+    )
+    seen, response = _get(monkeypatch, watermark)
+
+    assert response.status_code == 200
+    assert seen["until"] == DB_HORIZON
+    assert response.json()["watermark"] == watermark
@@ -0,0 +1,54 @@
+"""Concurrent POST /leads calls must overlap their Gemini round-trips."""
+
+import json
+import time
+import asyncio
+
+import httpx
+
+import main
+from services import gemini_service
+
+LATENCY = 0.5
+N = 10
+
+
+def _detect_translate(prompt, config):
+    return json.dumps({"language": "spanish", "confidence": "high", "translation": "hello"})
+
+
+def test_parallel_leads_finish_in_one_gemini_latency(fake_gemini, monkeypatch):
+    fake_gemini.latency = LATENCY
+    fake_gemini.respond = _detect_translate
+    monkeypatch.setattr(gemini_service, "_local_detection", lambda text: None)
+
+    async def insert_lead(record):
+        return {**record, "id": f"lead-{record['name']}"}
+
+    async def assign_agent(language="", tag=""):
+        return "Agent A"
+
+    monkeypatch.setattr(main, "insert_lead", insert_lead)
+    monkeypatch.setattr(main, "assign_agent", assign_agent)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            started = time.monotonic()
+            responses = await asyncio.gather(*(
+                client.post("/leads", json={
+                    "name": f"n{i}", "email": f"c{i}@example.com", "phone": "1",
+                    # Distinct messages, so singleflight can't merge them
+                    "message": f"hola, necesito una demo número {i}",
+                })
+                for i in range(N)
+            ))
+            return time.monotonic() - started, responses
+
+    elapsed, responses = asyncio.run(run())
+
+    assert [r.status_code for r in responses] == [200] * N
+    assert all(r.json()["detected_language"] == "spanish" for r in responses)
+    assert fake_gemini.calls == N
+    # Serial calls would take N * LATENCY
+    assert elapsed < LATENCY * 2, f"{N} leads took {elapsed:.2f}s"
@@ -0,0 +1,89 @@
+"""GET /leads/counts: derived total, TTL cache and invalidation on writes."""
+
+import asyncio
+
+import httpx
+
+import main
+from services import lead_counts
+
+ROWS = [
+    {"dimension": "status", "value": "New", "count": 4},
+    {"dimension": "status", "value": "Won", "count": 1},
+    {"dimension": "language", "value": "spanish", "count": 5},
+    {"dimension": "agent", "value": "", "count": 2},
+]
+
+
+def _install(monkeypatch, rows):
+    reads = []
+
+    async def get_lead_counts():
+        reads.append(1)
+        return [dict(row) for row in rows]
+
+    async def update_lead_status(lead_id, status):
+        rows[0]["count"] -= 1
+        rows[1]["count"] += 1
+        return {"id": lead_id, "status": status}
+
+    monkeypatch.setenv("LEAD_COUNTS_TTL", "60")
+    monkeypatch.setattr(lead_counts, "_cache", None)
+    monkeypatch.setattr(lead_counts, "get_lead_counts", get_lead_counts)
+    monkeypatch.setattr(main, "update_lead_status", update_lead_status)
+    monkeypatch.setattr(main.event_bus, "publish", lambda event, data: None)
+    return reads
+
+
+def _requests(*calls):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.request(method, url, json=body) for method, url, body in calls]
+
+    return asyncio.run(run())
+
+
+def test_counts_total_is_the_sum_of_status_rows(monkeypatch):
+    _install(monkeypatch, [*ROWS, {"dimension": "all", "value": "", "count": 99}])
+
+    [response] = _requests(("GET", "/leads/counts", None))
+
+    body = response.json()
+    assert body["all"] == {"": 5}      # a stale pre-018 global row is ignored
+    assert body["status"] == {"New": 4, "Won": 1}
+    assert body["language"] == {"spanish": 5} and body["tag"] == {}
+    assert asyncio.run(lead_counts.count_leads("Won")) == 1
+
+
+def test_counts_are_cached_until_a_write_invalidates_them(monkeypatch):
+    reads = _install(monkeypatch, [dict(row) for row in ROWS])
+
+    first, cached, patched, fresh = _requests(
+        ("GET", "/leads/counts", None),
+        ("GET", "/leads/counts", None),
+        ("PATCH", "/leads/lead-1", {"status": "Won"}),
+        ("GET", "/leads/counts", None),
+    )
+
+    assert patched.status_code == 200
+    assert cached.json() == first.json()
+    assert fresh.json()["status"] == {"New": 3, "Won": 2}
+    assert fresh.json()["all"] == {"": 5}
+    assert len(reads) == 2
+
+
+def test_counts_fall_back_to_count_query_when_table_is_missing(monkeypatch):
+    async def missing():
+        raise RuntimeError("relation lead_counts does not exist")
+
+    async def get_lead_count(status_filter=None, estimated=False):
+        return 7
+
+    monkeypatch.setattr(lead_counts, "_cache", None)
+    monkeypatch.setattr(lead_counts, "get_lead_counts", missing)
+    monkeypatch.setattr(lead_counts, "get_lead_count", get_lead_count)
+
+    assert asyncio.run(lead_counts.count_leads()) == 7
+    [response] = _requests(("GET", "/leads/counts", None))
+    assert response.status_code == 500
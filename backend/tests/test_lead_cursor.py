@@ -0,0 +1,84 @@
+"""GET /leads keyset cursors: round-trip, rejection of bad input, last page."""
+
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+LEAD_ID = "6f1c2a7e-3b4d-4e5f-8a9b-0c1d2e3f4a5b"
+CREATED_AT = "2024-05-01T12:30:00.123456+00:00"
+
+
+def _lead(i: int) -> dict:
+    return {
+        "id": f"00000000-0000-0000-0000-{i:012d}", "name": f"n{i}", "email": f"c{i}@example.com",
+        "status": "New", "created_at": f"2024-05-01T12:00:{59 - i:02d}+00:00",
+    }
+
+
+def _list(monkeypatch, rows, **params):
+    seen = {}
+
+    async def get_all_leads(limit, offset, status_filter, cursor, **kwargs):
+        seen["limit"], seen["cursor"] = limit, cursor
+        return rows[:limit]
+
+    async def count_leads(status, estimated=False):
+        return len(rows)
+
+    monkeypatch.setattr(main, "get_all_leads", get_all_leads)
+    monkeypatch.setattr(main.lead_counts, "count_leads", count_leads)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/leads", params=params)
+
+    return seen, asyncio.run(run())
+
+
+def test_cursor_round_trips_and_is_url_safe():
+    cursor = main._encode_cursor({"created_at": CREATED_AT, "id": LEAD_ID, "name": "x"})
+
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert main._decode_cursor(cursor) == (CREATED_AT, LEAD_ID)
+    updated = main._encode_cursor({"updated_at": CREATED_AT, "id": LEAD_ID}, key="updated_at")
+    assert main._decode_cursor(updated) == (CREATED_AT, LEAD_ID)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!",
+    main._encode_cursor({"created_at": CREATED_AT, "id": "1 or 1=1"}),
+    main._encode_cursor({"created_at": "yesterday", "id": LEAD_ID}),
+    main._encode_cursor({"id": LEAD_ID})[:-4],
+])
+def test_invalid_cursor_is_rejected(monkeypatch, cursor):
+    with pytest.raises((ValueError, TypeError)):
+        main._decode_cursor(cursor)
+
+    seen, response = _list(monkeypatch, [], cursor=cursor)
+    assert response.status_code == 422
+    assert seen == {}           # never reaches the query
+
+
+def test_next_cursor_points_at_last_row_of_a_full_page(monkeypatch):
+    rows = [_lead(i) for i in range(3)]
+    seen, response = _list(monkeypatch, rows, limit=2)
+
+    body = response.json()
+    assert seen["limit"] == 3   # one extra row probes for a next page
+    assert [lead["id"] for lead in body["leads"]] == [rows[0]["id"], rows[1]["id"]]
+    assert main._decode_cursor(body["next_cursor"]) == (rows[1]["created_at"], rows[1]["id"])
+
+    seen, response = _list(monkeypatch, rows[2:], limit=2, cursor=body["next_cursor"])
+    assert seen["cursor"] == (rows[1]["created_at"], rows[1]["id"])
+    assert response.json()["next_cursor"] is None
+
+
+def test_exactly_full_last_page_has_no_next_cursor(monkeypatch):
+    _, response = _list(monkeypatch, [_lead(0), _lead(1)], limit=2)
+
+    assert len(response.json()["leads"]) == 2
+    assert response.json()["next_cursor"] is None
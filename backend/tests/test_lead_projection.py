@@ -0,0 +1,67 @@
+"""GET /leads view=summary and fields= projections."""
+
+import re
+import asyncio
+from pathlib import Path
+
+import httpx
+
+import main
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / "migrations"
+
+
+def _list(monkeypatch, **params):
+    seen = {}
+
+    async def get_all_leads(limit, offset, status_filter, cursor, fields, summary, include_replies):
+        seen.update(fields=fields, summary=summary)
+        return [{"id": "00000000-0000-0000-0000-000000000001", "created_at": "2024-01-01T00:00:00+00:00",
+                 "tags": ["Demo"], "updated_at": "2024-01-02T00:00:00+00:00"}]
+
+    async def count_leads(status, estimated=False):
+        return 1
+
+    monkeypatch.setattr(main, "get_all_leads", get_all_leads)
+    monkeypatch.setattr(main.lead_counts, "count_leads", count_leads)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/leads", params=params)
+
+    return seen, asyncio.run(run())
+
+
+def test_summary_fields_match_the_latest_view_definition():
+    latest = [p for p in sorted(MIGRATIONS.glob("*.sql"))
+              if "CREATE OR REPLACE VIEW leads_summary" in p.read_text()][-1]
+    body = latest.read_text().split("AS\nSELECT", 1)[1].split("FROM leads", 1)[0]
+    # Each column is its bare name or the alias after AS
+    columns = {re.findall(r"\w+", item)[-1] for item in body.split(",\n")}
+
+    assert columns == main.SUMMARY_FIELDS
+
+
+def test_summary_projection_selects_sync_fields_plus_sort_keys(monkeypatch):
+    seen, response = _list(monkeypatch, view="summary", fields="tags, updated_at,translation_status")
+
+    assert response.status_code == 200
+    assert seen["summary"] is True
+    assert seen["fields"] == ["tags", "updated_at", "translation_status", "id", "created_at"]
+    assert response.json()["leads"][0]["tags"] == ["Demo"]
+
+
+def test_full_columns_are_rejected_in_the_summary_view(monkeypatch):
+    seen, response = _list(monkeypatch, view="summary", fields="id,original_message")
+
+    assert response.status_code == 422
+    assert "original_message" in response.json()["detail"]
+    assert seen == {}
+
+
+def test_default_view_selects_all_columns(monkeypatch):
+    seen, response = _list(monkeypatch)
+
+    assert response.status_code == 200
+    assert seen == {"fields": None, "summary": False}
@@ -0,0 +1,116 @@
+"""Deferred lead workers: claimed rows are processed once, failures are rescheduled."""
+
+import asyncio
+
+import pytest
+
+import main
+from services import lead_worker
+
+
+def _install_db(monkeypatch, rows):
+    """In-memory stand-in for the claim / release RPCs."""
+    released = []
+
+    async def claim(batch_size, lease_seconds):
+        batch, rows[:] = rows[:batch_size], rows[batch_size:]
+        return batch
+
+    async def release(lead_id, claim_token, next_attempt_at):
+        released.append((lead_id, claim_token, next_attempt_at))
+
+    monkeypatch.setattr(lead_worker, "claim_pending_leads", claim)
+    monkeypatch.setattr(lead_worker, "release_lead_claim", release)
+    return released
+
+
+def test_poller_claims_and_failures_are_rescheduled(monkeypatch):
+    monkeypatch.setenv("LEAD_WORKERS", "2")
+    monkeypatch.setenv("LEAD_MAX_ATTEMPTS", "3")
+    rows = [{"id": f"lead-{i}", "claim_token": f"t{i}", "attempts": i} for i in range(1, 5)]
+    released = _install_db(monkeypatch, rows)
+    processed = []
+
+    async def processor(lead):
+        processed.append(lead["id"])
+        if lead["id"] in ("lead-1", "lead-3"):
+            raise RuntimeError("Gemini unavailable")
+
+    async def run():
+        await lead_worker.start_workers(processor)
+        for _ in range(100):
+            if len(processed) == 4 and len(released) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await lead_worker.stop_workers()
+
+    asyncio.run(run())
+
+    assert sorted(processed) == ["lead-1", "lead-2", "lead-3", "lead-4"]
+    outcome = {lead_id: (token, retry_at) for lead_id, token, retry_at in released}
+    # Attempt 1 of 3 is retried later; attempt 3 of 3 gives up
+    assert outcome["lead-1"][0] == "t1" and outcome["lead-1"][1] is not None
+    assert outcome["lead-3"] == ("t3", None)
+
+
+def test_poller_refills_freed_slots_while_workers_are_busy(monkeypatch):
+    monkeypatch.setenv("LEAD_WORKERS", "1")           # local queue holds 2
+    monkeypatch.setenv("LEAD_POLL_SECONDS", "60")
+    rows = [{"id": f"lead-{i}", "claim_token": f"t{i}", "attempts": 1} for i in range(1, 6)]
+    _install_db(monkeypatch, rows)
+    gate = asyncio.Event()
+
+    async def processor(lead):
+        await gate.wait()
+
+    async def run():
+        await lead_worker.start_workers(processor)
+        for _ in range(100):
+            if len(rows) == 2:
+                break
+            await asyncio.sleep(0.01)
+        # The first lead is still in flight, yet its slot was refilled
+        claimed_while_busy = 5 - len(rows)
+        gate.set()
+        await lead_worker.stop_workers()
+        return claimed_while_busy
+
+    assert asyncio.run(run()) == 3
+
+
+def test_new_claim_holds_a_lease(monkeypatch):
+    monkeypatch.setenv("LEAD_LEASE_SECONDS", "60")
+    claim = lead_worker.new_claim()
+    assert claim["translation_status"] == "processing"
+    assert claim["attempts"] == 1
+    assert claim["next_attempt_at"] > claim["claimed_at"]
+
+
+@pytest.mark.parametrize("outcome", [None, RuntimeError("connection reset")])
+def test_reserved_agent_is_released_when_the_result_is_not_written(monkeypatch, outcome):
+    released = []
+
+    async def process_lead(message, language_hint=""):
+        return {"translated_message": "hi", "detected_language": "spanish",
+                "tag": "demo", "tags": ["demo"], "assigned_to": "Agent B"}
+
+    async def update_claimed_lead(lead_id, claim_token, fields):
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome          # None: the claim was lost to another worker
+
+    async def release_agents(agents):
+        released.extend(agents)
+
+    monkeypatch.setattr(main, "_process_lead", process_lead)
+    monkeypatch.setattr(main, "update_claimed_lead", update_claimed_lead)
+    monkeypatch.setattr(main, "release_agents", release_agents)
+
+    lead = {"id": "lead-1", "claim_token": "t1", "original_message": "hola"}
+    if outcome is None:
+        asyncio.run(main._complete_pending_lead(lead))
+    else:
+        with pytest.raises(RuntimeError):      # the worker reschedules the lead
+            asyncio.run(main._complete_pending_lead(lead))
+
+    assert released == ["Agent B"]
@@ -0,0 +1,61 @@
+"""GET /leads throughput must scale with concurrency on the async data layer."""
+
+import time
+import asyncio
+
+import httpx
+
+import main
+from services import lead_counts, supabase_service
+
+LATENCY = 0.1
+REQUESTS = 20
+LEADS = [
+    {"id": f"00000000-0000-0000-0000-{i:012d}", "name": f"n{i}", "email": f"c{i}@example.com",
+     "status": "New", "created_at": "2024-01-01T00:00:00+00:00"}
+    for i in range(3)
+]
+
+
+async def _postgrest(request: httpx.Request) -> httpx.Response:
+    """Fake PostgREST: every query costs one LATENCY round-trip."""
+    await asyncio.sleep(LATENCY)
+    if request.url.path.endswith("/lead_counts"):
+        return httpx.Response(200, json=[{"dimension": "status", "value": "New", "count": 3}])
+    return httpx.Response(200, json=LEADS)
+
+
+async def _throughput(client: httpx.AsyncClient, concurrency: int) -> float:
+    """Requests per second for REQUESTS calls with *concurrency* in flight."""
+    pending = iter(range(REQUESTS))
+
+    async def user():
+        for _ in pending:
+            response = await client.get("/leads", params={"limit": 2})
+            assert response.status_code == 200
+            assert response.json()["total"] == 3
+
+    started = time.monotonic()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return REQUESTS / (time.monotonic() - started)
+
+
+def test_list_leads_throughput_scales_with_concurrency(monkeypatch, fake_postgrest):
+    fake_postgrest(_postgrest)
+    monkeypatch.setenv("LEAD_COUNTS_TTL", "60")
+    monkeypatch.setattr(lead_counts, "_cache", None)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/leads")          # warm the client and the counts cache
+            rates = {c: await _throughput(client, c) for c in (1, 5, 20)}
+        await supabase_service.close_supabase()
+        return rates
+
+    rates = asyncio.run(run())
+
+    # One in flight is bound by the round-trip; more overlap instead of queueing
+    assert rates[1] < 1.5 / LATENCY
+    assert rates[5] > rates[1] * 3, rates
+    assert rates[20] > rates[5] * 2, rates
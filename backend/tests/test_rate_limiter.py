@@ -0,0 +1,67 @@
+"""Gemini rate limiter: max-wait fallback, FIFO pacing and usage settlement."""
+
+import time
+import asyncio
+
+import pytest
+
+from services.rate_limiter import RateLimiter, RateLimitTimeout
+
+
+def test_call_that_would_wait_too_long_is_rejected():
+    async def run():
+        limiter = RateLimiter(rpm=60, tpm=0, max_wait=0.5)
+        await limiter.acquire()                 # bucket holds 60 and refills 1/s
+        limiter.requests.tokens = 0
+        started = time.monotonic()
+        with pytest.raises(RateLimitTimeout):
+            await limiter.acquire()             # next slot in ~1s > max_wait
+        return limiter, time.monotonic() - started
+
+    limiter, elapsed = asyncio.run(run())
+
+    # Rejected up front instead of sleeping until the deadline
+    assert elapsed < 0.1
+    assert (limiter.acquired, limiter.rejected) == (1, 1)
+
+
+def test_waiting_callers_are_paced_in_arrival_order():
+    order = []
+
+    async def call(limiter, n):
+        await limiter.acquire()
+        order.append(n)
+
+    async def run():
+        # 600 rpm = one request per 0.1s once the bucket is empty
+        limiter = RateLimiter(rpm=600, tpm=0, max_wait=5)
+        limiter.requests.tokens = 0
+        started = time.monotonic()
+        tasks = [asyncio.create_task(call(limiter, n)) for n in range(5)]
+        await asyncio.gather(*tasks)
+        return limiter, time.monotonic() - started
+
+    limiter, elapsed = asyncio.run(run())
+
+    assert order == [0, 1, 2, 3, 4]
+    assert 0.4 <= elapsed < 1.0
+    assert limiter.queue_depth == 0 and limiter.max_observed_wait > 0.3
+
+
+def test_settle_charges_or_refunds_token_bucket():
+    limiter = RateLimiter(rpm=0, tpm=6000, max_wait=1)
+    asyncio.run(limiter.acquire(tokens=1000))
+    assert limiter.tokens.tokens == pytest.approx(5000, abs=5)
+
+    limiter.settle(1500)     # real usage was 1500 tokens more than estimated
+    assert limiter.tokens.tokens == pytest.approx(3500, abs=5)
+
+    limiter.settle(-2000)    # over-estimate refunded, capped at capacity
+    limiter.settle(-10000)
+    assert limiter.tokens.tokens == pytest.approx(6000)
+
+
+def test_disabled_limiter_never_waits():
+    limiter = RateLimiter(rpm=0, tpm=0, max_wait=0)
+    assert asyncio.run(limiter.acquire(tokens=10**9)) == 0.0
+    assert limiter.stats()["available_requests"] is None
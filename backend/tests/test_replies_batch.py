@@ -0,0 +1,82 @@
+"""GET /replies: one batched `in.(...)` query per 100 leads, grouped per lead."""
+
+import asyncio
+
+import httpx
+
+import main
+from services import supabase_service
+
+
+def _ids(n: int) -> list[str]:
+    return [f"00000000-0000-0000-0000-{i:012d}" for i in range(n)]
+
+
+def _install(fake_postgrest, replies):
+    """Fake replies table; returns the lead ids each query asked for."""
+    queries = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/rest/v1/replies"
+        wanted = request.url.params["lead_id"].removeprefix("in.(").removesuffix(")").split(",")
+        assert request.url.params["order"] == "created_at.asc"
+        queries.append(wanted)
+        rows = sorted((r for r in replies if r["lead_id"] in wanted), key=lambda r: r["created_at"])
+        return httpx.Response(200, json=rows)
+
+    fake_postgrest(handler)
+    return queries
+
+
+def _get(lead_ids):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/replies", params={"lead_ids": ",".join(lead_ids)})
+        await supabase_service.close_supabase()
+        return response
+
+    return asyncio.run(run())
+
+
+def test_replies_are_grouped_per_lead_from_one_query(fake_postgrest):
+    a, b, c = _ids(3)
+    queries = _install(fake_postgrest, [
+        {"id": "r3", "lead_id": a, "created_at": "2024-01-03T00:00:00+00:00"},
+        {"id": "r1", "lead_id": a, "created_at": "2024-01-01T00:00:00+00:00"},
+        {"id": "r2", "lead_id": b, "created_at": "2024-01-02T00:00:00+00:00"},
+    ])
+
+    response = _get([a, b, c, a])
+
+    assert response.status_code == 200
+    grouped = response.json()["replies"]
+    assert [r["id"] for r in grouped[a]] == ["r1", "r3"]
+    assert [r["id"] for r in grouped[b]] == ["r2"]
+    assert grouped[c] == []
+    assert queries == [[a, b, c]]          # duplicates dropped, one round-trip
+
+
+def test_more_than_100_leads_are_fetched_in_chunks(fake_postgrest):
+    ids = _ids(250)
+    queries = _install(fake_postgrest, [
+        {"id": f"r{i}", "lead_id": lead_id, "created_at": f"2024-01-01T00:00:{i % 60:02d}+00:00"}
+        for i, lead_id in enumerate(ids) if i % 2 == 0
+    ])
+
+    response = _get(ids)
+
+    grouped = response.json()["replies"]
+    assert [len(q) for q in queries] == [100, 100, 50]
+    assert sum(queries, []) == ids
+    assert len(grouped) == 250
+    assert [r["id"] for r in grouped[ids[248]]] == ["r248"] and grouped[ids[249]] == []
+
+
+def test_more_than_500_leads_are_rejected(fake_postgrest):
+    queries = _install(fake_postgrest, [])
+
+    response = _get(_ids(501))
+
+    assert response.status_code == 422
+    assert queries == []
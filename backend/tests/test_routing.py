@@ -0,0 +1,165 @@
+"""Routing: index rebuilds, skill pools and db-mode agent reservations."""
+
+import asyncio
+
+import main
+from services import assignment, routing
+
+AGENTS = [
+    {"name": "Agent A", "open_leads": 3},
+    {"name": "Agent B", "open_leads": 1},
+]
+
+
+SKILLED = [
+    {"name": "Ana", "email": "Ana@Example.com", "languages": ["Spanish"], "tags": ["pricing"]},
+    {"name": "Bea", "email": "bea@example.com", "languages": ["spanish", "french"], "tags": []},
+    {"name": "Cai", "email": "cai@example.com", "languages": [], "tags": ["pricing", "demo"]},
+    {"name": "Dev", "email": "dev@example.com", "languages": ["hindi"], "tags": []},
+]
+
+
+def _install_db(monkeypatch, agents=AGENTS):
+    scans = []
+
+    async def get_agents():
+        return agents
+
+    async def get_open_lead_assignments():
+        scans.append(1)
+        return [{"id": "l1", "assigned_to": "Agent A"}]
+
+    monkeypatch.setattr(routing, "get_agents", get_agents)
+    monkeypatch.setattr(routing, "get_open_lead_assignments", get_open_lead_assignments)
+    monkeypatch.setattr(routing, "index", routing.WorkloadIndex())
+    return scans
+
+
+def test_db_mode_seeds_loads_without_scanning_leads(monkeypatch):
+    monkeypatch.setenv("ASSIGNMENT_MODE", "db")
+    scans = _install_db(monkeypatch)
+
+    asyncio.run(routing.rebuild())
+
+    assert scans == []
+    assert routing.index.snapshot() == {"Agent A": 3, "Agent B": 1}
+    assert routing.index.least_loaded() == "Agent B"
+
+    # A lead opened before the rebuild is already counted: its change is skipped
+    routing.on_event("lead.status_changed", {"id": "old", "status": "Won", "assigned_to": "Agent A"})
+    assert routing.index.snapshot() == {"Agent A": 3, "Agent B": 1}
+
+    # New leads are tracked from their creation on
+    routing.on_event("lead.created", {"id": "new", "status": "New", "assigned_to": "Agent B"})
+    routing.on_event("leads.updated", {"ids": ["new"], "status": "Lost"})
+    assert routing.index.snapshot() == {"Agent A": 3, "Agent B": 1}
+
+    # A bulk import arrives as one event listing every created row
+    routing.on_event("leads.created", {"ids": ["b1", "b2"], "leads": [
+        {"id": "b1", "status": "New", "assigned_to": "Agent A"},
+        {"id": "b2", "status": "New", "assigned_to": "Agent B"},
+    ]})
+    assert routing.index.snapshot() == {"Agent A": 4, "Agent B": 2}
+
+
+def test_local_mode_pages_open_leads(monkeypatch):
+    monkeypatch.setenv("ASSIGNMENT_MODE", "local")
+    scans = _install_db(monkeypatch)
+
+    asyncio.run(routing.rebuild())
+
+    assert scans == [1]
+    assert routing.index.snapshot() == {"Agent A": 1, "Agent B": 0}
+    routing.on_event("lead.status_changed", {"id": "l1", "status": "Won"})
+    assert routing.index.snapshot() == {"Agent A": 0, "Agent B": 0}
+
+
+def test_release_agents_returns_db_reservations_only(monkeypatch):
+    calls = []
+
+    async def release_agent_reservations(names):
+        calls.append(names)
+
+    monkeypatch.setattr(assignment, "release_agent_reservations", release_agent_reservations)
+
+    monkeypatch.setenv("ASSIGNMENT_MODE", "db")
+    asyncio.run(assignment.release_agents(["Agent A", None, "Agent A"]))
+    asyncio.run(assignment.release_agents([None]))
+    monkeypatch.setenv("ASSIGNMENT_MODE", "local")
+    asyncio.run(assignment.release_agents(["Agent B"]))
+
+    assert calls == [["Agent A", "Agent A"]]
+
+
+def test_route_prefers_language_and_tag_then_language_then_tag():
+    index = routing.WorkloadIndex()
+    index.reset(SKILLED, [])
+
+    assert index.route("spanish", "pricing") == ("Ana",)
+    assert index.route("spanish", "demo") == ("Ana", "Bea")      # no one has both
+    assert index.route("german", "pricing") == ("Ana", "Cai")    # no one speaks it
+    assert index.route("german", "support") == ("Ana", "Bea", "Cai", "Dev")
+    assert index.route() == index.route("", "")
+    assert index.route(" SPANISH ", "Pricing") is index.route("spanish", "pricing")
+
+
+def test_assign_agents_makes_one_rpc_per_pool(monkeypatch):
+    monkeypatch.setenv("ASSIGNMENT_MODE", "db")
+    monkeypatch.setattr(routing, "_built_at", None)
+    _install_db(monkeypatch, SKILLED)
+    calls = []
+
+    async def assign_least_loaded(n, candidates):
+        calls.append((n, candidates))
+        pool = candidates or ["New Agent"]
+        return [pool[i % len(pool)] for i in range(n)]
+
+    monkeypatch.setattr(assignment, "assign_least_loaded", assign_least_loaded)
+
+    assigned = asyncio.run(assignment.assign_agents([
+        ("spanish", "pricing"), ("", ""), ("french", ""), ("spanish", "pricing"), ("german", "other"),
+    ]))
+
+    # The general pool leaves the candidates open; skill pools name theirs
+    assert calls == [(2, ["Ana"]), (2, None), (1, ["Bea"])]
+    assert assigned == ["Ana", "New Agent", "Bea", "Ana", "New Agent"]
+
+
+def test_assign_agents_falls_back_to_the_local_index(monkeypatch):
+    monkeypatch.setenv("ASSIGNMENT_MODE", "db")
+    monkeypatch.setattr(routing, "_built_at", None)
+    _install_db(monkeypatch, SKILLED)
+
+    async def assign_least_loaded(n, candidates):
+        raise RuntimeError("rpc unavailable")
+
+    monkeypatch.setattr(assignment, "assign_least_loaded", assign_least_loaded)
+
+    assigned = asyncio.run(assignment.assign_agents([("spanish", ""), ("spanish", ""), ("hindi", "")]))
+
+    assert sorted(assigned[:2]) == ["Ana", "Bea"]
+    assert assigned[2] == "Dev"
+
+
+def _reply(**fields) -> main.ReplyRequest:
+    return main.ReplyRequest(**{"message": "Hola, le envío los precios", "agent_email": "", **fields})
+
+
+def test_reply_translation_is_skipped_only_when_it_is_safe(monkeypatch):
+    monkeypatch.setattr(routing, "index", routing.WorkloadIndex())
+    routing.index.reset(SKILLED, [])
+    detections = {"Hola, le envío los precios": ("spanish", 0.99), "Hola": ("spanish", 0.5)}
+    monkeypatch.setattr(main, "detect_language_local", lambda text: detections[text])
+
+    # The agent's own word wins, either way
+    assert main._written_in_client_language(_reply(language=" Spanish"), "spanish")
+    assert not main._written_in_client_language(_reply(language="english", agent_email="ana@example.com"), "spanish")
+
+    # A speaker of the language, found by email or by name, with a confident detection
+    assert main._written_in_client_language(_reply(agent_email="ANA@example.com"), "spanish")
+    assert main._written_in_client_language(_reply(agent_email="x@example.com", agent_name="Bea"), "spanish")
+    assert not main._written_in_client_language(_reply(agent_email="ana@example.com", message="Hola"), "spanish")
+
+    # An agent who does not speak it is always translated
+    assert not main._written_in_client_language(_reply(agent_email="cai@example.com"), "spanish")
+    assert not main._written_in_client_language(_reply(agent_email="dev@example.com"), "french")
@@ -0,0 +1,107 @@
+"""Keyword tagging: boundaries, wildcards, CJK, Devanagari and hot reload."""
+
+import os
+import json
+
+import pytest
+
+from services import tagging
+from services.tagging import TagEngine
+
+
+def _engine(**keywords) -> TagEngine:
+    """One tag per keyword list; earlier tags get the higher priority."""
+    return TagEngine({"tags": {
+        name: {"priority": 100 - i, "keywords": {"any": words}}
+        for i, (name, words) in enumerate(keywords.items())
+    }})
+
+
+def test_keywords_match_whole_words_only():
+    engine = _engine(pricing=["cost", "how much"], demo=["demo"])
+
+    assert engine.match("What does it COST?") == ["pricing"]
+    assert engine.match("A costume for the demos") == []
+    assert engine.match("how   much\nfor a demo") == ["pricing", "demo"]
+    assert engine.match("somehow muchness") == []
+
+
+def test_wildcards_drop_one_boundary_each():
+    engine = _engine(pricing=["price*", "*preis*"], support=["*ausfall"])
+
+    assert engine.match("our prices") == ["pricing"]
+    assert engine.match("unpriced") == []
+    assert engine.match("die Gesamtpreise") == ["pricing"]
+    assert engine.match("ein Stromausfall") == ["support"]
+    assert engine.match("Ausfallzeit") == []
+
+
+def test_every_matching_tag_is_returned_by_priority():
+    engine = _engine(pricing=["price"], demo=["demo"], shared=["price"])
+
+    # "price" under two tags belongs to the higher one only
+    assert engine.match("demo and price") == ["pricing", "demo"]
+
+
+def test_cjk_keywords_match_without_spaces():
+    engine = _engine(pricing=["多少钱"], demo=["演示"])
+
+    assert engine.match("请问这个产品多少钱？我们想要演示") == ["pricing", "demo"]
+    assert engine.match("钱多少") == []
+
+
+def test_devanagari_combining_marks_continue_a_word():
+    # "दाम" (price) must not fire inside "दामाद" (son-in-law), and a
+    # vowel sign after the keyword is part of the same word
+    engine = _engine(pricing=["दाम"], support=["समस्या*"])
+
+    assert engine.match("इसका दाम क्या है?") == ["pricing"]
+    assert engine.match("मेरा दामाद आया") == []
+    assert engine.match("दामों") == []
+    assert engine.match("कई समस्याएं हैं") == ["support"]
+
+
+def test_malformed_rules_are_rejected():
+    with pytest.raises(ValueError):
+        TagEngine({"tags": {}})
+    with pytest.raises(ValueError):
+        TagEngine({"tags": {"x": {"priority": "high", "keywords": {"en": ["a"]}}}})
+    with pytest.raises(ValueError):
+        TagEngine({"tags": {"x": {"keywords": {"en": ["*", "  "]}}}})
+
+
+@pytest.fixture
+def rules_file(tmp_path, monkeypatch):
+    path = tmp_path / "tag_rules.json"
+    monkeypatch.setenv("TAG_RULES_PATH", str(path))
+    monkeypatch.setenv("TAG_RULES_RELOAD_SECONDS", "0")
+    monkeypatch.setattr(tagging, "_engine", None)
+    monkeypatch.setattr(tagging, "_loaded_mtime", None)
+    monkeypatch.setattr(tagging, "_checked_at", 0.0)
+    monkeypatch.setattr(tagging, "_reloads", 0)
+
+    def write(content, mtime):
+        path.write_text(content if isinstance(content, str) else json.dumps(content), encoding="utf-8")
+        os.utime(path, (mtime, mtime))
+
+    return write
+
+
+def test_rules_file_is_hot_reloaded_and_bad_edits_are_ignored(rules_file):
+    rules_file({"default_tag": "other", "tags": {"demo": {"keywords": {"en": ["demo"]}}}}, 1000)
+    assert tagging.tag_message("a demo please") == ["demo"]
+    assert tagging.default_tag() == "other"
+
+    rules_file({"tags": {"trial": {"keywords": {"en": ["trial"]}}}}, 2000)
+    assert tagging.tag_message("a demo please") == []
+    assert tagging.tag_message("free trial") == ["trial"]
+
+    # An invalid edit is logged once; the previous rules stay active
+    rules_file("{not json", 3000)
+    assert tagging.tag_message("free trial") == ["trial"]
+    assert tagging.stats()["reloads"] == 2
+
+
+def test_missing_rules_file_falls_back_to_builtin_rules(rules_file):
+    assert tagging.tag_message("Need a price for enterprise support") == ["pricing", "support", "enterprise"]
+    assert tagging.default_tag() == "general"
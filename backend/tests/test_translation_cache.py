@@ -0,0 +1,82 @@
+"""Translation cache: LRU TTL/eviction counters and the batched two-tier API."""
+
+import asyncio
+
+from services import translation_cache
+from services.translation_cache import _LRUCache, make_key
+
+
+def test_lru_evicts_least_recently_used(monkeypatch):
+    cache = _LRUCache(max_size=2, ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"      # "b" is now least recently used
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+    assert cache.evictions == 1 and len(cache) == 2
+
+
+def test_lru_expires_entries_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(translation_cache.time, "monotonic", lambda: now[0])
+    cache = _LRUCache(max_size=10, ttl=30)
+    cache.set("a", "1")
+
+    now[0] += 29
+    assert cache.get("a") == "1"
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.evictions == 1 and len(cache) == 0
+
+
+def _install_store(monkeypatch, stored):
+    """Persistent tier backed by *stored* (cache_key → text); records calls."""
+    calls = {"reads": [], "writes": []}
+
+    async def get_cached_translations(keys):
+        calls["reads"].append(list(keys))
+        return {k: stored[k] for k in keys if k in stored}
+
+    async def upsert_cached_translations(records):
+        calls["writes"].append(records)
+        stored.update({r["cache_key"]: r["translated_text"] for r in records})
+
+    monkeypatch.setenv("TRANSLATION_CACHE_PERSIST", "1")
+    monkeypatch.setattr(translation_cache, "_stats", dict.fromkeys(translation_cache._stats, 0))
+    monkeypatch.setattr(translation_cache, "get_cached_translations", get_cached_translations)
+    monkeypatch.setattr(translation_cache, "upsert_cached_translations", upsert_cached_translations)
+    return calls
+
+
+def test_get_translations_reads_memory_then_one_batched_query(monkeypatch):
+    stored = {make_key("hola", "spanish", "english", "m"): "hello"}
+    calls = _install_store(monkeypatch, stored)
+
+    async def run():
+        await translation_cache.put_translations([("gracias", "thanks")], "spanish", "english", "m")
+        return await translation_cache.get_translations(
+            ["gracias", "hola", "adiós", "  HOLA "], "spanish", "english", "m",
+        )
+
+    found = asyncio.run(run())
+
+    # Normalized duplicates share one entry; "gracias" came from memory
+    assert found == {"gracias": "thanks", "hola": "hello", "  HOLA ": "hello"}
+    assert len(calls["reads"]) == 1 and len(calls["reads"][0]) == 2
+    stats = translation_cache.get_stats()
+    assert (stats["hits"], stats["persistent_hits"], stats["misses"]) == (1, 2, 1)
+
+
+def test_put_translations_writes_both_tiers_in_one_upsert(monkeypatch):
+    stored = {}
+    calls = _install_store(monkeypatch, stored)
+    pairs = [("uno", "one"), ("dos", "two"), ("Uno", "one")]
+
+    asyncio.run(translation_cache.put_translations(pairs, "spanish", "english", "m"))
+
+    [records] = calls["writes"]
+    assert len(records) == 2   # "Uno" normalizes to the same key as "uno"
+    assert stored[make_key("dos", "spanish", "english", "m")] == "two"
+    assert translation_cache.get_stats()["size"] == 2
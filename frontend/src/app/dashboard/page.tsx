@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useCallback, useRef } from "react";
 import { useRouter } from "next/navigation";
 import {
     Box,
@@ -45,9 +45,11 @@ import LogoutIcon from "@mui/icons-material/Logout";
 import ChatBubbleOutlineIcon from "@mui/icons-material/ChatBubbleOutline";
 import {
     fetchLeads,
+    fetchLeadChanges,
     updateLeadStatus,
     sendReply,
     fetchReplies,
+    subscribeToLeadEvents,
     type Lead,
     type LeadsListResponse,
     type Reply,
@@ -146,9 +148,19 @@ export default function DashboardPage() {
     }, [authLoading, user, router]);
 
     /* ---- Fetch leads ---- */
+    const watermarkRef = useRef<string | null>(null);
+    const leadsRef = useRef<Lead[]>([]);
+    useEffect(() => {
+        leadsRef.current = leads;
+    }, [leads]);
+
     const loadLeads = useCallback(async () => {
         setLoading(true);
         setError(null);
+        // Take the watermark first so nothing changed during the load is missed
+        const changes = await fetchLeadChanges("now");
+        watermarkRef.current = changes.success ? changes.data?.watermark ?? null : null;
+
         const result = await fetchLeads(200, 0, statusFilter || undefined);
         if (result.success && result.data) {
             const data = result.data as LeadsListResponse;
@@ -161,14 +173,63 @@ export default function DashboardPage() {
         setLastRefresh(new Date());
     }, [statusFilter]);
 
+    /* ---- Apply only the rows changed since the last sync ---- */
+    const syncChanges = useCallback(async () => {
+        const since = watermarkRef.current;
+        if (!since) return loadLeads();
+
+        const result = await fetchLeadChanges(since);
+        if (!result.success || !result.data) return;
+        const { leads: changed, watermark, has_more } = result.data;
+        if (has_more) return loadLeads();
+        watermarkRef.current = watermark;
+        if (changed.length === 0) return;
+
+        // Merge outside a state updater: updaters must stay pure (React
+        // may run them twice), so the total is adjusted separately
+        const prev = leadsRef.current;
+        const byId = new Map(prev.map((lead) => [lead.id, lead]));
+        const oldest = prev.length ? prev[prev.length - 1].created_at : "";
+        let delta = 0;
+        for (const lead of changed) {
+            const matches = !statusFilter || lead.status === statusFilter;
+            const known = byId.has(lead.id);
+            if (matches && (known || lead.created_at >= oldest)) {
+                if (!known) delta += 1;
+                byId.set(lead.id, lead);
+            } else if (known && !matches) {
+                byId.delete(lead.id);
+                delta -= 1;
+            }
+        }
+        const next = Array.from(byId.values()).sort((a, b) =>
+            b.created_at.localeCompare(a.created_at)
+        );
+        leadsRef.current = next;
+        setLeads(next);
+        if (delta) setTotal((t) => t + delta);
+        setLastRefresh(new Date());
+    }, [loadLeads, statusFilter]);
+
     useEffect(() => {
         if (user) {
             // eslint-disable-next-line react-hooks/exhaustive-deps
             loadLeads();
-            const interval = setInterval(loadLeads, 15000);
-            return () => clearInterval(interval);
+            // Pull deltas when the server reports a change (debounced), and
+            // on a slow timer for deployments that can't hold a stream open
+            let timer: ReturnType<typeof setTimeout> | undefined;
+            const unsubscribe = subscribeToLeadEvents((type) => {
+                clearTimeout(timer);
+                timer = setTimeout(type === "reset" ? loadLeads : syncChanges, 500);
+            });
+            const interval = setInterval(syncChanges, 15000);
+            return () => {
+                clearTimeout(timer);
+                clearInterval(interval);
+                unsubscribe();
+            };
         }
-    }, [loadLeads, user]);
+    }, [loadLeads, syncChanges, user]);
 
     /* ---- Load replies for a lead ---- */
     async function loadReplies(leadId: string) {
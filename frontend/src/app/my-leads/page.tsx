@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useCallback, useRef } from "react";
 import { useRouter } from "next/navigation";
 import {
     Box,
@@ -19,7 +19,10 @@ import AddIcon from "@mui/icons-material/Add";
 import LogoutIcon from "@mui/icons-material/Logout";
 import {
     fetchLeads,
+    fetchLeadChanges,
     fetchReplies,
+    fetchRepliesForLeads,
+    subscribeToLeadEvents,
     type Lead,
     type LeadsListResponse,
     type Reply,
@@ -65,41 +68,120 @@ export default function MyLeadsPage() {
     }, [authLoading, user, router]);
 
     /* ---- Fetch leads ---- */
+    const email = user?.email?.toLowerCase() ?? "";
+    const watermarkRef = useRef<string | null>(null);
+    const leadsRef = useRef<Lead[]>([]);
+    useEffect(() => {
+        leadsRef.current = leads;
+    }, [leads]);
+
+    // Background refreshes keep the current replies on screen (no spinners)
+    const loadReplies = useCallback(async (ids: string[], background = false) => {
+        if (ids.length === 0) return;
+        if (!background) {
+            const pending = Object.fromEntries(ids.map((id) => [id, true]));
+            setLoadingReplies((prev) => ({ ...prev, ...pending }));
+        }
+        const grouped = await fetchRepliesForLeads(ids);
+        setRepliesMap((prev) => ({
+            ...prev,
+            ...Object.fromEntries(ids.map((id) => [id, grouped[id] || []])),
+        }));
+        if (!background) {
+            const done = Object.fromEntries(ids.map((id) => [id, false]));
+            setLoadingReplies((prev) => ({ ...prev, ...done }));
+        }
+    }, []);
+
     const loadLeads = useCallback(async () => {
-        if (!user?.email) return;
+        if (!email) return;
         setLoading(true);
         setError(null);
+        // Take the watermark first so nothing changed during the load is missed
+        const changes = await fetchLeadChanges("now");
+        watermarkRef.current = changes.success ? changes.data?.watermark ?? null : null;
 
         const result = await fetchLeads(200, 0);
         if (result.success && result.data) {
             const data = result.data as LeadsListResponse;
             // Filter leads belonging to current user by email
-            const myLeads = data.leads.filter(
-                (l) => l.email.toLowerCase() === user.email?.toLowerCase()
-            );
+            const myLeads = data.leads.filter((l) => l.email.toLowerCase() === email);
             setLeads(myLeads);
-
-            // Load replies for each lead
-            for (const lead of myLeads) {
-                setLoadingReplies((prev) => ({ ...prev, [lead.id]: true }));
-                const replies = await fetchReplies(lead.id);
-                setRepliesMap((prev) => ({ ...prev, [lead.id]: replies }));
-                setLoadingReplies((prev) => ({ ...prev, [lead.id]: false }));
-            }
+            // Load replies for all leads in one request
+            await loadReplies(myLeads.map((lead) => lead.id));
         } else {
             setError(result.error || "Failed to fetch leads");
         }
         setLoading(false);
-    }, [user]);
+    }, [email, loadReplies]);
+
+    /* ---- Merge changed rows (event payloads or delta sync) ---- */
+    const applyLeads = useCallback((changed: Lead[]) => {
+        const mine = changed.filter((l) => l.email?.toLowerCase() === email);
+        if (mine.length === 0) return;
+        setLeads((prev) => {
+            const byId = new Map(prev.map((lead) => [lead.id, lead]));
+            for (const lead of mine) byId.set(lead.id, { ...byId.get(lead.id), ...lead });
+            return Array.from(byId.values()).sort((a, b) =>
+                b.created_at.localeCompare(a.created_at)
+            );
+        });
+    }, [email]);
+
+    /* ---- Fallback for missed events: rows changed since the last sync ---- */
+    const syncChanges = useCallback(async () => {
+        const since = watermarkRef.current;
+        if (!since) return loadLeads();
+
+        const result = await fetchLeadChanges(since);
+        if (!result.success || !result.data) return;
+        const { leads: changed, watermark, has_more } = result.data;
+        if (has_more) return loadLeads();
+        watermarkRef.current = watermark;
+        applyLeads(changed);
+        // Only leads that changed since the last sync; new replies
+        // otherwise arrive as reply.created events, and a reset reloads all
+        const mine = changed.filter((lead) => lead.email?.toLowerCase() === email);
+        await loadReplies(mine.map((lead) => lead.id), true);
+    }, [applyLeads, email, loadLeads, loadReplies]);
 
     useEffect(() => {
         if (user) {
             // eslint-disable-next-line react-hooks/exhaustive-deps
             loadLeads();
-            const interval = setInterval(loadLeads, 30000);
-            return () => clearInterval(interval);
+            // Apply pushed changes for my leads directly; a slow delta sync
+            // covers events lost to other processes or dropped streams
+            const unsubscribe = subscribeToLeadEvents((type, data) => {
+                if (type === "reset") {
+                    loadLeads();
+                } else if (type === "lead.created" || type === "lead.status_changed") {
+                    applyLeads([data as unknown as Lead]);
+                } else if (type === "leads.created") {
+                    applyLeads((data.leads as Lead[]) ?? []);
+                } else if (type === "leads.updated") {
+                    const { ids, ...fields } = data as unknown as { ids: string[] } & Partial<Lead>;
+                    const changed = new Set(ids);
+                    setLeads((prev) =>
+                        prev.some((lead) => changed.has(lead.id))
+                            ? prev.map((lead) => (changed.has(lead.id) ? { ...lead, ...fields } : lead))
+                            : prev
+                    );
+                } else if (type === "reply.created") {
+                    const leadId = data.lead_id as string;
+                    if (leadsRef.current.some((lead) => lead.id === leadId)) {
+                        fetchReplies(leadId).then((replies) =>
+                            setRepliesMap((prev) => ({ ...prev, [leadId]: replies }))
+                        );
+                    }
+                }
+            }, { email });
+            const interval = setInterval(syncChanges, 15000);
+            return () => {
+                clearInterval(interval);
+                unsubscribe();
+            };
         }
-    }, [loadLeads, user]);
+    }, [applyLeads, email, loadLeads, syncChanges, user]);
 
     if (authLoading || !user) {
         return (
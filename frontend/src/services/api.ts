@@ -34,9 +34,14 @@ export interface Lead {
     translated_message: string;
     language: string;
     tag: string | null;
+    /** Every matching tag, primary first */
+    tags?: string[];
     status: string;
     assigned_to: string | null;
     created_at: string;
+    updated_at?: string;
+    /** Present when fetched with includeReplies */
+    replies?: Reply[];
 }
 
 /** Shape of the paginated leads list response */
@@ -45,6 +50,8 @@ export interface LeadsListResponse {
     total: number;
     limit: number;
     offset: number;
+    /** Keyset cursor for the next page (null on the last page) */
+    next_cursor?: string | null;
 }
 
 /**
@@ -89,7 +96,9 @@ export async function submitLead(
 export async function fetchLeads(
     limit = 50,
     offset = 0,
-    status?: string
+    status?: string,
+    cursor?: string,
+    includeReplies = false
 ): Promise<ApiResponse<LeadsListResponse>> {
     try {
         const params = new URLSearchParams({
@@ -97,6 +106,8 @@ export async function fetchLeads(
             offset: String(offset),
         });
         if (status) params.set("status", status);
+        if (cursor) params.set("cursor", cursor);
+        if (includeReplies) params.set("include", "replies");
 
         const response = await fetch(`${API_BASE_URL}/leads?${params}`);
 
@@ -119,6 +130,75 @@ export async function fetchLeads(
     }
 }
 
+/** Shape of the delta sync response */
+export interface LeadChangesResponse {
+    leads: Lead[];
+    watermark: string | null;
+    has_more: boolean;
+}
+
+/**
+ * Fetch leads inserted or updated after a watermark.
+ *
+ * GET /leads/changes?since=...
+ *
+ * Pass "now" to get a starting watermark without any rows.
+ */
+export async function fetchLeadChanges(
+    since: string,
+    limit = 200
+): Promise<ApiResponse<LeadChangesResponse>> {
+    try {
+        const params = new URLSearchParams({ since, limit: String(limit) });
+        const response = await fetch(`${API_BASE_URL}/leads/changes?${params}`);
+
+        if (!response.ok) {
+            const errorBody = await response.json().catch(() => null);
+            return {
+                success: false,
+                error:
+                    errorBody?.detail ||
+                    `Request failed with status ${response.status}`,
+            };
+        }
+
+        const data = await response.json();
+        return { success: true, data };
+    } catch (err) {
+        const message =
+            err instanceof Error ? err.message : "Network error — is the backend running?";
+        return { success: false, error: message };
+    }
+}
+
+/**
+ * Fetch a single lead with full message bodies.
+ *
+ * GET /leads/{id}
+ */
+export async function fetchLead(leadId: string): Promise<ApiResponse<Lead>> {
+    try {
+        const response = await fetch(`${API_BASE_URL}/leads/${leadId}`);
+
+        if (!response.ok) {
+            const errorBody = await response.json().catch(() => null);
+            return {
+                success: false,
+                error:
+                    errorBody?.detail ||
+                    `Request failed with status ${response.status}`,
+            };
+        }
+
+        const data = await response.json();
+        return { success: true, data };
+    } catch (err) {
+        const message =
+            err instanceof Error ? err.message : "Network error — is the backend running?";
+        return { success: false, error: message };
+    }
+}
+
 /**
  * Update a lead's status.
  *
@@ -182,7 +262,8 @@ export async function sendReply(
     leadId: string,
     message: string,
     agentEmail: string,
-    agentName: string = ""
+    agentName: string = "",
+    language?: string
 ): Promise<ApiResponse> {
     try {
         const response = await fetch(`${API_BASE_URL}/leads/${leadId}/replies`, {
@@ -192,6 +273,7 @@ export async function sendReply(
                 message,
                 agent_email: agentEmail,
                 agent_name: agentName,
+                ...(language ? { language } : {}),
             }),
         });
 
@@ -227,3 +309,79 @@ export async function fetchReplies(leadId: string): Promise<Reply[]> {
         return [];
     }
 }
+
+/**
+ * Fetch replies for many leads in a single request.
+ *
+ * GET /replies?lead_ids=a,b,c
+ */
+export async function fetchRepliesForLeads(
+    leadIds: string[]
+): Promise<Record<string, Reply[]>> {
+    if (leadIds.length === 0) return {};
+    try {
+        const params = new URLSearchParams({ lead_ids: leadIds.join(",") });
+        const response = await fetch(`${API_BASE_URL}/replies?${params}`);
+        if (!response.ok) return {};
+        const data = await response.json();
+        return data.replies || {};
+    } catch {
+        return {};
+    }
+}
+
+/* ------------------------------------------------------------------ */
+/*  Live change feed                                                   */
+/* ------------------------------------------------------------------ */
+
+export type LeadEventType =
+    | "lead.created"
+    | "leads.created"
+    | "lead.status_changed"
+    | "leads.updated"
+    | "reply.created"
+    | "reset";
+
+/**
+ * Subscribe to lead change events (Server-Sent Events).
+ *
+ * GET /events
+ *
+ * EventSource reconnects automatically and resumes via Last-Event-ID.
+ * A "reset" event means events were missed — refetch everything.
+ * "leads.updated" is one event per bulk update: { ids, status?, assigned_to? }.
+ * "leads.created" is one event per bulk import: { ids, leads } (matching rows only).
+ * Returns an unsubscribe function.
+ */
+export function subscribeToLeadEvents(
+    onEvent: (type: LeadEventType, data: Record<string, unknown>) => void,
+    filters: { agent?: string; status?: string; email?: string } = {}
+): () => void {
+    const params = new URLSearchParams();
+    if (filters.agent) params.set("agent", filters.agent);
+    if (filters.status) params.set("status", filters.status);
+    if (filters.email) params.set("email", filters.email);
+
+    const source = new EventSource(`${API_BASE_URL}/events?${params}`);
+    const types: LeadEventType[] = [
+        "lead.created",
+        "leads.created",
+        "lead.status_changed",
+        "leads.updated",
+        "reply.created",
+        "reset",
+    ];
+    for (const type of types) {
+        source.addEventListener(type, (event) => {
+            let data: Record<string, unknown> = {};
+            try {
+                data = JSON.parse((event as MessageEvent).data || "{}");
+            } catch {
+                /* ignore malformed payloads */
+            }
+            onEvent(type, data);
+        });
+    }
+
+    return () => source.close();
+}